@@ -2,10 +2,14 @@ import time
 import serial
 import threading
 
+# Sent instead of the live universe while a pattern has stalled:
+# every channel 0, so channel 1 (on/auto mode) switches the laser off
+SAFE_FRAME = bytes(34)
+
 class SimpleDMX:
-    def __init__(self):
+    def __init__(self, port='COM3'):
         self.ser = serial.Serial(
-            port='COM3',
+            port=port,
             baudrate=250000,
             bytesize=serial.EIGHTBITS,
             parity=serial.PARITY_NONE,
@@ -15,6 +19,7 @@ class SimpleDMX:
         # DMX universe: start code + 512 channels
         self.dmx_data = bytearray(34)
         self.dmx_data[0] = 0  # Start code
+        self.safe_mode = False  # Transmit SAFE_FRAME instead of dmx_data (set by the stall watchdog)
         
         # Threading for continuous transmission
         self.running = True
@@ -37,7 +42,7 @@ class SimpleDMX:
         time.sleep(0.000012)  # 12 microseconds mark after break
         
         # Send data
-        self.ser.write(self.dmx_data)
+        self.ser.write(SAFE_FRAME if self.safe_mode else self.dmx_data)
         self.ser.flush()
     
     def set_channel(self, channel, value):
@@ -46,6 +51,14 @@ class SimpleDMX:
             self.dmx_data[channel] = max(0, min(255, value))
             # No need to send_dmx() here - continuous thread handles it
     
+    def enter_safe(self):
+        """Transmit the safe frame from the next DMX packet on; dmx_data keeps updating."""
+        self.safe_mode = True
+
+    def leave_safe(self):
+        """Go back to transmitting dmx_data."""
+        self.safe_mode = False
+
     def close(self):
         """Close connection"""
         self.running = False
@@ -0,0 +1,194 @@
+# === Keyframe Automation ===
+# Keyframed curves that drive DMX channels (e.g. size on ch 2, zoom on ch 5,
+# rotation on ch 6) or pattern parameters (e.g. 'speed') over show time.
+#
+# Curves are evaluated for a whole block of time at once with NumPy and the
+# block is cached, so a frame only costs an index lookup per target.
+#
+# Keyframes are (time, value) or (time, value, mode) where mode shapes the
+# segment that starts at that keyframe:
+#   'linear'  straight line to the next keyframe (default)
+#   'ease'    smoothstep ease-in/ease-out
+#   'step'    hold the value until the next keyframe
+#   'bezier'  cubic bezier; give control values as (time, value, 'bezier', c1, c2)
+
+import numpy as np
+
+CURVE_MODES = {'linear': 0, 'ease': 1, 'step': 2, 'bezier': 3}
+
+class Curve:
+    """A keyframed curve over time in seconds."""
+    def __init__(self, keyframes):
+        """
+        Args:
+            keyframes (list): (time, value[, mode[, c1, c2]]) tuples
+        """
+        if not keyframes:
+            raise ValueError("A curve needs at least one keyframe")
+
+        keyframes = sorted(keyframes, key=lambda k: k[0])
+        self.times = np.array([k[0] for k in keyframes], dtype=float)
+        self.values = np.array([k[1] for k in keyframes], dtype=float)
+        self.modes = np.zeros(len(keyframes), dtype=np.int8)
+        self.controls = np.zeros((len(keyframes), 2))
+
+        for i, key in enumerate(keyframes):
+            mode = key[2] if len(key) > 2 else 'linear'
+            if mode not in CURVE_MODES:
+                raise ValueError(f"Unknown curve mode: {mode}")
+            self.modes[i] = CURVE_MODES[mode]
+            if mode == 'bezier':
+                if len(key) != 5:
+                    raise ValueError("Bezier keyframes need two control values: (time, value, 'bezier', c1, c2)")
+                self.controls[i] = key[3], key[4]
+
+    def evaluate(self, t):
+        """
+        Evaluate the curve at many times at once.
+
+        Args:
+            t (np.ndarray): Times in seconds
+
+        Returns:
+            np.ndarray: Curve values, same shape as t
+        """
+        t = np.asarray(t, dtype=float)
+        if len(self.times) == 1:
+            return np.full(t.shape, self.values[0])
+
+        # Segment containing each time; outside the keyframes the ends hold
+        seg = np.clip(np.searchsorted(self.times, t, side='right') - 1, 0, len(self.times) - 2)
+        t0 = self.times[seg]
+        t1 = self.times[seg + 1]
+        v0 = self.values[seg]
+        v1 = self.values[seg + 1]
+        span = np.where(t1 > t0, t1 - t0, 1.0)
+        u = np.clip((t - t0) / span, 0.0, 1.0)
+
+        mode = self.modes[seg]
+        c1 = self.controls[seg, 0]
+        c2 = self.controls[seg, 1]
+        w = 1.0 - u
+        return np.select(
+            [mode == 0, mode == 1, mode == 2],
+            [v0 + (v1 - v0) * u,
+             v0 + (v1 - v0) * u * u * (3 - 2 * u),
+             np.where(u < 1.0, v0, v1)],
+            w ** 3 * v0 + 3 * w * w * u * c1 + 3 * w * u * u * c2 + u ** 3 * v1,
+        )
+
+class Automation:
+    """
+    Curves attached to DMX channels (int targets) or pattern parameters
+    (str targets), rendered a block at a time and cached between frames.
+    """
+    def __init__(self, block_seconds=2.0, resolution=0.01):
+        """
+        Args:
+            block_seconds (float): Length of each cached block
+            resolution (float): Seconds between cached samples
+        """
+        self.curves = {}
+        self.resolution = resolution
+        self.block_len = max(1, int(round(block_seconds / resolution)))
+        self._invalidate()
+
+    @classmethod
+    def from_dict(cls, spec, **kwargs):
+        """
+        Build from a JSON-style spec:
+            {"channels": {"5": [[0, 0], [4, 127, "ease"]]},
+             "params": {"speed": [[0, 3], [8, 9, "linear"]]}}
+        """
+        automation = cls(**kwargs)
+        for channel, keyframes in spec.get('channels', {}).items():
+            automation.attach(int(channel), Curve(keyframes))
+        for name, keyframes in spec.get('params', {}).items():
+            automation.attach(name, Curve(keyframes))
+        return automation
+
+    def attach(self, target, curve):
+        """
+        Attach a curve to a DMX channel number or a parameter name.
+        Replaces any curve already on that target.
+        """
+        self.curves[target] = curve
+        self._invalidate()
+
+    def detach(self, target):
+        self.curves.pop(target, None)
+        self._invalidate()
+
+    def _invalidate(self):
+        self._targets = list(self.curves)
+        self._channels = [(row, target) for row, target in enumerate(self._targets) if isinstance(target, int)]
+        self._rows = {target: row for row, target in enumerate(self._targets)}
+        self._block = None
+        self._block_start = 0.0
+
+    def _render(self, t):
+        """Render the block of samples that starts at t."""
+        times = t + self.resolution * np.arange(self.block_len)
+        block = np.empty((len(self._targets), self.block_len))
+        for row, target in enumerate(self._targets):
+            block[row] = self.curves[target].evaluate(times)
+        self._block = block
+        self._block_start = t
+
+    def _sample_index(self, t):
+        """Index of t in the cached block, rendering a new block if needed."""
+        i = int((t - self._block_start) / self.resolution)
+        if self._block is None or not 0 <= i < self.block_len:
+            self._render(t)
+            i = 0
+        return i
+
+    def param(self, name, t, default):
+        """Value of an automated parameter at show time t, or default if it isn't automated."""
+        row = self._rows.get(name)
+        if row is None:
+            return default
+        i = self._sample_index(t)
+        return float(self._block[row, i])
+
+    def channel(self, channel, t):
+        """DMX value of an automated channel at show time t."""
+        i = self._sample_index(t)
+        return int(round(self._block[self._rows[channel], i]))
+
+    def apply(self, dmx, t):
+        """Write every automated channel's value at show time t to dmx."""
+        if not self._channels:
+            return
+        i = self._sample_index(t)
+        for row, channel in self._channels:
+            dmx.set_channel(channel, int(round(self._block[row, i])))
+
+class AutomatedDMX:
+    """
+    Wraps a DMX output so automated channels keep their curve value.
+
+    Patterns write their channels and then sleep inside the frame, so
+    layering the automation on after the pattern returns would be
+    overwritten by the next frame before it is ever seen. Here a write to
+    an automated channel is replaced by the curve's value at the current
+    show time; every other channel passes straight through.
+    """
+    def __init__(self, dmx, automation, clock):
+        """
+        Args:
+            dmx: Output with set_channel (SimpleDMX or NullDMX)
+            automation (Automation): Curves to enforce
+            clock (callable): Returns the current show time in seconds
+        """
+        self.dmx = dmx
+        self.automation = automation
+        self.clock = clock
+
+    def set_channel(self, channel, value):
+        if channel in self.automation.curves:
+            value = self.automation.channel(channel, self.clock())
+        self.dmx.set_channel(channel, value)
+
+    def __getattr__(self, name):
+        return getattr(self.dmx, name)
@@ -0,0 +1,119 @@
+# === Golden Channel Traces ===
+# Regression check for pattern_functions.py. Every pattern is run with a
+# fixed seed on a virtual clock, and the DMX universe after each of the
+# first N frames is stored as a uint8 array of shape (speeds, frames, 34)
+# in goldens/<pattern>.npy.
+#
+#   python golden_traces.py record            # (re)write all goldens
+#   python golden_traces.py record -p dotLR   # rewrite one pattern
+#   python golden_traces.py check             # diff against goldens, exit 1 on mismatch
+
+import argparse
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from pattern_sim import NullDMX, VirtualClock, virtual_time, pattern_catalog, start_pattern
+
+GOLDEN_DIR = Path(__file__).resolve().parent / "goldens"
+SPEEDS = range(1, 10)
+DEFAULT_FRAMES = 120
+DEFAULT_SEED = 1234
+
+def record_trace(func, frames=DEFAULT_FRAMES, seed=DEFAULT_SEED):
+    """
+    Run a pattern from a fresh state at every speed and capture the universe.
+
+    Args:
+        func (callable): Pattern function taking (dmx, speed)
+        frames (int): Number of frames to capture per speed
+        seed (int): Random seed applied before each speed
+
+    Returns:
+        np.ndarray: uint8 array of shape (len(SPEEDS), frames, 34)
+    """
+    trace = np.zeros((len(SPEEDS), frames, 34), dtype=np.uint8)
+    for s, speed in enumerate(SPEEDS):
+        dmx = NullDMX()
+        start_pattern(seed)
+        with virtual_time(VirtualClock()):
+            for f in range(frames):
+                func(dmx, speed)
+                trace[s, f] = np.frombuffer(dmx.dmx_data, dtype=np.uint8)
+    return trace
+
+def golden_path(func):
+    return GOLDEN_DIR / f"{func.__name__}.npy"
+
+def diff_traces(expected, actual):
+    """
+    Compare two traces.
+
+    Returns:
+        str or None: Description of the first difference, or None if equal
+    """
+    if expected.shape != actual.shape:
+        return f"shape {actual.shape} != golden {expected.shape}"
+
+    mismatch = np.argwhere(expected != actual)
+    if not len(mismatch):
+        return None
+
+    s, f, ch = mismatch[0]
+    return (f"{len(mismatch)} values differ; first at speed {SPEEDS[s]}, frame {f}, "
+            f"channel {ch}: got {actual[s, f, ch]}, expected {expected[s, f, ch]}")
+
+def selected_patterns(names):
+    catalog = [func for _, func in pattern_catalog()]
+    if not names:
+        return catalog
+    unknown = set(names) - {func.__name__ for func in catalog}
+    if unknown:
+        raise SystemExit(f"Unknown pattern(s): {', '.join(sorted(unknown))}")
+    return [func for func in catalog if func.__name__ in names]
+
+def record(names=None, frames=DEFAULT_FRAMES):
+    GOLDEN_DIR.mkdir(exist_ok=True)
+    for func in selected_patterns(names):
+        np.save(golden_path(func), record_trace(func, frames=frames))
+        print(f"✓ Recorded {func.__name__}")
+
+def check(names=None):
+    """
+    Diff every pattern against its golden.
+
+    Returns:
+        bool: True if all traces match
+    """
+    ok = True
+    for func in selected_patterns(names):
+        path = golden_path(func)
+        if not path.exists():
+            print(f"❌ {func.__name__}: no golden at {path}")
+            ok = False
+            continue
+
+        expected = np.load(path)
+        problem = diff_traces(expected, record_trace(func, frames=expected.shape[1]))
+        if problem:
+            print(f"❌ {func.__name__}: {problem}")
+            ok = False
+        else:
+            print(f"✓ {func.__name__}")
+    return ok
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record or check golden pattern channel traces.")
+    parser.add_argument('command', choices=['record', 'check'])
+    parser.add_argument('-p', '--pattern', action='append', help="Only this pattern (repeatable)")
+    parser.add_argument('--frames', type=int, default=DEFAULT_FRAMES, help="Frames to record per speed")
+    args = parser.parse_args(argv)
+
+    if args.command == 'record':
+        record(args.pattern, frames=args.frames)
+        return 0
+    return 0 if check(args.pattern) else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+# === Label File Loading ===
+# Reads only the arrays that are asked for from .npz label files.
+#
+# np.load(npz) followed by dict() decompresses every member, including mfcc
+# (which playback never uses) and the full waveform that tk.py's .labels.npz
+# files embed. Here each member is read on its own: members stored without
+# compression are memory-mapped straight from the archive, compressed ones
+# are decompressed individually. Compiled label timelines are cached per file.
+
+import functools
+import struct
+import zipfile
+from pathlib import Path
+
+import numpy as np
+
+from label_timeline import LabelTimeline
+
+# Suffixes written by the labelling tools, newest format first
+LABEL_SUFFIXES = ('.mfcc_labels.npz', '.labels.npz')
+
+def _member_data_offset(f, info):
+    """Byte offset of a stored zip member's data (just past its local header)."""
+    f.seek(info.header_offset)
+    header = f.read(30)
+    if header[:4] != b'PK\x03\x04':
+        raise ValueError(f"Bad local header for {info.filename}")
+    name_len, extra_len = struct.unpack('<HH', header[26:30])
+    return info.header_offset + 30 + name_len + extra_len
+
+def _memmap_member(path, info):
+    """Memory-map an uncompressed .npy member, or return None if it can't be mapped."""
+    with open(path, 'rb') as f:
+        f.seek(_member_data_offset(f, info))
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        elif version == (2, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        else:
+            return None
+        offset = f.tell()
+
+    if dtype.hasobject:
+        return None
+    if 0 in shape:
+        return np.empty(shape, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode='r', offset=offset, shape=shape,
+                     order='F' if fortran_order else 'C')
+
+def read_npz_members(path, names, mmap=True):
+    """
+    Read selected arrays from an .npz file.
+
+    Args:
+        path (str or Path): .npz file
+        names (iterable): Array names to read
+        mmap (bool): Memory-map members stored without compression
+
+    Returns:
+        dict: name -> array (read-only np.memmap for mapped members)
+
+    Raises:
+        KeyError: If a requested array isn't in the file
+    """
+    arrays = {}
+    with zipfile.ZipFile(path) as zf:
+        for name in names:
+            try:
+                info = zf.getinfo(f"{name}.npy")
+            except KeyError:
+                raise KeyError(f"'{name}' not found in {path}") from None
+
+            array = None
+            if mmap and info.compress_type == zipfile.ZIP_STORED:
+                array = _memmap_member(path, info)
+            if array is None:
+                with zf.open(info) as fh:
+                    array = np.lib.format.read_array(fh, allow_pickle=False)
+            arrays[name] = array
+    return arrays
+
+def npz_member_names(path):
+    """Names of the arrays in an .npz file, without reading any of them."""
+    with zipfile.ZipFile(path) as zf:
+        return [n[:-4] for n in zf.namelist() if n.endswith('.npy')]
+
+def find_label_file(audio_filename, labels_dir):
+    """
+    Path of the label file for a song, preferring .mfcc_labels.npz over the
+    older .labels.npz.
+
+    Raises:
+        FileNotFoundError: If neither exists
+    """
+    for suffix in LABEL_SUFFIXES:
+        path = Path(labels_dir) / f"{audio_filename}{suffix}"
+        if path.exists():
+            return path
+    raise FileNotFoundError(f"No label file for '{audio_filename}' in {labels_dir}")
+
+@functools.lru_cache(maxsize=32)
+def _cached_timeline(path, mtime_ns, size, fps):
+    arrays = read_npz_members(path, ('pattern_labels', 'speed_labels'))
+    return LabelTimeline.from_labels(arrays['pattern_labels'], arrays['speed_labels'], fps)
+
+def load_label_timeline(path, fps=10):
+    """
+    Compiled LabelTimeline for a label file. Only the label arrays are read,
+    and the result is cached until the file changes.
+    """
+    path = Path(path)
+    stat = path.stat()
+    return _cached_timeline(str(path.resolve()), stat.st_mtime_ns, stat.st_size, fps)
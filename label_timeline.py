@@ -0,0 +1,76 @@
+# === Label Timeline ===
+# Pattern/speed labels are stored per 10 Hz frame but only change a few dozen
+# times per song. LabelTimeline compiles them once into run-length segments
+# (a change-event list) so the player can sleep until the next change and
+# find the segment active at any time with a binary search.
+
+import numpy as np
+
+class LabelTimeline:
+    """Run-length encoded pattern/speed labels."""
+    def __init__(self, starts, patterns, speeds, n_frames, fps=10):
+        """
+        Args:
+            starts (np.ndarray): First label frame of each segment (starts[0] == 0)
+            patterns (np.ndarray): Pattern group of each segment (0 = off)
+            speeds (np.ndarray): Speed of each segment (0 = off)
+            n_frames (int): Total label frames in the song
+            fps (float): Label frames per second
+        """
+        self.starts = np.asarray(starts, dtype=np.int64)
+        self.patterns = np.asarray(patterns)
+        self.speeds = np.asarray(speeds)
+        self.n_frames = int(n_frames)
+        self.fps = fps
+        self.start_times = self.starts / fps
+        self.ends = np.append(self.starts[1:], self.n_frames)
+
+    @classmethod
+    def from_labels(cls, pattern_labels, speed_labels, fps=10):
+        """
+        Compile per-frame label arrays into segments.
+
+        A frame where either label is 0 is "off"; off frames are merged into
+        one segment regardless of the other label's value.
+        """
+        patterns = np.asarray(pattern_labels)
+        speeds = np.asarray(speed_labels)
+        if len(patterns) != len(speeds):
+            raise ValueError(f"Label length mismatch: patterns={len(patterns)}, speeds={len(speeds)}")
+        if not len(patterns):
+            return cls([], [], [], 0, fps)
+
+        off = (patterns == 0) | (speeds == 0)
+        patterns = np.where(off, 0, patterns)
+        speeds = np.where(off, 0, speeds)
+
+        changes = np.flatnonzero((np.diff(patterns) != 0) | (np.diff(speeds) != 0)) + 1
+        starts = np.concatenate(([0], changes))
+        return cls(starts, patterns[starts], speeds[starts], len(patterns), fps)
+
+    def __len__(self):
+        return len(self.starts)
+
+    @property
+    def duration(self):
+        """Song length in seconds."""
+        return self.n_frames / self.fps
+
+    def segment_at(self, t):
+        """
+        Index of the segment active at show time t (seconds).
+
+        Returns:
+            int or None: Segment index, or None once the song has ended
+        """
+        if t >= self.duration or not len(self.starts):
+            return None
+        return max(0, int(np.searchsorted(self.start_times, t, side='right')) - 1)
+
+    def segment_end_time(self, k):
+        """Show time at which segment k ends."""
+        return self.ends[k] / self.fps
+
+    def segment(self, k):
+        """(start_frame, end_frame, pattern, speed) of segment k."""
+        return int(self.starts[k]), int(self.ends[k]), int(self.patterns[k]), int(self.speeds[k])
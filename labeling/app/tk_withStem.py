@@ -4,12 +4,16 @@ from tkinter import ttk, filedialog, messagebox
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
-import librosa
 import sounddevice as sd
 import threading
 import time
 from pathlib import Path
 import os
+import sys
+
+# feature_cache.py lives one level up in labeling/
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from feature_cache import load_audio
 
 class TkinterSongLabeler:
     def __init__(self, root):
@@ -220,7 +224,7 @@ class TkinterSongLabeler:
         self.root.update()
         
         # Load audio
-        self.y, self.sr = librosa.load(file_path)
+        self.y, self.sr = load_audio(file_path)  # Decoded once, then memory-mapped from the cache
         self.duration = len(self.y) / self.sr
         self.audio_file = file_path
         
@@ -279,7 +283,7 @@ class TkinterSongLabeler:
         self.root.update()
         
         # Load vocal stems
-        self.vocals_y, self.vocals_sr = librosa.load(file_path)
+        self.vocals_y, self.vocals_sr = load_audio(file_path)
         self.vocals_file = file_path
         
         # Update GUI
@@ -598,7 +602,7 @@ class TkinterSongLabeler:
             # Save everything
             np.savez_compressed(output_path, **existing_data)
             
-            messagebox.showinfo("Success", f"MFCCs ARE NOT CURRENTLY BEING SAVED. labels saved to:\n{output_path}")
+            messagebox.showinfo("Success", f"Labels saved to:\n{output_path}\n\nRun extract_features.py to add MFCCs.")
 
         except Exception as e:
             messagebox.showerror("Error", f"Failed to save MFCCs and labels:\n{str(e)}")
@@ -0,0 +1,180 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from extract_features import N_MFCC
+from rhythm_features import RHYTHM_COLUMNS
+
+# Feature matrix columns: MFCCs first, then the rhythm pack
+FEATURE_COLUMNS = tuple(f'mfcc_{i}' for i in range(N_MFCC)) + RHYTHM_COLUMNS
+DATASET_VERSION = 1
+
+def _save_npy(path, array):
+    """Write an uncompressed .npy atomically (readers memory-map it)."""
+    tmp = path.with_name(f"{path.name}.tmp")
+    with open(tmp, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp, path)
+
+def label_files(labels_dir):
+    """
+    One label file per song, preferring .mfcc_labels.npz over tk.py's .labels.npz.
+
+    Returns:
+        dict: song name -> Path
+    """
+    from label_io import LABEL_SUFFIXES, find_label_file
+
+    names = {path.name[:-len(suffix)] for suffix in LABEL_SUFFIXES for path in Path(labels_dir).glob(f"*{suffix}")}
+    return {name: find_label_file(name, labels_dir) for name in sorted(names)}
+
+def read_song(path):
+    """
+    Features and labels of one song, or None if it has no extracted features.
+
+    Only the needed members are decompressed; an embedded waveform is never read.
+
+    Returns:
+        tuple: (features (frames, len(FEATURE_COLUMNS)) float32, pattern_labels uint8, speed_labels uint8)
+    """
+    with np.load(path) as data:
+        if not {'mfcc', 'rhythm', 'rhythm_columns'} <= set(data.files):
+            return None
+        if tuple(data['rhythm_columns']) != RHYTHM_COLUMNS:
+            return None
+        mfcc, rhythm = data['mfcc'], data['rhythm']
+        patterns, speeds = data['pattern_labels'], data['speed_labels']
+
+    n = min(len(mfcc), len(rhythm), len(patterns), len(speeds))
+    features = np.hstack((mfcc[:n], rhythm[:n])).astype(np.float32)
+    return features, patterns[:n].astype(np.uint8), speeds[:n].astype(np.uint8)
+
+def build(labels_dir="labels", out_dir="dataset", full=False):
+    """
+    Consolidate every song's features and labels into per-song .npy shards.
+
+    Songs whose label file is unchanged since the last build (same size and
+    mtime) keep their shards; changed songs are rewritten and removed songs
+    deleted. index.json records each song's shard and its row offset in the
+    concatenated dataset.
+
+    Args:
+        labels_dir (str or Path): Directory of label files
+        out_dir (str or Path): Dataset directory
+        full (bool): Rewrite every shard
+
+    Returns:
+        dict: Counts of 'written', 'kept', 'skipped' and 'removed' songs
+    """
+    out_dir = Path(out_dir)
+    shard_dir = out_dir / "shards"
+    shard_dir.mkdir(parents=True, exist_ok=True)
+    index_path = out_dir / "index.json"
+
+    previous = {}
+    if index_path.exists() and not full:
+        saved = json.loads(index_path.read_text())
+        if saved.get('version') == DATASET_VERSION and tuple(saved['columns']) == FEATURE_COLUMNS:
+            previous = {song['name']: song for song in saved['songs']}
+
+    counts = {'written': 0, 'kept': 0, 'skipped': 0, 'removed': 0}
+    songs = []
+    offset = 0
+    for name, path in label_files(labels_dir).items():
+        stat = path.stat()
+        source = {'file': path.name, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+        shard = hashlib.sha1(name.encode()).hexdigest()[:16]
+        old = previous.get(name)
+
+        if old is not None and old['source'] == source and (shard_dir / f"{shard}.features.npy").exists():
+            frames = old['frames']
+            counts['kept'] += 1
+        else:
+            song = read_song(path)
+            if song is None:
+                print(f"⏭️  {name}: no features yet (run extract_features.py)")
+                counts['skipped'] += 1
+                continue
+            features, patterns, speeds = song
+            _save_npy(shard_dir / f"{shard}.features.npy", features)
+            _save_npy(shard_dir / f"{shard}.patterns.npy", patterns)
+            _save_npy(shard_dir / f"{shard}.speeds.npy", speeds)
+            frames = len(features)
+            counts['written'] += 1
+
+        songs.append({'name': name, 'shard': shard, 'offset': offset, 'frames': frames, 'source': source})
+        offset += frames
+
+    # Drop shards of songs that are gone
+    live = {song['shard'] for song in songs}
+    for path in shard_dir.glob("*.npy"):
+        if path.name.split('.')[0] not in live:
+            path.unlink()
+            counts['removed'] += path.name.endswith('.features.npy')
+
+    index = {'version': DATASET_VERSION, 'columns': list(FEATURE_COLUMNS), 'frames': offset, 'songs': songs}
+    tmp = index_path.with_name("index.json.tmp")
+    tmp.write_text(json.dumps(index, indent=1))
+    os.replace(tmp, index_path)
+    return counts
+
+class Dataset:
+    """
+    Read-only view of a built dataset. Every array is memory-mapped from its
+    shard, so opening the dataset and slicing it copies nothing.
+    """
+    def __init__(self, root="dataset"):
+        self.root = Path(root)
+        index = json.loads((self.root / "index.json").read_text())
+        self.columns = tuple(index['columns'])
+        self.songs = index['songs']
+        self.names = [song['name'] for song in self.songs]
+        # Row where each song starts in the concatenated dataset, plus the total
+        self.offsets = np.array([song['offset'] for song in self.songs] + [index['frames']], dtype=np.int64)
+
+        shards = self.root / "shards"
+        self.features = [np.load(shards / f"{s['shard']}.features.npy", mmap_mode='r') for s in self.songs]
+        self.patterns = [np.load(shards / f"{s['shard']}.patterns.npy", mmap_mode='r') for s in self.songs]
+        self.speeds = [np.load(shards / f"{s['shard']}.speeds.npy", mmap_mode='r') for s in self.songs]
+
+    def __len__(self):
+        return len(self.songs)
+
+    @property
+    def n_frames(self):
+        return int(self.offsets[-1])
+
+    def locate(self, rows):
+        """(song index, frame within song) of global row numbers."""
+        rows = np.asarray(rows)
+        song = np.searchsorted(self.offsets, rows, side='right') - 1
+        return song, rows - self.offsets[song]
+
+    def column(self, name):
+        return self.columns.index(name)
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the memory-mapped training dataset from all label files.")
+    parser.add_argument('--labels', default="labels", help="Directory of label files")
+    parser.add_argument('--out', default="dataset", help="Dataset directory")
+    parser.add_argument('--full', action='store_true', help="Rewrite every song, not just changed ones")
+    args = parser.parse_args()
+
+    # Label file lookup is shared with playback in the repo root's label_io
+    sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+    started = time.perf_counter()
+    counts = build(args.labels, args.out, full=args.full)
+    dataset = Dataset(args.out)
+    print(f"✅ {len(dataset)} songs, {dataset.n_frames} frames × {len(dataset.columns)} features "
+          f"({counts['written']} written, {counts['kept']} unchanged, {counts['skipped']} skipped, "
+          f"{counts['removed']} removed) in {time.perf_counter() - started:.2f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+from collections import deque
+
+import numpy as np
+
+# Defaults: a switch costs as much as a 5-nat drop in log probability, runs last at least 0.5 s
+DEFAULT_SWITCH_PENALTY = 5.0
+DEFAULT_MIN_DURATION = 5
+
+def mode_filter(labels, width=5, n_classes=None):
+    """
+    Most common label in a centred window around every frame (a median filter
+    for class labels). Cheaper than Viterbi, but doesn't guarantee run lengths.
+
+    Counts come from a cumulative one-hot sum, so the cost is O(frames * classes)
+    whatever the width.
+    """
+    labels = np.asarray(labels, dtype=np.int64)
+    if len(labels) == 0 or width <= 1:
+        return labels.copy()
+    n_classes = n_classes or int(labels.max()) + 1
+    half = width // 2
+    padded = np.pad(labels, half, mode='edge')
+    counts = np.zeros((len(padded) + 1, n_classes), dtype=np.int32)
+    counts[np.arange(1, len(padded) + 1), padded] = 1
+    np.cumsum(counts, axis=0, out=counts)
+    window = counts[width:width + len(labels)] - counts[:len(labels)]
+    return window.argmax(axis=1)
+
+class ViterbiDecoder:
+    """
+    Most likely label sequence under a switch penalty and a minimum run length.
+
+    Each hidden state is (class, frames spent in the current run, capped at
+    min_duration), so a switch is only possible from a run that is already
+    min_duration frames long. Every step is a handful of vectorised operations
+    over the classes x min_duration states, so decoding is linear in the song
+    length.
+    """
+    def __init__(self, n_classes, switch_penalty=DEFAULT_SWITCH_PENALTY, min_duration=DEFAULT_MIN_DURATION):
+        self.n_classes = n_classes
+        self.switch_penalty = switch_penalty
+        self.min_duration = max(1, int(min_duration))
+        # Back pointers hold slots -1..min_duration-1; the smallest signed type that fits them
+        self.slot_dtype = np.min_scalar_type(-self.min_duration)
+
+    def start(self, log_p):
+        """Scores of the first frame: every class, at run length 1."""
+        scores = np.full((self.n_classes, self.min_duration), -np.inf)
+        scores[:, 0] = log_p
+        return scores
+
+    def step(self, scores, log_p):
+        """
+        Advance one frame.
+
+        Args:
+            scores (np.ndarray): (classes, min_duration) best path scores so far
+            log_p (np.ndarray): (classes,) log probabilities of the new frame
+
+        Returns:
+            tuple: (new scores, back pointers): for each state, the run-length
+            slot it came from (-1 for a switch from the best other class), and
+            that class
+        """
+        d = self.min_duration
+        new = np.empty_like(scores)
+        from_slot = np.empty(scores.shape, dtype=self.slot_dtype)
+
+        # Runs grow by one frame
+        new[:, 1:] = scores[:, :-1]
+        from_slot[:, 1:] = np.arange(d - 1)
+        # A full-length run can also just continue
+        stay = scores[:, d - 1]
+        if d > 1:
+            longer = stay > new[:, d - 1]
+            new[:, d - 1] = np.where(longer, stay, new[:, d - 1])
+            from_slot[:, d - 1] = np.where(longer, d - 1, d - 2)
+
+        # Switch into a new run from the best full-length run of another class
+        order = np.argsort(stay)
+        best, second = order[-1], order[-2] if self.n_classes > 1 else order[-1]
+        other = np.full(self.n_classes, best)
+        other[best] = second
+        switch = stay[other] - self.switch_penalty
+        if d == 1:
+            keep = stay >= switch
+            new[:, 0] = np.where(keep, stay, switch)
+            from_slot[:, 0] = np.where(keep, 0, -1)
+        else:
+            new[:, 0] = switch
+            from_slot[:, 0] = -1
+
+        new += log_p[:, None]
+        return new, (from_slot, other)
+
+    def decode(self, probs):
+        """
+        Labels for a whole song.
+
+        Args:
+            probs (np.ndarray): (frames, classes) per-frame class probabilities
+
+        Returns:
+            np.ndarray: (frames,) int64 labels
+        """
+        probs = np.asarray(probs)
+        n = len(probs)
+        if n == 0:
+            return np.zeros(0, dtype=np.int64)
+        log_probs = np.log(np.maximum(probs, 1e-12))
+
+        pointers = []
+        scores = self.start(log_probs[0])
+        for t in range(1, n):
+            scores, pointer = self.step(scores, log_probs[t])
+            pointers.append(pointer)
+        if n >= self.min_duration:
+            # The song's last run must be full length too, not a flicker in its final frames
+            scores[:, :-1] = -np.inf
+        return self.backtrack(scores, pointers)
+
+    def backtrack(self, scores, pointers):
+        """Follow back pointers from the best final state; returns one label per frame."""
+        c, slot = np.unravel_index(np.argmax(scores), scores.shape)
+        labels = np.empty(len(pointers) + 1, dtype=np.int64)
+        labels[-1] = c
+        for t in range(len(pointers) - 1, -1, -1):
+            from_slot, other = pointers[t]
+            previous = from_slot[c, slot]
+            if previous < 0:
+                c, slot = other[c], self.min_duration - 1
+            else:
+                slot = previous
+            labels[t] = c
+        return labels
+
+class StreamingDecoder:
+    """
+    Fixed-lag Viterbi for live use: push one frame of probabilities at a time
+    and get back the label of the frame `lag` frames earlier, decided with
+    `lag` frames of look-ahead. Memory and work per frame are bounded by the
+    lag, so it can run forever.
+
+    lag=0 gives the label of the best current path immediately, at the cost
+    of the occasional run shorter than min_duration when that path changes.
+    """
+    def __init__(self, n_classes, switch_penalty=DEFAULT_SWITCH_PENALTY,
+                 min_duration=DEFAULT_MIN_DURATION, lag=DEFAULT_MIN_DURATION):
+        self.decoder = ViterbiDecoder(n_classes, switch_penalty, min_duration)
+        self.lag = lag
+        self.reset()
+
+    def reset(self):
+        self.scores = None
+        self.pointers = deque(maxlen=self.lag)
+
+    def push(self, probs):
+        """
+        Args:
+            probs (np.ndarray): (classes,) probabilities of the newest frame
+
+        Returns:
+            int or None: Label of the frame `lag` frames back (None for the first `lag` frames)
+        """
+        log_p = np.log(np.maximum(np.asarray(probs), 1e-12))
+        if self.scores is None:
+            self.scores = self.decoder.start(log_p)
+            frames = 1
+        else:
+            self.scores, pointer = self.decoder.step(self.scores, log_p)
+            if self.lag:
+                self.pointers.append(pointer)
+            frames = len(self.pointers) + 1
+            # Scores only matter relative to each other; keep them from drifting
+            self.scores -= self.scores.max()
+        if frames <= self.lag:
+            return None
+        return int(self.decoder.backtrack(self.scores, list(self.pointers))[0])
+
+def smooth_labels(probs, switch_penalty=DEFAULT_SWITCH_PENALTY, min_duration=DEFAULT_MIN_DURATION):
+    """
+    Stable label runs from one head's per-frame probabilities.
+
+    Returns:
+        np.ndarray: (frames,) int64 labels
+    """
+    return ViterbiDecoder(probs.shape[1], switch_penalty, min_duration).decode(probs)
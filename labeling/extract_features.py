@@ -0,0 +1,167 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+
+# Label grid used by the labelers (tk.py / tk_withStem.py)
+LABELS_PER_SECOND = 10
+SAMPLE_RATE = 22050  # librosa.load default; 22050 / 10 gives an exact 2205-sample hop
+N_MFCC = 20
+N_FFT = 4096         # Window covers the whole 0.1 s label interval plus some context
+
+def label_hop(sr=SAMPLE_RATE, labels_per_second=LABELS_PER_SECOND):
+    """Samples per label frame. Raises ValueError unless it divides exactly."""
+    if sr % labels_per_second:
+        raise ValueError(f"Sample rate {sr} is not a multiple of {labels_per_second} labels/s")
+    return sr // labels_per_second
+
+def fit_to_labels(features, n_labels):
+    """Trim or edge-pad (frames, dims) features to exactly n_labels frames."""
+    if len(features) >= n_labels:
+        return features[:n_labels]
+    if not len(features):
+        return np.zeros((n_labels, features.shape[1]), dtype=features.dtype)
+    return np.pad(features, ((0, n_labels - len(features)), (0, 0)), mode='edge')
+
+def label_aligned_mfcc(y, sr=SAMPLE_RATE, n_labels=None, labels_per_second=LABELS_PER_SECOND,
+                       n_mfcc=N_MFCC, n_fft=N_FFT):
+    """
+    MFCCs with one frame per label, centred on the middle of each label interval.
+
+    Label i covers [i / labels_per_second, (i + 1) / labels_per_second), so frame i
+    analyses the n_fft samples centred on (i + 0.5) / labels_per_second. Computed
+    with stream_features.LabelFramer, so whole-song and streamed features match.
+
+    Args:
+        y (np.ndarray): Mono audio
+        sr (int): Sample rate of y
+        n_labels (int): Frames to return (defaults to whole label intervals in y)
+        labels_per_second (int): Label rate
+        n_mfcc (int): Coefficients per frame
+        n_fft (int): Analysis window in samples
+
+    Returns:
+        np.ndarray: (n_labels, n_mfcc) float32
+    """
+    from stream_features import LabelFramer
+
+    framer = LabelFramer(sr=sr, labels_per_second=labels_per_second, n_mfcc=n_mfcc, n_fft=n_fft)
+    mfcc = np.concatenate((framer.push(y), framer.flush(len(y))))
+    if n_labels is None:
+        n_labels = len(mfcc)
+    return fit_to_labels(mfcc, n_labels)
+
+def write_npz(path, arrays):
+    """Write arrays to an .npz atomically, so the labelers never see a half-written file."""
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'wb') as f:
+        np.savez_compressed(f, **arrays)
+    os.replace(tmp, path)
+
+def song_features(wav_path, cache=None, stems_dir="stems"):
+    """
+    Whole-song label-aligned MFCCs and rhythm matrix, through the feature cache.
+
+    Args:
+        wav_path (str or Path): Song audio
+        cache (FeatureCache): Cache to read and fill (default: feature_cache/)
+        stems_dir (str or Path): Directory of spleeter stems (optional)
+
+    Returns:
+        tuple: (mfcc (frames, N_MFCC), rhythm (frames, len(RHYTHM_COLUMNS))), one frame per label interval
+    """
+    from feature_cache import FeatureCache, load_audio
+    from rhythm_features import RHYTHM_COLUMNS, RHYTHM_VERSION, find_stems, rhythm_features
+
+    cache = cache or FeatureCache()
+    y, sr = load_audio(wav_path, sr=SAMPLE_RATE, cache=cache)
+    mfcc = cache.get_or_compute(wav_path, 'mfcc', lambda: label_aligned_mfcc(y, sr), sr,
+                                label_hop(sr), n_mfcc=N_MFCC, n_fft=N_FFT, top_db=None)
+
+    stem_paths = find_stems(Path(wav_path).stem, stems_dir)
+    def compute_rhythm():
+        stems = {stem: load_audio(path, sr=sr, cache=cache)[0] for stem, path in stem_paths.items()}
+        return rhythm_features(y, sr, n_labels=len(y) // label_hop(sr), stems=stems)
+    rhythm = cache.get_or_compute(wav_path, 'rhythm', compute_rhythm, sr, label_hop(sr), columns=RHYTHM_COLUMNS,
+                                  version=RHYTHM_VERSION,
+                                  stems={stem: cache.audio_hash(path) for stem, path in stem_paths.items()})
+    return mfcc, rhythm
+
+def extract_song(wav_path, labels_dir, force=False, cache_dir=None, stems_dir="stems"):
+    """
+    Add label-aligned MFCCs and the rhythm feature matrix (see rhythm_features.py)
+    to one song's .mfcc_labels.npz.
+
+    Songs labelled with tk.py (.labels.npz) get a new .mfcc_labels.npz with
+    their labels and the MFCCs; the embedded waveform isn't copied.
+
+    Decoded audio and MFCCs come from the feature cache when available.
+
+    Returns:
+        tuple: (song name, status message)
+    """
+    from feature_cache import FeatureCache
+    from label_io import find_label_file
+    from rhythm_features import RHYTHM_COLUMNS
+
+    name = Path(wav_path).stem
+    try:
+        label_path = find_label_file(name, labels_dir)
+    except FileNotFoundError:
+        return name, "⏭️  no labels"
+
+    with np.load(label_path) as data:
+        arrays = {k: data[k] for k in data.files if k not in ('waveform', 'sample_rate')}
+    n_labels = len(arrays['pattern_labels'])
+    complete = all(k in arrays and len(arrays[k]) == n_labels for k in ('mfcc', 'rhythm'))
+    if not force and complete and tuple(arrays['rhythm_columns']) == RHYTHM_COLUMNS:
+        return name, "⏭️  already extracted"
+
+    started = time.perf_counter()
+    cache = FeatureCache(cache_dir) if cache_dir else FeatureCache()
+    # Cached for the whole song, then fitted to this label file's length
+    mfcc, rhythm = song_features(wav_path, cache, stems_dir)
+    arrays['mfcc'] = fit_to_labels(np.asarray(mfcc), n_labels)
+    arrays['rhythm'] = fit_to_labels(np.asarray(rhythm), n_labels)
+    arrays['rhythm_columns'] = np.array(RHYTHM_COLUMNS)
+
+    output_path = Path(labels_dir) / f"{name}.mfcc_labels.npz"
+    write_npz(output_path, arrays)
+    return name, f"✅ {n_labels} frames in {time.perf_counter() - started:.1f}s"
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract label-aligned MFCC and rhythm features for every labelled song.")
+    parser.add_argument('--wavs', default="playlist_wavs", help="Directory of song .wav files")
+    parser.add_argument('--labels', default="labels", help="Directory of label files")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Worker processes")
+    parser.add_argument('--force', action='store_true', help="Re-extract songs that already have MFCCs")
+    parser.add_argument('--stems', default="stems", help="Directory of spleeter stems (optional)")
+    parser.add_argument('--cache', default="feature_cache", help="Feature cache directory")
+    args = parser.parse_args()
+
+    # Label file lookup is shared with playback in the repo root's label_io
+    sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+    wavs = sorted(Path(args.wavs).glob("*.wav"))
+    print(f"🎵 Extracting features for {len(wavs)} songs on {args.workers} workers...")
+
+    started = time.perf_counter()
+    failed = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(extract_song, wav, args.labels, args.force, args.cache, args.stems): wav for wav in wavs}
+        for future in as_completed(futures):
+            try:
+                name, status = future.result()
+                print(f"{status}: {name}")
+            except Exception as e:
+                failed += 1
+                print(f"❌ {futures[future].stem}: {e}")
+
+    print(f"\n🎉 Done in {time.perf_counter() - started:.0f}s ({failed} failed)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+# === Feature Cache ===
+# On-disk cache of decoded audio and audio features, shared by
+# extract_features.py, infer.py and the labelers, so each song is decoded and
+# analysed once. Entries are plain .npy files named by a content hash of the
+# audio and the feature settings; reads are memory-mapped, and the least
+# recently used entries are deleted once the cache outgrows its size bound.
+#
+#   cache = FeatureCache("feature_cache")
+#   mfcc = cache.get_or_compute(wav_path, 'mfcc', compute_mfcc, sr)
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+
+# Shared by extract_features.py and the labelers (run from labeling/)
+DEFAULT_CACHE_DIR = Path("feature_cache")
+DEFAULT_MAX_BYTES = 4 * 1024 ** 3
+
+def _atomic_write(path, write):
+    """Write through write(file) to a temp file, then move it into place."""
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, 'wb') as f:
+        write(f)
+    os.replace(tmp, path)
+
+class FeatureCache:
+    """
+    Decoded audio and audio features stored as uncompressed .npy files.
+
+    Entries are keyed by a hash of the audio file's contents plus everything
+    that affects the result (sample rate, feature type, hop, parameters), so
+    renaming or moving a song still hits, and editing it misses. Reads are
+    memory-mapped. The least recently used entries are evicted once the cache
+    grows past max_bytes.
+    """
+    def __init__(self, root=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.root.mkdir(parents=True, exist_ok=True)
+        (self.root / "hashes").mkdir(exist_ok=True)
+
+    # === Keys ===
+
+    def audio_hash(self, audio_path):
+        """
+        SHA-256 of an audio file's contents.
+
+        The digest is remembered per (path, size, mtime), so an unchanged file
+        is only read once.
+        """
+        path = Path(audio_path).resolve()
+        stat = path.stat()
+        stamp = f"{stat.st_size} {stat.st_mtime_ns}"
+        memo = self.root / "hashes" / hashlib.sha1(str(path).encode()).hexdigest()
+        if memo.exists():
+            saved_stamp, _, digest = memo.read_text().rpartition(' ')
+            if saved_stamp == stamp:
+                return digest
+
+        sha = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                sha.update(block)
+        digest = sha.hexdigest()
+        _atomic_write(memo, lambda f: f.write(f"{stamp} {digest}".encode()))
+        return digest
+
+    def key(self, audio_path, feature, sr, hop=None, **params):
+        """Cache key for a feature of an audio file."""
+        spec = json.dumps([self.audio_hash(audio_path), feature, sr, hop, params], sort_keys=True)
+        return f"{feature}-{hashlib.sha256(spec.encode()).hexdigest()[:32]}"
+
+    # === Entries ===
+
+    def get(self, key):
+        """
+        Cached array, memory-mapped read-only, or None on a miss.
+        A hit marks the entry as recently used.
+        """
+        path = self.root / f"{key}.npy"
+        try:
+            array = np.load(path, mmap_mode='r')
+        except (FileNotFoundError, ValueError):
+            return None
+        os.utime(path)
+        return array
+
+    def put(self, key, array):
+        """Store an array, evicting old entries if the cache is over its size bound."""
+        path = self.root / f"{key}.npy"
+        _atomic_write(path, lambda f: np.save(f, np.ascontiguousarray(array)))
+        self.evict(keep=path)
+        return np.load(path, mmap_mode='r')
+
+    def get_or_compute(self, audio_path, feature, compute, sr, hop=None, **params):
+        """
+        Cached feature, computing and storing it on a miss.
+
+        Args:
+            audio_path (str or Path): Audio file the feature is computed from
+            feature (str): Feature type, e.g. "mfcc"
+            compute (callable): Returns the array on a miss
+            sr (int): Sample rate the feature is computed at
+            hop (int): Hop length in samples, if the feature is framed
+            **params: Any other settings that change the result
+        """
+        key = self.key(audio_path, feature, sr, hop, **params)
+        array = self.get(key)
+        if array is None:
+            array = self.put(key, compute())
+        return array
+
+    def evict(self, keep=None):
+        """Delete least recently used entries (never keep) until the cache fits in max_bytes."""
+        entries = []
+        for entry in os.scandir(self.root):
+            if entry.name.endswith('.npy') and entry.path != str(keep):
+                stat = entry.stat()
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries) + (Path(keep).stat().st_size if keep else 0)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass  # Evicted by another process
+            except OSError:
+                continue  # Still mapped by a reader (Windows); try again next time
+            total -= size
+
+    def size(self):
+        """Bytes used by cached arrays."""
+        return sum(e.stat().st_size for e in os.scandir(self.root) if e.name.endswith('.npy'))
+
+def load_audio(audio_path, sr=22050, cache=None):
+    """
+    Cached drop-in for librosa.load(audio_path, sr=sr): mono float32 audio
+    and its sample rate, decoded and resampled only on the first call.
+
+    Returns:
+        tuple: (memory-mapped audio, sr)
+    """
+    cache = cache or FeatureCache()
+
+    def decode():
+        import librosa
+        y, _ = librosa.load(audio_path, sr=sr, mono=True)
+        return y.astype(np.float32)
+
+    return cache.get_or_compute(audio_path, 'audio', decode, sr), sr
@@ -0,0 +1,134 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import numpy as np
+
+from build_dataset import FEATURE_COLUMNS
+from decode import DEFAULT_MIN_DURATION, DEFAULT_SWITCH_PENALTY, smooth_labels
+from extract_features import LABELS_PER_SECOND, song_features, write_npz
+from models import FrameModel
+from rhythm_features import RHYTHM_COLUMNS
+
+# Model loaded once per worker process by _init_worker
+_model = None
+
+def load_model(model_path):
+    """Load a checkpoint from train.py, checking it was trained on this feature layout."""
+    model = FrameModel.load(model_path)
+    if model.columns != FEATURE_COLUMNS:
+        raise ValueError(f"{model_path} was trained on different feature columns; retrain it")
+    return model
+
+def predict_labels(model, mfcc, rhythm, smooth=True, switch_penalty=DEFAULT_SWITCH_PENALTY,
+                   min_duration=DEFAULT_MIN_DURATION):
+    """
+    Per-frame speed and pattern labels for one song.
+
+    Args:
+        model (FrameModel): Trained model
+        mfcc (np.ndarray): (frames, N_MFCC) label-aligned MFCCs
+        rhythm (np.ndarray): (frames, len(RHYTHM_COLUMNS)) rhythm matrix
+        smooth (bool): Decode stable runs with decode.smooth_labels; otherwise
+            take each frame's most likely class (which flickers)
+        switch_penalty (float): Viterbi cost of changing label
+        min_duration (int): Shortest run in frames
+
+    Returns:
+        tuple: (pattern_labels, speed_labels, probabilities dict)
+    """
+    n = min(len(mfcc), len(rhythm))
+    features = np.hstack((mfcc[:n], rhythm[:n])).astype(np.float32)
+    probs = model.predict_song(features)
+    if smooth:
+        labels = {head: smooth_labels(p, switch_penalty, min_duration) for head, p in probs.items()}
+    else:
+        labels = {head: p.argmax(axis=1) for head, p in probs.items()}
+    return labels['pattern'], labels['speed'], probs
+
+def label_song(wav_path, model, out_dir="predicted_labels", force=False, cache_dir=None, stems_dir="stems",
+               **decoding):
+    """
+    Predict labels for one song and write <out_dir>/<song>.mfcc_labels.npz, the
+    file lasersFromLabels.load_mfcc_and_labels reads (mfcc, pattern_labels,
+    speed_labels), plus the rhythm matrix so the file can be used like any
+    extracted label file. Extra keyword arguments go to predict_labels.
+
+    Returns:
+        tuple: (song name, status message)
+    """
+    from feature_cache import FeatureCache
+
+    name = Path(wav_path).stem
+    output_path = Path(out_dir) / f"{name}.mfcc_labels.npz"
+    if output_path.exists() and not force:
+        return name, "⏭️  already labelled"
+
+    started = time.perf_counter()
+    cache = FeatureCache(cache_dir) if cache_dir else FeatureCache()
+    mfcc, rhythm = song_features(wav_path, cache, stems_dir)
+    features_done = time.perf_counter()
+    patterns, speeds, _ = predict_labels(model, mfcc, rhythm, **decoding)
+    n = len(patterns)
+
+    write_npz(output_path, {
+        'mfcc': np.asarray(mfcc[:n]),
+        'rhythm': np.asarray(rhythm[:n]),
+        'rhythm_columns': np.array(RHYTHM_COLUMNS),
+        'pattern_labels': patterns.astype(int),
+        'speed_labels': speeds.astype(int),
+    })
+    elapsed = time.perf_counter() - started
+    return name, (f"✅ {n} frames in {elapsed:.2f}s ({n / LABELS_PER_SECOND / elapsed:.0f}× real time, "
+                  f"inference {time.perf_counter() - features_done:.2f}s)")
+
+def _init_worker(model_path):
+    global _model
+    _model = load_model(model_path)
+
+def _label_in_worker(wav_path, out_dir, force, cache_dir, stems_dir, decoding):
+    return label_song(wav_path, _model, out_dir, force, cache_dir, stems_dir, **decoding)
+
+def main():
+    parser = argparse.ArgumentParser(description="Label songs with a trained model (no Tk tool needed).")
+    parser.add_argument('audio', nargs='*', help="Audio files (default: every .wav in --wavs)")
+    parser.add_argument('--model', default="models/conv.npz", help="Checkpoint written by train.py")
+    parser.add_argument('--wavs', default="playlist_wavs", help="Directory of song .wav files")
+    parser.add_argument('--out', default="predicted_labels",
+                        help="Output directory (kept apart from hand labels so they are never overwritten)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Worker processes")
+    parser.add_argument('--force', action='store_true', help="Relabel songs that already have output")
+    parser.add_argument('--stems', default="stems", help="Directory of spleeter stems (optional)")
+    parser.add_argument('--cache', default="feature_cache", help="Feature cache directory")
+    parser.add_argument('--switch-penalty', type=float, default=DEFAULT_SWITCH_PENALTY,
+                        help="Smoothing: log-probability cost of changing label")
+    parser.add_argument('--min-duration', type=int, default=DEFAULT_MIN_DURATION,
+                        help="Smoothing: shortest label run, in frames")
+    parser.add_argument('--raw', action='store_true', help="Write unsmoothed per-frame predictions")
+    args = parser.parse_args()
+    decoding = {'smooth': not args.raw, 'switch_penalty': args.switch_penalty, 'min_duration': args.min_duration}
+
+    load_model(args.model)  # fail fast on a bad checkpoint
+    Path(args.out).mkdir(parents=True, exist_ok=True)
+    wavs = [Path(p) for p in args.audio] or sorted(Path(args.wavs).glob("*.wav"))
+    print(f"🎵 Labelling {len(wavs)} songs with {args.model} on {args.workers} workers...")
+
+    started = time.perf_counter()
+    failed = 0
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker, initargs=(args.model,)) as pool:
+        futures = {pool.submit(_label_in_worker, wav, args.out, args.force, args.cache, args.stems, decoding): wav
+                   for wav in wavs}
+        for future in as_completed(futures):
+            try:
+                name, status = future.result()
+                print(f"{status}: {name}")
+            except Exception as e:
+                failed += 1
+                print(f"❌ {futures[future].stem}: {e}")
+
+    print(f"\n🎉 Done in {time.perf_counter() - started:.0f}s ({failed} failed)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+import json
+
+import numpy as np
+
+# Output heads: label name -> number of classes (speed_labels 0-9, pattern_labels 0-8)
+HEADS = {'speed': 10, 'pattern': 9}
+
+def softmax(logits):
+    z = logits - logits.max(axis=1, keepdims=True)
+    e = np.exp(z)
+    return e / e.sum(axis=1, keepdims=True)
+
+class Adam:
+    """Adam optimizer over a dict of NumPy parameter arrays (updated in place)."""
+    def __init__(self, params, lr=1e-3, beta1=0.9, beta2=0.999, eps=1e-8, weight_decay=1e-4):
+        self.params = params
+        self.lr, self.beta1, self.beta2, self.eps = lr, beta1, beta2, eps
+        self.weight_decay = weight_decay
+        self.m = {k: np.zeros_like(v) for k, v in params.items()}
+        self.v = {k: np.zeros_like(v) for k, v in params.items()}
+        self.t = 0
+
+    def step(self, grads):
+        self.t += 1
+        correction = np.sqrt(1 - self.beta2 ** self.t) / (1 - self.beta1 ** self.t)
+        for k, g in grads.items():
+            if k.startswith('W'):
+                g = g + self.weight_decay * self.params[k]
+            self.m[k] *= self.beta1
+            self.m[k] += (1 - self.beta1) * g
+            self.v[k] *= self.beta2
+            self.v[k] += (1 - self.beta2) * g * g
+            self.params[k] -= self.lr * correction * self.m[k] / (np.sqrt(self.v[k]) + self.eps)
+
+    def state(self):
+        """Step count and moment estimates as named arrays, for a checkpoint."""
+        arrays = {'adam_t': np.array(self.t)}
+        arrays.update({f'adam_m.{k}': m for k, m in self.m.items()})
+        arrays.update({f'adam_v.{k}': v for k, v in self.v.items()})
+        return arrays
+
+    def load_state(self, arrays):
+        """Continue from state() saved by an earlier run."""
+        self.t = int(arrays['adam_t'])
+        for k in self.m:
+            self.m[k] = np.array(arrays[f'adam_m.{k}'], dtype=self.m[k].dtype)
+            self.v[k] = np.array(arrays[f'adam_v.{k}'], dtype=self.v[k].dtype)
+
+class FrameModel:
+    """
+    Classifies the speed and pattern label of the centre frame of a context
+    window. Subclasses define the trunk; both heads share it.
+
+    Inputs are (batch, window, features) arrays of raw features; the model
+    standardises them with the training set's mean and std.
+    """
+    kind = None
+
+    def __init__(self, n_features, window, mean=None, std=None, columns=(), seed=0, **hyper):
+        self.n_features = n_features
+        self.window = window
+        self.mean = np.zeros(n_features, np.float32) if mean is None else np.asarray(mean, np.float32)
+        self.std = np.ones(n_features, np.float32) if std is None else np.asarray(std, np.float32)
+        self.columns = tuple(columns)
+        self.hyper = hyper
+        self.rng = np.random.default_rng(seed)
+        self.params = {}
+        self.init_params(**hyper)
+
+    def dense(self, name, n_in, n_out):
+        """He-initialised weights W<name> and zero biases b<name>."""
+        self.params[f'W{name}'] = (self.rng.normal(size=(n_in, n_out)) * np.sqrt(2 / n_in)).astype(np.float32)
+        self.params[f'b{name}'] = np.zeros(n_out, np.float32)
+
+    def init_params(self, **hyper):
+        raise NotImplementedError
+
+    def trunk(self, X):
+        """(batch, window, features) standardised -> ((batch, hidden), cache)."""
+        raise NotImplementedError
+
+    def trunk_backward(self, cache, dH):
+        """Gradients of the trunk parameters from d loss / d trunk output."""
+        raise NotImplementedError
+
+    def forward(self, X):
+        Xs = (X - self.mean) / self.std
+        H, cache = self.trunk(Xs)
+        logits = {head: H @ self.params[f'W{head}'] + self.params[f'b{head}'] for head in HEADS}
+        return logits, (H, cache)
+
+    def loss_and_grads(self, X, targets):
+        """
+        Summed cross-entropy of both heads and its gradients.
+
+        Args:
+            X (np.ndarray): (batch, window, features)
+            targets (dict): head -> (batch,) class indices
+
+        Returns:
+            tuple: (loss, grads dict, probabilities dict)
+        """
+        logits, (H, cache) = self.forward(X)
+        batch = len(X)
+        loss = 0.0
+        grads = {}
+        dH = np.zeros_like(H)
+        probs = {}
+        for head, z in logits.items():
+            p = softmax(z)
+            probs[head] = p
+            y = targets[head]
+            loss += float(-np.log(p[np.arange(batch), y] + 1e-9).mean())
+            dz = p.copy()
+            dz[np.arange(batch), y] -= 1
+            dz /= batch
+            grads[f'W{head}'] = H.T @ dz
+            grads[f'b{head}'] = dz.sum(axis=0)
+            dH += dz @ self.params[f'W{head}'].T
+        grads.update(self.trunk_backward(cache, dH))
+        return loss, grads, probs
+
+    def predict_proba(self, X, chunk=4096):
+        """Class probabilities per head for (n, window, features) windows, in chunks."""
+        out = {head: np.empty((len(X), n), np.float32) for head, n in HEADS.items()}
+        for i in range(0, len(X), chunk):
+            logits, _ = self.forward(np.asarray(X[i:i + chunk], dtype=np.float32))
+            for head, z in logits.items():
+                out[head][i:i + chunk] = softmax(z)
+        return out
+
+    def predict_song(self, features, chunk=4096):
+        """
+        Class probabilities for every frame of a song.
+
+        The song is edge-padded by window // 2 frames at both ends so edge
+        frames get a full window; windows are strided views of that copy.
+
+        Returns:
+            dict: head -> (frames, classes) probabilities
+        """
+        half = self.window // 2
+        padded = np.pad(np.asarray(features, np.float32), ((half, half), (0, 0)), mode='edge')
+        windows = np.lib.stride_tricks.sliding_window_view(padded, self.window, axis=0).transpose(0, 2, 1)
+        return self.predict_proba(windows, chunk=chunk)
+
+    def save(self, path, extra=None):
+        """Write a checkpoint; `extra` arrays (e.g. optimizer state) are stored alongside and ignored by load()."""
+        meta = {'kind': self.kind, 'n_features': self.n_features, 'window': self.window,
+                'columns': list(self.columns), 'hyper': self.hyper}
+        np.savez(path, meta=json.dumps(meta), mean=self.mean, std=self.std, **self.params, **(extra or {}))
+
+    @staticmethod
+    def load(path):
+        with np.load(path) as data:
+            meta = json.loads(str(data['meta']))
+            model = MODELS[meta['kind']](meta['n_features'], meta['window'], data['mean'], data['std'],
+                                         meta['columns'], **meta['hyper'])
+            for name in model.params:
+                model.params[name] = data[name]
+        return model
+
+class LinearBaseline(FrameModel):
+    """
+    Logistic regression on a window summary: the centre frame plus the mean
+    and standard deviation of every feature over the window.
+    """
+    kind = 'linear'
+
+    def init_params(self):
+        for head, n in HEADS.items():
+            self.dense(head, 3 * self.n_features, n)
+
+    def trunk(self, X):
+        centre = X[:, self.window // 2]
+        return np.hstack((centre, X.mean(axis=1), X.std(axis=1))), None
+
+    def trunk_backward(self, cache, dH):
+        return {}
+
+class TemporalConv(FrameModel):
+    """
+    Small 1-D CNN over the window: one convolution along time with ReLU,
+    mean and max pooling over time, and a hidden layer shared by both heads.
+    """
+    kind = 'conv'
+
+    def init_params(self, kernel=5, channels=32, hidden=64):
+        self.kernel, self.channels = kernel, channels
+        self.dense('conv', kernel * self.n_features, channels)
+        self.dense('hidden', 2 * channels, hidden)
+        for head, n in HEADS.items():
+            self.dense(head, hidden, n)
+
+    def trunk(self, X):
+        batch = len(X)
+        # (batch, steps, kernel * features) patches; the reshape copies once
+        patches = np.lib.stride_tricks.sliding_window_view(X, self.kernel, axis=1)
+        patches = patches.transpose(0, 1, 3, 2).reshape(batch, -1, self.kernel * self.n_features)
+        conv = patches @ self.params['Wconv'] + self.params['bconv']
+        act = np.maximum(conv, 0)
+        argmax = act.argmax(axis=1)
+        pooled = np.hstack((act.mean(axis=1), act.max(axis=1)))
+        pre = pooled @ self.params['Whidden'] + self.params['bhidden']
+        H = np.maximum(pre, 0)
+        return H, (patches, conv, argmax, pooled, pre)
+
+    def trunk_backward(self, cache, dH):
+        patches, conv, argmax, pooled, pre = cache
+        batch, steps, _ = conv.shape
+        dpre = dH * (pre > 0)
+        grads = {'Whidden': pooled.T @ dpre, 'bhidden': dpre.sum(axis=0)}
+        dpooled = dpre @ self.params['Whidden'].T
+
+        c = self.channels
+        dact = np.broadcast_to(dpooled[:, None, :c] / steps, conv.shape).copy()
+        rows = np.arange(batch)[:, None]
+        dact[rows, argmax, np.arange(c)[None, :]] += dpooled[:, c:]
+        dconv = dact * (conv > 0)
+
+        flat = dconv.reshape(-1, c)
+        grads['Wconv'] = patches.reshape(-1, patches.shape[2]).T @ flat
+        grads['bconv'] = flat.sum(axis=0)
+        return grads
+
+MODELS = {cls.kind: cls for cls in (LinearBaseline, TemporalConv)}
@@ -0,0 +1,154 @@
+from pathlib import Path
+
+import numpy as np
+
+from extract_features import LABELS_PER_SECOND, SAMPLE_RATE, fit_to_labels, label_hop
+
+# Analysis frames per label frame (2205 / 441 at 22050 Hz)
+SUBFRAMES = 5
+N_FFT = 2048
+
+# Bumped when a column's computation changes, so cached rhythm matrices are recomputed
+RHYTHM_VERSION = 2
+
+# Beats either side of a label frame that its local tempo is measured over
+TEMPO_BEATS = 4
+
+# Stems written by spleeter's 2stems model (spleeter/separate_one.py)
+STEM_NAMES = ('vocals', 'accompaniment')
+
+# Column order of the rhythm matrix; the schema is the same for every song
+RHYTHM_COLUMNS = (
+    'rms',             # loudness over the label interval
+    'onset_strength',  # mean onset envelope
+    'spectral_flux',   # mean positive change of the log-magnitude spectrum
+    'beat',            # 1 if a tracked beat falls in the interval
+    'beat_phase',      # 0-1 position between the surrounding beats at the interval centre
+    'tempo',           # local tempo estimate (BPM) from the spacing of nearby beats
+) + tuple(f'{name}_rms' for name in STEM_NAMES) + (
+    'stems_present',   # 1 if every stem was given with audio in it, 0 if stem columns are zero-filled
+)
+
+def interval_rms(y, hop, n_labels):
+    """RMS of each label interval, exactly hop samples long."""
+    samples = np.zeros(n_labels * hop, dtype=np.float32)
+    used = min(len(y), len(samples))
+    samples[:used] = y[:used]
+    return np.sqrt(np.mean(samples.reshape(n_labels, hop) ** 2, axis=1))
+
+def pool_subframes(values, n_labels):
+    """Average SUBFRAMES consecutive analysis frames into each label frame."""
+    values = fit_to_labels(np.asarray(values, dtype=np.float32)[:, None], n_labels * SUBFRAMES)[:, 0]
+    return values.reshape(n_labels, SUBFRAMES).mean(axis=1)
+
+def beat_tempo(beat_times, times, beats=TEMPO_BEATS):
+    """
+    Local tempo at each time from the tracked beats around it.
+
+    The onset envelope's frame rate (50 frames/s) only allows tempogram
+    lags that read e.g. 125 or 130.4 BPM for a 128 BPM track; the mean beat
+    interval over several beats averages the beat times' quantisation out.
+
+    Args:
+        beat_times (np.ndarray): Sorted beat times in seconds (at least 2)
+        times (np.ndarray): Times to estimate the tempo at
+        beats (int): Beats to use on either side of each time
+
+    Returns:
+        np.ndarray: Tempo in BPM at each time
+    """
+    after = np.searchsorted(beat_times, times, side='right')
+    first = np.clip(after - beats, 0, len(beat_times) - 2)
+    last = np.clip(after + beats - 1, first + 1, len(beat_times) - 1)
+    return 60.0 * (last - first) / np.maximum(beat_times[last] - beat_times[first], 1e-6)
+
+def find_stems(song, stems_dir):
+    """
+    Stem files for a song, as {stem name: path}.
+
+    spleeter writes stems/<song>/ (or stems/<song>_44k/ after separate_one.py's
+    resampling step) containing vocals.wav and accompaniment.wav.
+    """
+    for folder in (Path(stems_dir) / song, Path(stems_dir) / f"{song}_44k"):
+        stems = {name: folder / f"{name}.wav" for name in STEM_NAMES if (folder / f"{name}.wav").exists()}
+        if stems:
+            return stems
+    return {}
+
+def rhythm_features(y, sr=SAMPLE_RATE, n_labels=None, stems=None, labels_per_second=LABELS_PER_SECOND,
+                    beats=True):
+    """
+    Rhythm and energy features on the label grid.
+
+    Args:
+        y (np.ndarray): Mono audio
+        sr (int): Sample rate of y (and of the stem audio)
+        n_labels (int): Label frames (defaults to whole label intervals in y)
+        stems (dict): Stem name -> mono audio at sr, for the *_rms columns
+        labels_per_second (int): Label rate
+        beats (bool): Track beats for the beat, beat_phase and tempo columns; False
+            leaves them zero, for callers that only need the per-frame columns
+
+    Returns:
+        np.ndarray: (n_labels, len(RHYTHM_COLUMNS)) float32, columns in RHYTHM_COLUMNS order
+    """
+    import librosa
+
+    hop = label_hop(sr, labels_per_second)
+    if n_labels is None:
+        n_labels = len(y) // hop
+    sub_hop = hop // SUBFRAMES
+    y = np.asarray(y, dtype=np.float32)
+
+    # One STFT shared by onset strength and spectral flux
+    magnitude = np.abs(librosa.stft(y, n_fft=N_FFT, hop_length=sub_hop))
+    mel_db = librosa.power_to_db(librosa.feature.melspectrogram(S=magnitude ** 2, sr=sr))
+    onset_env = librosa.onset.onset_strength(S=mel_db, sr=sr, hop_length=sub_hop)
+
+    log_mag = np.log1p(magnitude)
+    flux = np.concatenate(([0.0], np.maximum(np.diff(log_mag, axis=1), 0).sum(axis=0)))
+
+    # Beats from the onset envelope; local tempo from their spacing
+    beat_times = np.zeros(0)
+    if beats:
+        _, beat_frames = librosa.beat.beat_track(onset_envelope=onset_env, sr=sr, hop_length=sub_hop)
+        beat_times = np.asarray(beat_frames) * sub_hop / sr
+
+    label_index = np.arange(n_labels)
+    beat = np.bincount(np.minimum((beat_times * labels_per_second).astype(np.int64), n_labels),
+                       minlength=n_labels + 1)[:n_labels] > 0
+    centres = (label_index + 0.5) / labels_per_second
+    beat_phase = np.zeros(n_labels, dtype=np.float32)
+    if len(beat_times) >= 2:
+        after = np.searchsorted(beat_times, centres, side='right')
+        inside = (after > 0) & (after < len(beat_times))
+        prev_beat = beat_times[np.maximum(after - 1, 0)]
+        next_beat = beat_times[np.minimum(after, len(beat_times) - 1)]
+        span = np.maximum(next_beat - prev_beat, 1e-6)
+        beat_phase = np.where(inside, (centres - prev_beat) / span, 0.0)
+        tempo = beat_tempo(beat_times, centres)
+    elif not beats:
+        tempo = np.zeros(n_labels, dtype=np.float32)
+    else:
+        # Too few beats to space out; fall back to the tempogram
+        tempo = pool_subframes(librosa.feature.tempo(onset_envelope=onset_env, sr=sr, hop_length=sub_hop,
+                                                     aggregate=None), n_labels)
+
+    columns = [
+        interval_rms(y, hop, n_labels),
+        pool_subframes(onset_env, n_labels),
+        pool_subframes(flux, n_labels),
+        beat,
+        beat_phase,
+        tempo,
+    ]
+    stems = stems or {}
+    for name in STEM_NAMES:
+        stem = stems.get(name)
+        columns.append(interval_rms(stem, hop, n_labels) if stem is not None else np.zeros(n_labels))
+    # A missing or silent (all-zero) stem leaves its column zero-filled
+    present = all(stems.get(name) is not None and np.any(stems[name]) for name in STEM_NAMES)
+    columns.append(np.full(n_labels, float(present)))
+
+    # One contiguous float32 matrix per song
+    return np.ascontiguousarray(np.column_stack(columns), dtype=np.float32)
@@ -0,0 +1,156 @@
+import argparse
+import time
+from pathlib import Path
+
+import numpy as np
+
+from extract_features import LABELS_PER_SECOND, N_FFT, N_MFCC, SAMPLE_RATE, label_hop
+
+# Samples read from disk per block (at the file's own rate)
+BLOCK_SIZE = 1 << 16
+
+class LabelFramer:
+    """
+    Turns audio pushed in blocks of any size into label-aligned MFCC frames.
+
+    Frame i analyses the n_fft samples centred on label interval i (the same
+    framing as extract_features.label_aligned_mfcc). Only the samples the
+    next frame still needs are kept between pushes, so memory stays at about
+    one window however long the audio is.
+
+    The MFCC matches librosa.feature.mfcc (periodic Hann window, power mel
+    spectrogram, dB, orthonormal DCT-II) except that dB values aren't clamped
+    to 80 dB below the song's loudest frame, which a stream can't know in
+    advance.
+    """
+    def __init__(self, sr=SAMPLE_RATE, labels_per_second=LABELS_PER_SECOND, n_mfcc=N_MFCC, n_fft=N_FFT):
+        import librosa
+        from scipy.signal import get_window
+
+        self.hop = label_hop(sr, labels_per_second)
+        self.n_fft = n_fft
+        self.n_mfcc = n_mfcc
+        self.window = get_window('hann', n_fft, fftbins=True).astype(np.float32)
+        self.mel_basis = librosa.filters.mel(sr=sr, n_fft=n_fft).astype(np.float32)
+
+        # Zeros before the first sample, so window 0 is centred on label interval 0
+        self.buffer = np.zeros((n_fft - self.hop) // 2, dtype=np.float32)
+        self.frames_done = 0
+
+    def _mfcc(self, frames):
+        from scipy.fft import dct
+
+        power = np.abs(np.fft.rfft(frames * self.window, axis=1)) ** 2
+        mel_db = 10 * np.log10(np.maximum(power @ self.mel_basis.T, 1e-10))
+        return dct(mel_db, type=2, norm='ortho', axis=1)[:, :self.n_mfcc].astype(np.float32)
+
+    def push(self, samples):
+        """
+        Add mono samples.
+
+        Returns:
+            np.ndarray: (frames, n_mfcc) for every window now complete (possibly none)
+        """
+        self.buffer = np.concatenate((self.buffer, np.asarray(samples, dtype=np.float32)))
+        count = (len(self.buffer) - self.n_fft) // self.hop + 1 if len(self.buffer) >= self.n_fft else 0
+        if not count:
+            return np.zeros((0, self.n_mfcc), dtype=np.float32)
+
+        windows = np.lib.stride_tricks.sliding_window_view(self.buffer, self.n_fft)[::self.hop][:count]
+        features = self._mfcc(windows)
+        self.buffer = self.buffer[count * self.hop:]
+        self.frames_done += count
+        return features
+
+    def flush(self, total_samples):
+        """
+        Frames still owed once the audio has ended, zero-padding the last windows.
+
+        Args:
+            total_samples (int): Samples pushed in all; the stream produces total_samples // hop frames
+
+        Returns:
+            np.ndarray: (frames, n_mfcc)
+        """
+        owed = total_samples // self.hop - self.frames_done
+        if owed <= 0:
+            return np.zeros((0, self.n_mfcc), dtype=np.float32)
+        pad = max(0, (owed - 1) * self.hop + self.n_fft - len(self.buffer))
+        return self.push(np.zeros(pad, dtype=np.float32))[:owed]
+
+def stream_label_mfcc(path, sr=SAMPLE_RATE, block_size=BLOCK_SIZE, **framer_args):
+    """
+    Label-rate MFCCs of an audio file of any length, read block by block.
+
+    Blocks are downmixed to mono and resampled to sr with a streaming soxr
+    resampler (the one librosa.load uses), so the frames line up with
+    extract_features.py.
+
+    Args:
+        path (str or Path): Audio file (anything soundfile reads)
+        sr (int): Analysis sample rate
+        block_size (int): Samples read per block
+        **framer_args: LabelFramer settings (labels_per_second, n_mfcc, n_fft)
+
+    Yields:
+        np.ndarray: (frames, n_mfcc) float32 chunks, in order
+    """
+    import soundfile as sf
+    import soxr
+
+    framer = LabelFramer(sr=sr, **framer_args)
+    file_rate = sf.info(str(path)).samplerate
+    resampler = soxr.ResampleStream(file_rate, sr, 1, dtype='float32', quality='HQ') \
+        if file_rate != sr else None
+
+    total = 0
+    for block in sf.blocks(str(path), blocksize=block_size, dtype='float32', always_2d=True):
+        mono = block.mean(axis=1)
+        if resampler is not None:
+            mono = resampler.resample_chunk(mono)
+        total += len(mono)
+        frames = framer.push(mono)
+        if len(frames):
+            yield frames
+
+    if resampler is not None:
+        tail = resampler.resample_chunk(np.zeros(0, dtype=np.float32), last=True)
+        total += len(tail)
+        frames = framer.push(tail)
+        if len(frames):
+            yield frames
+
+    frames = framer.flush(total)
+    if len(frames):
+        yield frames
+
+def main():
+    parser = argparse.ArgumentParser(description="Label-rate MFCCs for long mixes in constant memory.")
+    parser.add_argument('audio', help="Audio file (e.g. an hour-long DJ set)")
+    parser.add_argument('-o', '--output', help="Output .npy (default: <audio>.mfcc.npy)")
+    args = parser.parse_args()
+
+    import soundfile as sf
+
+    info = sf.info(args.audio)
+    n_labels = int(info.frames / info.samplerate * LABELS_PER_SECOND)
+    output = Path(args.output or Path(args.audio).with_suffix('.mfcc.npy'))
+    print(f"🎵 Streaming {info.duration / 60:.1f} min of audio → {n_labels} frames")
+
+    # Written straight to disk as chunks arrive
+    started = time.perf_counter()
+    out = np.lib.format.open_memmap(output, mode='w+', dtype=np.float32, shape=(n_labels, N_MFCC))
+    done = 0
+    for chunk in stream_label_mfcc(args.audio):
+        chunk = chunk[:n_labels - done]
+        out[done:done + len(chunk)] = chunk
+        done += len(chunk)
+    if 0 < done < n_labels:
+        out[done:] = out[done - 1]  # Edge-pad like fit_to_labels
+    out.flush()
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ Saved {output} in {elapsed:.1f}s ({info.duration / max(elapsed, 1e-9):.0f}x real time)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+import argparse
+import json
+import time
+from pathlib import Path
+
+import numpy as np
+
+from build_dataset import Dataset
+from models import HEADS, MODELS, Adam, FrameModel
+from window_sampler import WindowSampler
+
+def split_songs(n_songs, val_fraction=0.2, seed=0):
+    """Song indices for training and validation (whole songs, so no frame leaks across)."""
+    order = np.random.default_rng(seed).permutation(n_songs)
+    n_val = max(1, int(round(n_songs * val_fraction))) if n_songs > 1 else 0
+    return sorted(order[n_val:]), sorted(order[:n_val])
+
+def feature_stats(dataset, songs):
+    """Per-feature mean and std over the training songs, one shard at a time."""
+    total = np.zeros(len(dataset.columns))
+    total_sq = np.zeros(len(dataset.columns))
+    count = 0
+    for i in songs:
+        features = np.asarray(dataset.features[i], dtype=np.float64)
+        total += features.sum(axis=0)
+        total_sq += (features ** 2).sum(axis=0)
+        count += len(features)
+    mean = total / max(count, 1)
+    std = np.sqrt(np.maximum(total_sq / max(count, 1) - mean ** 2, 0)) + 1e-6
+    return mean.astype(np.float32), std.astype(np.float32)
+
+def evaluate(model, sampler):
+    """
+    Mean loss and per-head accuracy over every window of the sampler's songs.
+
+    Returns:
+        dict: 'loss' and '<head>_acc'
+    """
+    loss, correct, n = 0.0, {head: 0 for head in HEADS}, 0
+    for song in range(len(sampler.views)):
+        windows, patterns, speeds = sampler.song_windows(song)
+        targets = {'speed': speeds.astype(np.int64), 'pattern': patterns.astype(np.int64)}
+        probs = model.predict_proba(windows)
+        for head in HEADS:
+            p = probs[head][np.arange(len(windows)), targets[head]]
+            loss += float(-np.log(p + 1e-9).sum())
+            correct[head] += int((probs[head].argmax(axis=1) == targets[head]).sum())
+        n += len(windows)
+    metrics = {'loss': loss / max(n, 1)}
+    metrics.update({f'{head}_acc': correct[head] / max(n, 1) for head in HEADS})
+    return metrics
+
+def load_training_state(path):
+    """
+    Optimizer and loop state saved with a .last checkpoint, or None for
+    checkpoints written without it.
+
+    Returns:
+        tuple: (progress dict with epoch, stale, best_loss and sampler_rng; Adam state arrays)
+    """
+    with np.load(path) as data:
+        if 'progress' not in data.files:
+            return None
+        progress = json.loads(str(data['progress']))
+        adam = {name: data[name] for name in data.files if name.startswith('adam_')}
+    return progress, adam
+
+def train(dataset_dir="dataset", kind='conv', out="models", window=31, batch_size=256, epochs=30,
+          lr=1e-3, patience=4, balance=None, seed=0, resume=False, max_batches=None):
+    """
+    Train a FrameModel with mini-batch Adam, early stopping on validation loss
+    and a checkpoint after every epoch.
+
+    Checkpoints: <out>/<kind>.npz (best so far) and <out>/<kind>.last.npz (latest).
+    The latest also holds the Adam moments, epoch, early-stopping counter and
+    shuffling state, so --resume continues the run where it stopped.
+
+    Returns:
+        FrameModel: The best model
+    """
+    dataset = Dataset(dataset_dir)
+    train_songs, val_songs = split_songs(len(dataset), seed=seed)
+    print(f"📚 {len(dataset)} songs, {dataset.n_frames} frames: "
+          f"{len(train_songs)} for training, {len(val_songs)} for validation")
+
+    out = Path(out)
+    out.mkdir(parents=True, exist_ok=True)
+    best_path, last_path = out / f"{kind}.npz", out / f"{kind}.last.npz"
+
+    if resume and last_path.exists():
+        model = FrameModel.load(last_path)
+        print(f"↩️  Resuming from {last_path}")
+    else:
+        mean, std = feature_stats(dataset, train_songs)
+        model = MODELS[kind](len(dataset.columns), window, mean, std, dataset.columns, seed=seed)
+
+    sampler = WindowSampler(dataset, window=model.window, batch_size=batch_size, songs=train_songs,
+                            balance=balance, seed=seed, drop_last=True)
+    validation = WindowSampler(dataset, window=model.window, songs=val_songs or train_songs, prefetch=0)
+    optimizer = Adam(model.params, lr=lr)
+
+    best_loss, stale, first_epoch = np.inf, 0, 1
+    state = load_training_state(last_path) if resume and last_path.exists() else None
+    if state is not None:
+        progress, adam = state
+        optimizer.load_state(adam)
+        sampler.rng.bit_generator.state = progress['sampler_rng']
+        best_loss, stale, first_epoch = progress['best_loss'], progress['stale'], progress['epoch'] + 1
+        print(f"↩️  Continuing at epoch {first_epoch} (best val loss {best_loss:.3f}, {stale} stale epochs)")
+        if stale >= patience:
+            print(f"⏹️  That run had already stopped after {patience} epochs without improvement")
+            return FrameModel.load(best_path)
+    elif resume and best_path.exists():
+        # Checkpoint from before training state was saved: only replace the best if it's beaten
+        best_loss = evaluate(FrameModel.load(best_path), validation)['loss']
+    for epoch in range(first_epoch, epochs + 1):
+        started = time.perf_counter()
+        losses = []
+        for n, (X, patterns, speeds) in enumerate(sampler):
+            if max_batches and n >= max_batches:
+                break
+            loss, grads, _ = model.loss_and_grads(X, {'speed': speeds, 'pattern': patterns})
+            optimizer.step(grads)
+            losses.append(loss)
+
+        metrics = evaluate(model, validation)
+        improved = metrics['loss'] < best_loss
+        if improved:
+            best_loss, stale = metrics['loss'], 0
+            model.save(best_path)
+        else:
+            stale += 1
+        progress = {'epoch': epoch, 'stale': stale, 'best_loss': best_loss,
+                    'sampler_rng': sampler.rng.bit_generator.state}
+        model.save(last_path, extra={'progress': json.dumps(progress), **optimizer.state()})
+
+        print(f"Epoch {epoch}: train loss {np.mean(losses):.3f}, val loss {metrics['loss']:.3f}, "
+              f"speed acc {metrics['speed_acc']:.1%}, pattern acc {metrics['pattern_acc']:.1%} "
+              f"({time.perf_counter() - started:.1f}s){' ✓ saved' if improved else ''}")
+        if stale >= patience:
+            print(f"⏹️  No improvement for {patience} epochs, stopping")
+            break
+
+    return FrameModel.load(best_path)
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the speed/pattern frame classifiers on CPU.")
+    parser.add_argument('--dataset', default="dataset", help="Directory written by build_dataset.py")
+    parser.add_argument('--model', choices=sorted(MODELS), default='conv',
+                        help="'linear' (logistic regression baseline) or 'conv' (small temporal CNN)")
+    parser.add_argument('--out', default="models", help="Checkpoint directory")
+    parser.add_argument('--window', type=int, default=31, help="Context frames per window (odd)")
+    parser.add_argument('--batch-size', type=int, default=256)
+    parser.add_argument('--epochs', type=int, default=30)
+    parser.add_argument('--lr', type=float, default=1e-3)
+    parser.add_argument('--patience', type=int, default=4, help="Epochs without improvement before stopping")
+    parser.add_argument('--balance', choices=['speed', 'pattern'], help="Class-balance batches on this label")
+    parser.add_argument('--max-batches', type=int, help="Cap batches per epoch")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--resume', action='store_true', help="Continue from the last checkpoint")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    train(args.dataset, args.model, args.out, window=args.window, batch_size=args.batch_size,
+          epochs=args.epochs, lr=args.lr, patience=args.patience, balance=args.balance,
+          seed=args.seed, resume=args.resume, max_batches=args.max_batches)
+    print(f"🎉 Done in {(time.perf_counter() - started) / 60:.1f} min")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+import queue
+import threading
+
+import numpy as np
+
+class WindowSampler:
+    """
+    Mini-batches of context windows around label frames, for sequence models.
+
+    Each song's feature array is turned into a (frames - window + 1, window,
+    features) strided view once, so a window is never materialised until it
+    is put in a batch, and windows never span two songs. A window is a
+    contiguous run of rows of its song, so batches are gathered straight from
+    the song arrays by row index. Frames closer than window // 2 to either end
+    of a song are not used as centres.
+
+    Iterating yields (X, patterns, speeds): X is (batch, window, features)
+    float32 and the labels are those of each window's centre frame. With
+    prefetch, batches are assembled on a background thread into a small ring
+    of reused buffers; a batch stays valid until `prefetch + 1` further
+    batches have been taken (copy it to keep it longer).
+    """
+    def __init__(self, dataset, window=31, batch_size=256, songs=None, shuffle=True,
+                 balance=None, seed=None, prefetch=2, drop_last=False):
+        """
+        Args:
+            dataset: build_dataset.Dataset (or anything with features/patterns/speeds lists)
+            window (int): Frames per window (odd, centred on the labelled frame)
+            batch_size (int): Windows per batch
+            songs (list): Song indices to sample from (default all), e.g. a train split
+            shuffle (bool): Random order each epoch; otherwise song by song, in order
+            balance (str): 'pattern' or 'speed' to draw windows so every class of that
+                label is equally likely (with replacement); None for plain sampling
+            seed (int): Seed for shuffling and balancing
+            prefetch (int): Batches assembled ahead on a background thread (0 for none)
+            drop_last (bool): Skip the final short batch
+        """
+        if window % 2 == 0:
+            raise ValueError(f"window must be odd, got {window}")
+        self.window = window
+        self.batch_size = batch_size
+        self.shuffle = shuffle
+        self.balance = balance
+        self.prefetch = prefetch
+        self.drop_last = drop_last
+        self.rng = np.random.default_rng(seed)
+
+        songs = range(len(dataset.features)) if songs is None else songs
+        half = window // 2
+        self.features, self.views, self.patterns, self.speeds = [], [], [], []
+        song_ids, starts = [], []
+        for i in songs:
+            features = dataset.features[i]
+            if len(features) < window:
+                continue
+            # (frames - window + 1, features, window) -> (…, window, features); both are views
+            view = np.lib.stride_tricks.sliding_window_view(features, window, axis=0).transpose(0, 2, 1)
+            self.features.append(features)
+            self.views.append(view)
+            self.patterns.append(np.asarray(dataset.patterns[i][half:len(features) - half]))
+            self.speeds.append(np.asarray(dataset.speeds[i][half:len(features) - half]))
+            song_ids.append(np.full(len(view), len(self.views) - 1))
+            starts.append(np.arange(len(view)))
+
+        self.song_ids = np.concatenate(song_ids) if song_ids else np.zeros(0, dtype=np.int64)
+        self.starts = np.concatenate(starts) if starts else np.zeros(0, dtype=np.int64)
+        self.n_features = self.views[0].shape[2] if self.views else 0
+
+        if balance is not None:
+            labels = np.concatenate(self.patterns if balance == 'pattern' else self.speeds)
+            counts = np.bincount(labels)
+            weights = 1.0 / counts[labels]
+            self.weights = weights / weights.sum()
+
+    def __len__(self):
+        """Batches per epoch."""
+        full, rest = divmod(len(self.starts), self.batch_size)
+        return full + (rest > 0 and not self.drop_last)
+
+    def epoch_order(self):
+        """Window numbers (into song_ids/starts) for one epoch."""
+        n = len(self.starts)
+        if self.balance is not None:
+            return self.rng.choice(n, size=n, p=self.weights)
+        if self.shuffle:
+            return self.rng.permutation(n)
+        return np.arange(n)
+
+    def gather(self, chosen, out=None):
+        """
+        Copy the chosen windows into a (len(chosen), window, features) batch.
+
+        Windows are grouped by song so each song fills one contiguous slice of
+        the batch with a single np.take of its rows.
+
+        Returns:
+            tuple: (X, patterns, speeds)
+        """
+        chosen = chosen[np.argsort(self.song_ids[chosen], kind='stable')]
+        songs, starts = self.song_ids[chosen], self.starts[chosen]
+        if out is None:
+            out = np.empty((len(chosen), self.window, self.n_features), dtype=np.float32)
+        out = out[:len(chosen)]
+
+        patterns = np.empty(len(chosen), dtype=np.int64)
+        speeds = np.empty(len(chosen), dtype=np.int64)
+        rows = starts[:, None] + np.arange(self.window)
+        bounds = np.flatnonzero(np.diff(songs)) + 1
+        for a, b in zip(np.concatenate(([0], bounds)), np.concatenate((bounds, [len(chosen)]))):
+            song = songs[a]
+            np.take(self.features[song], rows[a:b], axis=0, out=out[a:b])
+            patterns[a:b] = self.patterns[song][starts[a:b]]
+            speeds[a:b] = self.speeds[song][starts[a:b]]
+        return out, patterns, speeds
+
+    def _batches(self, buffers=None):
+        order = self.epoch_order()
+        for n, i in enumerate(range(0, len(order), self.batch_size)):
+            chosen = order[i:i + self.batch_size]
+            if len(chosen) < self.batch_size and self.drop_last:
+                break
+            yield self.gather(chosen, buffers[n % len(buffers)] if buffers else None)
+
+    def __iter__(self):
+        if not self.prefetch:
+            yield from self._batches()
+            return
+
+        # Ring of prefetch + 2 buffers: one being filled, `prefetch` queued, one with the consumer
+        buffers = [np.empty((self.batch_size, self.window, self.n_features), dtype=np.float32)
+                   for _ in range(self.prefetch + 2)]
+        ready = queue.Queue(maxsize=self.prefetch)
+        stop = threading.Event()
+        done = object()
+
+        def send(item):
+            """Queue an item for the consumer; False once the consumer has stopped."""
+            while not stop.is_set():
+                try:
+                    ready.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce():
+            try:
+                for batch in self._batches(buffers):
+                    if not send(batch):
+                        return
+            except Exception as e:
+                send(e)  # Raised in the consumer instead of ending the epoch early
+                return
+            send(done)
+
+        worker = threading.Thread(target=produce, daemon=True)
+        worker.start()
+        try:
+            while True:
+                batch = ready.get()
+                if batch is done:
+                    break
+                if isinstance(batch, Exception):
+                    raise batch
+                yield batch
+        finally:
+            stop.set()
+            worker.join()
+
+    def song_windows(self, song):
+        """
+        All windows of one song in order, as a (frames - window + 1, window, features)
+        view (no copy), with the centre labels. For evaluation and inference.
+        """
+        return self.views[song], self.patterns[song], self.speeds[song]
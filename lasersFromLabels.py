@@ -1,230 +1,802 @@
 # === Imports and Initialization ===
+# Plays a labelled song on the laser. Usable as a library (ShowPlayer) or as a script:
+#   python lasersFromLabels.py one-three-nine --port COM3
+#   python lasersFromLabels.py one-three-nine --transport null --seed 7
+#   python lasersFromLabels.py --probe
+#
+# numpy, pyserial and the pattern modules are imported where they are first
+# needed, so --help and --probe start without loading them.
 
-import numpy as np  # For numerical operations and loading label arrays
+import argparse
+import json         # For reading keyframe automation files
+import random
+import sys
 import time         # For time delays and timing
-import random       # For randomness in pattern selection and movement
-import serial.tools.list_ports  # For detecting available serial ports (e.g., COM3)
-import serial
-from DMXClass import SimpleDMX  # Custom DMX control class for lighting via serial
+from pathlib import Path
 from threading import Thread, Lock, Event
-from pattern_functions import pattern_groups, reset_pattern_states
 
-# Seed the random number generator with the current time to ensure variability
-random.seed(time.time())
+from show_watchdog import StallWatchdog
 
-# === Shared State ===
-
-pattern_state = {
-    'func': None,
-    'speed': None
-}
-pattern_lock = Lock()
-stop_flag = Event()
+DEFAULT_PORT = "COM3"
+DEFAULT_LABELS_DIR = Path("labeling/labels")
 
 # === Check DMX Device ===
 
-def check_device():
+def check_device(port=DEFAULT_PORT):
     """
-    Checks if the DMX lighting controller is connected on COM3.
-    
+    Checks if the DMX lighting controller is connected on the given port.
+
+    Args:
+        port (str): Serial port name
+
     Returns:
-        bool: True if COM3 is found and available; False otherwise.
+        bool: True if the port is found and available; False otherwise.
     """
-    print("Checking for DMX device on COM3...")
-    
+    import serial
+    import serial.tools.list_ports  # For detecting available serial ports (e.g., COM3)
+
+    print(f"Checking for DMX device on {port}...")
+
     # List all available COM ports on the system
     ports = serial.tools.list_ports.comports()
-    
-    for port in ports:
-        if port.device == "COM3":
+
+    for found in ports:
+        if found.device == port:
             try:
-                # Attempt to open and immediately close the COM3 port to check availability
-                test_ser = serial.Serial('COM3', timeout=1)
+                # Attempt to open and immediately close the port to check availability
+                test_ser = serial.Serial(port, timeout=1)
                 test_ser.close()
-                print("✓ COM3 is ready")
+                print(f"✓ {port} is ready")
                 return True
             except serial.SerialException:
-                print("❌ COM3 is busy!")
+                print(f"❌ {port} is busy!")
                 return False
 
-    print("❌ COM3 not found.")
+    print(f"❌ {port} not found.")
     return False
 
-# Exit the script if DMX device is not detected
-if not check_device():
-    exit()
-
-# === DMX Setup ===
-
-# Instantiate a new DMX controller object (assumes the SimpleDMX class manages serial output)
-dmx = SimpleDMX()
-
-def setGlobalChannels():
+def open_transport(transport, port=DEFAULT_PORT):
     """
-    Sets global DMX channels that should be applied to all lighting patterns.
-    Channel layout:
-    - Channel 1: On/Auto mode
-    - Channel 2: Pattern group
-    - Channel 3: Pattern size (brightness or intensity)
-    """
-    dmx.set_channel(1, 23)
-    dmx.set_channel(2, 0)
-    dmx.set_channel(3, 255)
+    Open the DMX output.
 
-def reset_dmx():
-    """
-    Resets all DMX channels (1–33) to 0, then reapplies global channel settings.
-    """
-    for i in range(1, 34):
-        dmx.set_channel(i, 0)
-    setGlobalChannels()
-
-# === Persistent Pattern Thread ===
+    Args:
+        transport (str): 'serial' for the USB-DMX interface, 'null' to run without hardware
+        port (str): Serial port for the 'serial' transport
 
-def persistent_pattern_runner():
-    """
-    Persistent thread that continuously runs the current pattern.
-    Reads from shared state and switches patterns when needed.
+    Returns:
+        SimpleDMX or NullDMX, or None if the device isn't available
     """
-    last_func = None
-    last_speed = None
-    
-    while not stop_flag.is_set():
-        with pattern_lock:
-            func = pattern_state['func']
-            speed = pattern_state['speed']
-        
-        if func is None or speed is None:
-            time.sleep(0.05)  # Idle waiting
-            continue
-        
-        # Check if we need to switch patterns or speeds
-        if func != last_func or speed != last_speed:
-            print(f"Switching pattern to {func.__name__} at speed {speed}")
-            reset_dmx()  # Clear old pattern state
-            reset_pattern_states()  # Reset pattern function states
-            last_func = func
-            last_speed = speed
-        
-        # Execute one frame of the current pattern
-        try:
-            func(dmx, speed)
-        except Exception as e:
-            print(f"Error in pattern {func.__name__}: {e}")
-            time.sleep(0.1)
+    if transport == 'null':
+        from pattern_sim import NullDMX
+        return NullDMX()
+
+    if not check_device(port):
+        return None
+    from DMXClass import SimpleDMX  # Custom DMX control class for lighting via serial
+    return SimpleDMX(port)
 
 # === Load Label Data ===
 
-def load_mfcc_and_labels(audio_filename):
+def load_mfcc_and_labels(audio_filename, labels_dir=DEFAULT_LABELS_DIR):
     """
     Load MFCC features and labels from the compressed .npz file.
-    
+
     Args:
         audio_filename (str): Name of the audio file (without extension)
-        
+        labels_dir (Path): Directory holding the .mfcc_labels.npz files
+
     Returns:
         tuple: (mfcc_features, pattern_labels, speed_labels)
     """
-    from pathlib import Path
-    
+    from label_io import read_npz_members
+
     # Construct the expected file path in labels directory
-    labels_dir = Path("labeling/labels")
-    npz_path = labels_dir / f"{audio_filename}.mfcc_labels.npz"
-    
+    npz_path = Path(labels_dir) / f"{audio_filename}.mfcc_labels.npz"
+
     if not npz_path.exists():
         raise FileNotFoundError(f"MFCC and labels file not found: {npz_path}")
-    
-    # Load the compressed data
-    data = dict(np.load(npz_path))
-    
+
+    # Load only the arrays we need (not e.g. an embedded waveform)
+    data = read_npz_members(npz_path, ('mfcc', 'pattern_labels', 'speed_labels'))
+
     # Extract the components
     mfcc_features = data['mfcc']
     pattern_labels = data['pattern_labels']
     speed_labels = data['speed_labels']
-    
+
     print(f"Loaded data from: {npz_path}")
     print(f"MFCC shape: {mfcc_features.shape}")
     print(f"Pattern labels length: {len(pattern_labels)}")
     print(f"Speed labels length: {len(speed_labels)}")
-    
+
     # Ensure data consistency
     assert len(pattern_labels) == len(speed_labels) == len(mfcc_features), \
         f"Mismatch in data lengths: MFCC={len(mfcc_features)}, patterns={len(pattern_labels)}, speeds={len(speed_labels)}"
-    
+
     return mfcc_features, pattern_labels, speed_labels
 
-# Load the audio data - adjust the filename as needed
-audio_filename = "one-three-nine"  # Without extension
-mfcc_features, pattern_labels, speed_labels = load_mfcc_and_labels(audio_filename)
+def load_matching_policy(index, label_path, base=None, seed=None):
+    """
+    MatchingPolicy for a song: a PatternIndex plus the song's mfcc, keeping
+    weights/cooldown/min_duration from a base SelectionPolicy.
+    """
+    from label_io import read_npz_members
+    from pattern_index import MatchingPolicy
+
+    mfcc = read_npz_members(label_path, ('mfcc',))['mfcc']
+    settings = {}
+    if base is not None:
+        settings = dict(weights=base.weights, cooldown=base.cooldown, min_duration=base.min_duration)
+    return MatchingPolicy(index, mfcc, seed=seed, **settings)
+
+# === Show Player ===
+
+class ShowPlayer:
+    """
+    Plays pattern/speed label arrays on a DMX output.
+
+    Two threads run while playing: the label thread sleeps until the next
+    label change on show time and updates pattern_state, and
+    persistent_pattern_runner renders frames of whatever pattern_state holds.
+
+    Pattern functions are chosen for every segment up front from the seed, so
+    seek() can rebuild the exact pattern (and its internal state) that linear
+    playback would have reached, by fast-forwarding it on a virtual clock.
+    """
+    # Upper bound on frames replayed when reconstructing a pattern on seek
+    MAX_FAST_FORWARD_FRAMES = 500_000
+    # Speed for a pattern forced over an "off" label segment
+    DEFAULT_OVERRIDE_SPEED = 5
+
+    def __init__(self, dmx, pattern_labels=None, speed_labels=None, fps=10, seed=None,
+                 automation=None, clock=None, timeline=None, speed_tables=None, policy=None):
+        """
+        Args:
+            dmx: SimpleDMX or NullDMX output (not closed by the player)
+            pattern_labels (array): Pattern group per label frame (0 = off)
+            speed_labels (array): Speed per label frame (0 = off)
+            fps (float): Label frames per second
+            seed (int): Seed for pattern selection and pattern randomness; None for time-based
+            automation (Automation): Optional keyframe automation on show time
+            clock: Source of show time (show_clocks.AudioClock to play and lock to the song);
+                defaults to a MonotonicClock
+            timeline (LabelTimeline): Precompiled labels, used instead of pattern_labels/speed_labels
+            speed_tables (dict): Shared result of speed_control.build_speed_tables(); measured here if None.
+                Measuring swaps pattern_functions onto a virtual clock, so pass tables in when
+                another player may be running.
+            policy (SelectionPolicy): Chooses the function for each segment; defaults to
+                SelectionPolicy(seed=seed)
+        """
+        from label_timeline import LabelTimeline
+        from pattern_functions import pattern_groups, reset_pattern_states, seed_patterns
+        from selection import SelectionPolicy
+        from show_clocks import MonotonicClock
+        from speed_control import build_speed_tables
+
+        self.dmx = dmx
+        self.fps = fps
+        # Compile the labels once into change events
+        if timeline is None:
+            timeline = LabelTimeline.from_labels(pattern_labels, speed_labels, fps)
+        self.timeline = timeline
+        self.pattern_groups = pattern_groups
+        self.reset_pattern_states = reset_pattern_states
+        self.seed_patterns = seed_patterns
+
+        # Unseeded policies (and seed=None) plan differently every run
+        self.seed = seed
+        self.policy = policy if policy is not None else SelectionPolicy(seed=seed)
+
+        # Pattern function for every segment, chosen once up front
+        self.plan = self.plan_selections()
+        # First segment of the run of the same function each segment belongs to
+        self.run_starts = self.plan_run_starts()
+        # Base for the per-run pattern seeds; unseeded players still pick one so seeks replay exactly
+        self.seed_base = seed if seed is not None else random.getrandbits(31)
+
+        # Per-pattern speed-to-frame-period tables (measured before any pattern thread runs)
+        self.speed_tables = speed_tables if speed_tables is not None else build_speed_tables()
+
+        # === Shared State ===
+        self.pattern_state = {
+            'func': None,
+            'speed': None,
+            'automation': automation,  # Optional Automation driving channels/parameters over show time
+            'resume': None,  # Set by seek: continue a reconstructed pattern at this speed instead of resetting
+            'seed': None,  # Seed the patterns' random sources get when the current function starts
+            'override': {}  # Live overrides from the control API: func, speed, blackout
+        }
+        self.pattern_lock = Lock()
+        self.frame_lock = Lock()  # Held by the runner while it renders a frame
+        self.label_lock = Lock()  # Held while the label thread or seek() updates the pattern
+        self.stop_flag = Event()
+        self.wake = Event()  # Interrupts the label thread's sleep on seek/stop
+        self.control_wake = Event()  # Interrupts the runner's wait (idle or mid-frame) on a live change
+
+        # Telemetry, written by the runner after every frame
+        self.frame_count = 0
+        self.current_func = None
+        self.frame_speed = None
+
+        # Heartbeat for the stall watchdog: when the frame being rendered started and its deadline
+        self.frame_started = None
+        self.frame_deadline = 0.0
+        self.watchdog = StallWatchdog(self)
+
+        self.pattern_thread = None
+        self.label_thread = None
+        self.clock = clock if clock is not None else MonotonicClock()
+
+    def plan_selections(self):
+        """
+        Choose a function for every timeline segment with the selection policy.
+        A segment that only changes speed within the same group keeps the previous function.
+
+        Returns:
+            list: Function per segment (None for off or unknown groups)
+        """
+        return self.policy.plan(self.timeline, self.pattern_groups)
+
+    def plan_run_starts(self):
+        """Index of the segment where each segment's planned function was started."""
+        starts = list(range(len(self.plan)))
+        for k in range(1, len(self.plan)):
+            if self.plan[k] is not None and self.plan[k] is self.plan[k - 1]:
+                starts[k] = starts[k - 1]
+        return starts
+
+    def run_seed(self, k):
+        """
+        Seed for the patterns' random sources when the function of segment k
+        starts. It depends only on the player's seed and where the run
+        starts, so linear playback and seek reconstruction draw the same
+        random numbers.
+        """
+        # Hashes of int tuples are the same in every process
+        return hash((self.seed_base, self.run_starts[k])) & 0x7FFFFFFF
+
+    # === DMX Setup ===
+
+    def setGlobalChannels(self, dmx=None):
+        """
+        Sets global DMX channels that should be applied to all lighting patterns.
+        Channel layout:
+        - Channel 1: On/Auto mode
+        - Channel 2: Pattern group
+        - Channel 3: Pattern size (brightness or intensity)
+        """
+        dmx = dmx or self.dmx
+        dmx.set_channel(1, 23)
+        dmx.set_channel(2, 0)
+        dmx.set_channel(3, 255)
+
+    def blackout_dmx(self, dmx=None):
+        """
+        Sets every channel to 0, including the on/auto mode channel, so the laser emits nothing.
+        """
+        dmx = dmx or self.dmx
+        for i in range(1, 34):
+            dmx.set_channel(i, 0)
+
+    def reset_dmx(self, dmx=None):
+        """
+        Resets all DMX channels (1–33) to 0, then reapplies global channel settings.
+        """
+        dmx = dmx or self.dmx
+        for i in range(1, 34):
+            dmx.set_channel(i, 0)
+        self.setGlobalChannels(dmx)
+
+    # === Persistent Pattern Thread ===
+
+    def persistent_pattern_runner(self):
+        """
+        Persistent thread that continuously runs the current pattern.
+        Reads from shared state and switches patterns when needed.
+        Speed changes glide smoothly without restarting the pattern.
+        Pattern sleeps end early on control_wake, so overrides and stop()
+        don't wait out the current frame.
+        """
+        from pattern_sim import WakeableClock, virtual_time
+
+        with virtual_time(WakeableClock(self.control_wake)):
+            self.run_frames()
+
+    def run_frames(self):
+        """The runner's frame loop (see persistent_pattern_runner)."""
+        from automation import AutomatedDMX
+        from speed_control import SpeedRamp
+
+        last_func = None
+        last_speed = None
+        ramp = SpeedRamp()
+        dark = object()  # last_func marker while blacked out
+
+        while not self.stop_flag.is_set():
+            # Cleared before reading the state, so a later change still interrupts this frame
+            self.control_wake.clear()
+            with self.pattern_lock:
+                func = self.pattern_state['func']
+                speed = self.pattern_state['speed']
+                automation = self.pattern_state['automation']
+                resume = self.pattern_state['resume']
+                self.pattern_state['resume'] = None
+                seed = self.pattern_state['seed']
+                override = self.pattern_state['override']
+                blackout = override.get('blackout', False)
+                if 'func' in override:
+                    func = override['func']
+                    speed = speed or self.DEFAULT_OVERRIDE_SPEED
+                    resume = None  # seek() rebuilt the labelled pattern, not the forced one
+                if 'speed' in override and func is not None:
+                    speed = override['speed']
 
-# === Main Loop ===
+            if blackout:
+                if last_func is not dark:
+                    with self.frame_lock:
+                        self.blackout_dmx()
+                        # set_override put the output in safe mode; the universe is dark now too
+                        if not self.watchdog.stalled:
+                            self.dmx.leave_safe()
+                last_func = dark
+                self.current_func = None
+                self.control_wake.wait(0.05)
+                continue
 
-print("Starting light playback...")
+            if func is None or speed is None:
+                last_func = None  # Lights off: the next pattern starts fresh
+                self.current_func = None
+                self.control_wake.wait(0.05)  # Idle waiting
+                continue
 
-# Initialize lights with default global settings
-setGlobalChannels()
+            with self.frame_lock:
+                if resume is not None:
+                    # seek() already rebuilt this pattern's state and output
+                    ramp.jump(resume)
+                    ramp.set_target(speed)
+                    last_func = func
+                    last_speed = speed
+                elif func != last_func:
+                    # Only a new pattern restarts; a new speed is glided into
+                    table = self.speed_tables.get(func.__name__)
+                    rate = f" (~{table.rate(speed):.0f} frames/s)" if table else ""
+                    print(f"Switching pattern to {func.__name__} at speed {speed}{rate}")
+                    self.reset_dmx()  # Clear old pattern state
+                    self.reset_pattern_states()  # Reset pattern function states
+                    if seed is not None:
+                        self.seed_patterns(seed)
+                    ramp.jump(speed)
+                    last_func = func
+                    last_speed = speed
+                elif speed != last_speed:
+                    print(f"Gliding {func.__name__} to speed {speed}")
+                    ramp.set_target(speed)
+                    last_speed = speed
 
-# Start the persistent pattern thread
-pattern_thread = Thread(target=persistent_pattern_runner, daemon=True)
-pattern_thread.start()
+                # The speed the frame actually runs at (automation may override it),
+                # which is also what its watchdog deadline must allow for
+                frame_speed = ramp.value()
+                t = None
+                if automation is not None:
+                    t = self.show_time()
+                    frame_speed = automation.param('speed', t, frame_speed)
+                self.current_func = func
+                self.frame_speed = frame_speed
+                self.frame_deadline = self.watchdog.deadline(func, frame_speed)
+                self.frame_started = time.monotonic()
 
-# 3-second countdown before starting
-for i in range(3, 0, -1):
-    print(f"Starting in {i}...")
-    time.sleep(1)
+                # Execute one frame of the current pattern; automated channels hold their
+                # curve values even when the pattern writes them mid-frame
+                try:
+                    if automation is None:
+                        func(self.dmx, frame_speed)
+                    else:
+                        automation.apply(self.dmx, t)
+                        func(AutomatedDMX(self.dmx, automation, self.show_time), frame_speed)
+                except Exception as e:
+                    print(f"Error in pattern {func.__name__}: {e}")
+                    time.sleep(0.1)
 
-# Track the currently running pattern/speed to avoid restarting identical ones
-current_pattern = None
-current_speed = None
-current_func = None
+                self.frame_started = None
+                self.frame_count += 1
 
-try:
-    for i in range(len(pattern_labels)):
-        start = time.time()  # measure execution time to maintain 10 FPS
-        
-        # Load the current pattern and speed labels
-        pattern = pattern_labels[i]
-        speed = speed_labels[i]
+    # === Label Thread ===
 
-        if pattern == 0 or speed == 0:
+    def show_time(self):
+        """Seconds into the song."""
+        return self.clock.time()
+
+    def apply_segment(self, k):
+        """Update pattern_state for timeline segment k."""
+        # Load the segment's pattern and speed labels
+        i, _, pattern, speed = self.timeline.segment(k)
+        func = self.plan[k]
+
+        with self.pattern_lock:
+            running = self.pattern_state['func']
+            running_speed = self.pattern_state['speed']
+            if func is None:
+                self.pattern_state['func'] = None
+                self.pattern_state['speed'] = None
+            else:
+                self.pattern_state['func'] = func
+                self.pattern_state['speed'] = speed
+                self.pattern_state['seed'] = self.run_seed(k)
+
+        if func is None:
             # 0 means "turn off lights"
-            if current_pattern is not None:
+            if pattern and speed:
+                print(f"[{i}] Unknown pattern group: {pattern}")
+            elif running is not None:
                 print(f"[{i}] Pattern OFF")
-                with pattern_lock:
-                    pattern_state['func'] = None
-                    pattern_state['speed'] = None
-                current_pattern = None
-                current_speed = None
-                current_func = None
-        else:
-            # Only change pattern if pattern or speed changed
-            if pattern != current_pattern or speed != current_speed:
-                current_pattern = pattern
-                current_speed = speed
-                
-                # Select a function from the pattern group
-                group_funcs = pattern_groups.get(pattern)
-                
-                if not group_funcs:
-                    print(f"[{i}] Unknown pattern group: {pattern}")
+        elif func is running and speed != running_speed:
+            # Same group, new speed: the running function glides
+            print(f"[{i}] Speed {speed} → {func.__name__}")
+        elif func is not running:
+            print(f"[{i}] Pattern {pattern}, Speed {speed} → {func.__name__}")
+
+    def label_loop(self):
+        """Follow show time, sleeping until the next label change (or a seek/stop)."""
+        current_segment = None
+
+        while not self.stop_flag.is_set():
+            with self.label_lock:
+                k = self.timeline.segment_at(self.show_time())
+                if k is None:
+                    break
+                if k != current_segment:
+                    self.apply_segment(k)
+                    current_segment = k
+                end_time = self.timeline.segment_end_time(k)
+
+            # Sleep until this segment ends
+            self.wake.wait(max(0, end_time - self.show_time()))
+            self.wake.clear()
+
+    # === Seeking ===
+
+    def restore_state(self, position):
+        """
+        Put the output and pattern state where linear playback would have
+        them at `position`: find when the planned function started, replay it
+        from there on a virtual clock (following the segment speeds) into a
+        NullDMX, then copy that universe to the real output.
+
+        The caller must hold frame_lock and label_lock.
+
+        Returns:
+            float or None: Interpolated speed at position, or None if the lights are off
+        """
+        from automation import AutomatedDMX
+        from pattern_sim import NullDMX, VirtualClock, virtual_time
+        from speed_control import SpeedRamp
+
+        if not len(self.timeline):
+            return None  # Live labels (set_pattern) own pattern_state; there is nothing to rebuild
+
+        k = self.timeline.segment_at(position)
+        func = self.plan[k] if k is not None else None
+        if func is None:
+            with self.pattern_lock:
+                self.pattern_state['func'] = None
+                self.pattern_state['speed'] = None
+            self.reset_dmx()
+            return None
+
+        # Replay from the segment where this function was started, with the seed it started with
+        first = self.run_starts[k]
+
+        started = time.perf_counter()
+        automation = self.pattern_state['automation']
+        shadow = NullDMX()
+        self.reset_dmx(shadow)
+        self.reset_pattern_states()
+        self.seed_patterns(self.run_seed(k))
+
+        clock = VirtualClock(self.timeline.start_times[first])
+        if automation is not None:
+            automated = AutomatedDMX(shadow, automation, lambda: clock.now)
+        ramp = SpeedRamp()
+        ramp.jump(self.timeline.speeds[first], now=clock.now)
+        segment = first
+        frames = 0
+
+        with virtual_time(clock):
+            while clock.now < position and frames < self.MAX_FAST_FORWARD_FRAMES:
+                # Follow the speed labels of the segments crossed
+                while segment < k and clock.now >= self.timeline.segment_end_time(segment):
+                    segment += 1
+                    ramp.set_target(self.timeline.speeds[segment])
+
+                before = clock.now
+                frame_speed = ramp.value(clock.now)
+                if automation is None:
+                    func(shadow, frame_speed)
                 else:
-                    current_func = random.choice(group_funcs)
-                    with pattern_lock:
-                        pattern_state['func'] = current_func
-                        pattern_state['speed'] = speed
-                    print(f"[{i}] Pattern {pattern}, Speed {speed} → {current_func.__name__}")
-
-        # Ensure loop runs roughly at 10 frames per second
-        elapsed = time.time() - start
-        time.sleep(max(0, 0.1 - elapsed))
-
-except KeyboardInterrupt:
-    # Handle Ctrl+C gracefully
-    print("Interrupted. Shutting down...")
-    
-# Cleanup
-stop_flag.set()
-pattern_thread.join()
-reset_dmx()
-dmx.close()
-print("Cleanup complete.")
\ No newline at end of file
+                    automation.apply(shadow, clock.now)
+                    func(automated, automation.param('speed', clock.now, frame_speed))
+                frames += 1
+
+                if clock.now == before:
+                    break  # Pattern doesn't advance with time; one frame sets it up
+
+        for channel in range(1, len(shadow.dmx_data)):
+            self.dmx.set_channel(channel, shadow.dmx_data[channel])
+
+        speed = int(self.timeline.speeds[k])
+        resume_speed = ramp.value(position)
+        with self.pattern_lock:
+            self.pattern_state['func'] = func
+            self.pattern_state['speed'] = speed
+            self.pattern_state['resume'] = resume_speed
+            self.pattern_state['seed'] = self.run_seed(k)
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        print(f"Restored {func.__name__} at {position:.1f}s ({frames} frames replayed in {elapsed_ms:.1f} ms)")
+        return resume_speed
+
+    # === Live Overrides ===
+    # Called from the control server's thread. Each wakes the runner, which
+    # cuts the current frame's sleep short and applies it; a blackout also
+    # switches the output to its safe frame straight away.
+
+    def set_override(self, **changes):
+        """
+        Update the live override. A value of None removes that key.
+
+        Args:
+            func (function): Pattern to run instead of the labelled one
+            speed (float): Speed to use instead of the labelled one
+            blackout (bool): Turn every channel off until released
+        """
+        with self.pattern_lock:
+            override = dict(self.pattern_state['override'])
+            for key, value in changes.items():
+                if value is None:
+                    override.pop(key, None)
+                else:
+                    override[key] = value
+            self.pattern_state['override'] = override
+        if changes.get('blackout'):
+            # Dark from the next DMX packet, without waiting for the runner's frame
+            self.dmx.enter_safe()
+        self.control_wake.set()
+
+    def release(self):
+        """Drop every override and follow the labels again."""
+        with self.pattern_lock:
+            self.pattern_state['override'] = {}
+        self.control_wake.set()
+
+    def nudge(self, seconds):
+        """Shift show time by `seconds` (positive runs the lights later in the song)."""
+        self.clock.nudge(seconds)
+        self.wake.set()
+
+    # === Live Labels ===
+
+    def set_pattern(self, func, speed):
+        """
+        Set the labelled pattern and speed directly, for live label sources
+        (live.py) that run without a timeline. Overrides still apply on top.
+
+        Args:
+            func (function): Pattern to run; None turns the lights off
+            speed (int): Speed label; 0 or None turns the lights off
+        """
+        with self.pattern_lock:
+            if func is None or not speed:
+                func, speed = None, None
+            changed = (func, speed) != (self.pattern_state['func'], self.pattern_state['speed'])
+            self.pattern_state['func'] = func
+            self.pattern_state['speed'] = speed
+        if changed:
+            # Unchanged labels arrive every frame; only a change cuts the current frame short
+            self.control_wake.set()
+
+    def snapshot(self):
+        """
+        Current playback state for telemetry.
+
+        Returns:
+            dict: show_time, segment, label and running pattern names, speeds, frame count and overrides
+        """
+        t = self.show_time()
+        k = self.timeline.segment_at(t)
+        labelled = self.plan[k] if k is not None else None
+        with self.pattern_lock:
+            override = dict(self.pattern_state['override'])
+            speed = self.pattern_state['speed']
+        running = self.current_func
+        return {
+            'show_time': float(t),
+            'segment': -1 if k is None else int(k),
+            'label_pattern': labelled.__name__ if labelled else '',
+            'pattern': running.__name__ if running else '',
+            'speed': float(override.get('speed', speed) or 0),
+            'frame_speed': float(self.frame_speed or 0),
+            'frames': self.frame_count,
+            'blackout': bool(override.get('blackout')),
+            'forced': 'func' in override,
+            'stalled': self.watchdog.stalled,
+        }
+
+    # === Transport Controls ===
+
+    def start(self, countdown=0, position=0.0):
+        """
+        Start playback threads.
+
+        Args:
+            countdown (int): Seconds to count down before show time 0
+            position (float): Show time to start from, in seconds
+        """
+        from pattern_functions import seed_patterns
+
+        print("Starting light playback...")
+        self.stop_flag.clear()
+        self.wake.clear()
+        if self.seed is not None:
+            seed_patterns(self.seed)
+
+        # Initialize lights with default global settings
+        self.setGlobalChannels()
+
+        # Rebuild the pattern that is already running at the start position
+        if position > 0:
+            with self.label_lock, self.frame_lock:
+                self.restore_state(position)
+
+        # Start the persistent pattern thread
+        self.pattern_thread = Thread(target=self.persistent_pattern_runner, daemon=True)
+        self.pattern_thread.start()
+        self.watchdog.start()
+
+        for i in range(countdown, 0, -1):
+            print(f"Starting in {i}...")
+            time.sleep(1)
+
+        self.clock.start(position)
+
+        self.label_thread = Thread(target=self.label_loop, daemon=True)
+        self.label_thread.start()
+
+    def seek(self, position):
+        """
+        Jump to a show time in seconds, reconstructing the pattern running there.
+
+        Raises:
+            ValueError: If the player has no timeline to seek in (live labels)
+        """
+        if not len(self.timeline):
+            raise ValueError("Nothing to seek in: this show has no label timeline (live labels?)")
+        with self.label_lock, self.frame_lock:
+            self.restore_state(position)
+            self.clock.seek(position)
+        self.wake.set()
+
+    def wait(self):
+        """Block until the song has finished playing or stop() is called."""
+        if self.label_thread is not None:
+            while self.label_thread.is_alive():
+                self.label_thread.join(0.2)
+
+    def stop(self, clear=True):
+        """
+        Stop both threads. The DMX output stays open.
+
+        Args:
+            clear (bool): Reset the lights; pass False to hold the last frame,
+                e.g. while handing over to the next song
+        """
+        self.stop_flag.set()
+        self.wake.set()
+        self.control_wake.set()
+        self.clock.stop()
+        self.watchdog.stop()
+        if self.watchdog.stalled:
+            # A hung pattern can't be interrupted; leave its daemon thread behind
+            print("❌ Pattern runner still stalled; abandoning it")
+            self.pattern_thread = None
+        for thread in (self.label_thread, self.pattern_thread):
+            if thread is not None:
+                thread.join()
+        self.label_thread = None
+        self.pattern_thread = None
+        with self.pattern_lock:
+            self.pattern_state['func'] = None
+            self.pattern_state['speed'] = None
+            self.pattern_state['resume'] = None
+        if clear:
+            self.reset_dmx()
+
+# === Command Line ===
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play a labelled song on the laser.")
+    parser.add_argument('song', nargs='?', default="one-three-nine",
+                        help="Audio file name without extension (labels are read from --labels-dir)")
+    parser.add_argument('--port', default=DEFAULT_PORT, help="Serial port of the USB-DMX interface")
+    parser.add_argument('--transport', choices=['serial', 'null'], default='serial',
+                        help="'null' runs the show without hardware")
+    parser.add_argument('--fps', type=float, default=10, help="Label frames per second")
+    parser.add_argument('--seed', type=int, help="Seed for a repeatable show")
+    parser.add_argument('--labels-dir', default=str(DEFAULT_LABELS_DIR),
+                        help="Directory of .mfcc_labels.npz (or older .labels.npz) files")
+    parser.add_argument('--automation', help="Keyframe automation JSON file")
+    parser.add_argument('--policy', help="Pattern selection policy JSON file (weights, cooldown, min_duration)")
+    parser.add_argument('--index', help="Pattern signature index (pattern_index.py) to match patterns to the song's mfcc")
+    parser.add_argument('--audio', help="Play this audio file and lock the lights to its sample clock")
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help="Seconds to run the lights ahead of the audio (negative delays them)")
+    parser.add_argument('--audio-device', help="sounddevice output device name or index")
+    parser.add_argument('--countdown', type=int, default=3, help="Seconds to count down before starting")
+    parser.add_argument('--start', type=float, default=0.0, help="Show time to start from, in seconds")
+    parser.add_argument('--control-port', type=int,
+                        help="Accept live OSC overrides on this localhost UDP port (see show_control.py)")
+    parser.add_argument('--probe', action='store_true', help="Only check the DMX device and exit")
+    args = parser.parse_args(argv)
+
+    if args.probe:
+        return 0 if check_device(args.port) else 1
+
+    # Exit if DMX device is not detected
+    dmx = open_transport(args.transport, args.port)
+    if dmx is None:
+        return 1
+
+    try:
+        # Load the song's labels (only the label arrays are read)
+        from label_io import find_label_file, load_label_timeline
+        label_path = find_label_file(args.song, args.labels_dir)
+        timeline = load_label_timeline(label_path, fps=args.fps)
+        print(f"Loaded {len(timeline)} label segments ({timeline.duration:.1f}s) from: {label_path}")
+
+        # Optional keyframe automation, e.g. {"channels": {"5": [[0, 0], [4, 127, "ease"]]}}
+        automation = None
+        if args.automation:
+            from automation import Automation
+            with open(args.automation) as f:
+                automation = Automation.from_dict(json.load(f))
+
+        clock = None
+        if args.audio:
+            from show_clocks import AudioClock
+            device = int(args.audio_device) if args.audio_device and args.audio_device.isdigit() else args.audio_device
+            clock = AudioClock.from_file(args.audio, latency=args.latency, device=device)
+
+        # Optional selection policy, e.g. {"weights": {"stillBeam": 0.5}, "min_duration": {"circleZoomIn": 4}}
+        policy = None
+        if args.policy:
+            from selection import SelectionPolicy
+            policy = SelectionPolicy.from_file(args.policy, seed=args.seed)
+        if args.index:
+            from pattern_index import PatternIndex
+            policy = load_matching_policy(PatternIndex.load(args.index), label_path, policy, seed=args.seed)
+
+        player = ShowPlayer(dmx, fps=args.fps, seed=args.seed, automation=automation,
+                            clock=clock, timeline=timeline, policy=policy)
+        control = None
+        if args.control_port is not None:
+            from show_control import ControlServer
+            control = ControlServer(player, port=args.control_port)
+            control.start()
+
+        player.start(countdown=args.countdown, position=args.start)
+        try:
+            player.wait()
+        except KeyboardInterrupt:
+            # Handle Ctrl+C gracefully
+            print("Interrupted. Shutting down...")
+
+        # Cleanup
+        if control is not None:
+            control.stop()
+        player.stop()
+    finally:
+        dmx.close()
+    print("Cleanup complete.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,426 @@
+# === Live Mode ===
+# Lights a DJ set without labels or the track in advance. Audio comes from an
+# input device (or a wav file paced in real time as a stand-in); every new
+# 100 ms label frame gets its MFCC and rhythm features, the trained model
+# (labeling/train.py) classifies it from a ring buffer of recent frames, the
+# streaming decoder (labeling/decode.py) steadies the result, and the pattern
+# and speed go straight into the ShowPlayer's pattern_state.
+#
+# Latency from a sound reaching the input to the lights reacting is reported
+# every second: measured capture-to-update time plus the fixed delays of the
+# analysis window, look-ahead, decoder lag and the pattern's frame period.
+#
+#   python live.py --model labeling/models/conv.npz --transport null --wav labeling/playlist_wavs/song.wav
+#   python live.py --model labeling/models/conv.npz --input-device 2
+
+import argparse
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+import numpy as np
+
+from lasersFromLabels import DEFAULT_PORT, ShowPlayer, open_transport
+
+# Seconds of audio the rhythm features (beats, tempo) are computed over
+RHYTHM_SECONDS = 6.0
+# Label frames between beat-tracking passes over the whole RHYTHM_SECONDS ring
+RHYTHM_EVERY = 5
+# Seconds of audio the per-frame rhythm columns (loudness, onsets) are computed over in between
+LOCAL_SECONDS = 1.0
+
+# === Audio Sources ===
+# Both put (mono float32 block, monotonic time its last sample was captured)
+# on a queue, and None once the audio ends.
+
+class DeviceSource:
+    """Captures from a sounddevice input stream."""
+    def __init__(self, device=None, samplerate=None, blocksize=512):
+        import sounddevice as sd
+
+        info = sd.query_devices(device, 'input')
+        self.samplerate = int(samplerate or info['default_samplerate'])
+        self.blocks = queue.Queue()
+        self.stream = sd.InputStream(device=device, samplerate=self.samplerate, channels=1, dtype='float32',
+                                     blocksize=blocksize, callback=self._callback)
+
+    def _callback(self, indata, frames, time_info, status):
+        # inputBufferAdcTime is when the block's first sample was captured, in stream time
+        age = self.stream.time - time_info.inputBufferAdcTime
+        captured = time.monotonic() - age + frames / self.samplerate
+        self.blocks.put((indata[:, 0].copy(), captured))
+
+    def start(self):
+        self.stream.start()
+
+    def stop(self):
+        self.stream.stop()
+        self.stream.close()
+
+class FileSource:
+    """Reads an audio file and releases each block when it would have been heard."""
+    def __init__(self, path, blocksize=512):
+        import soundfile as sf
+
+        self.path = str(path)
+        self.samplerate = sf.info(self.path).samplerate
+        self.blocksize = blocksize
+        self.blocks = queue.Queue()
+        self.stop_flag = threading.Event()
+        self.thread = None
+
+    def _run(self):
+        import soundfile as sf
+
+        origin = time.monotonic()
+        done = 0
+        for block in sf.blocks(self.path, blocksize=self.blocksize, dtype='float32', always_2d=True):
+            done += len(block)
+            due = origin + done / self.samplerate
+            if self.stop_flag.wait(max(0, due - time.monotonic())):
+                return
+            self.blocks.put((block.mean(axis=1), due))
+        self.blocks.put(None)
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_flag.set()
+        if self.thread is not None:
+            self.thread.join()
+
+# === Incremental Labeling ===
+
+class LiveLabeler:
+    """
+    Turns pushed audio into one (pattern, speed) decision per label frame.
+
+    Keeps constant state however long the set runs: the framer's partial
+    window, RHYTHM_SECONDS of resampled audio for the rhythm features, the
+    last model.window feature frames, and the decoders' lag.
+
+    Beat tracking over the whole ring is the expensive part, so it runs once
+    every rhythm_every frames. Frames in between get their loudness and onset
+    columns from the last LOCAL_SECONDS of audio, and beat, beat_phase and
+    tempo extrapolated from the newest tracked beat at the tracked tempo.
+    """
+    def __init__(self, model, samplerate, lookahead=0, lag=2, switch_penalty=None, min_duration=None,
+                 rhythm_every=RHYTHM_EVERY):
+        """
+        Args:
+            model (FrameModel): Trained model (labeling/models.py)
+            samplerate (int): Rate of the pushed audio
+            lookahead (int): Label frames of future context to wait for (up to window // 2);
+                missing future frames are edge-padded, as at the end of a song offline
+            lag (int): StreamingDecoder lag in frames
+            switch_penalty (float): Decoder switch penalty (default decode.DEFAULT_SWITCH_PENALTY)
+            min_duration (int): Decoder minimum run in frames (default decode.DEFAULT_MIN_DURATION)
+            rhythm_every (int): Label frames between beat-tracking passes (1 tracks every frame)
+        """
+        from decode import DEFAULT_MIN_DURATION, DEFAULT_SWITCH_PENALTY, StreamingDecoder
+        from extract_features import LABELS_PER_SECOND, N_FFT, SAMPLE_RATE, label_hop
+        from models import HEADS
+        from rhythm_features import RHYTHM_COLUMNS
+        from stream_features import LabelFramer
+
+        self.model = model
+        self.sr = SAMPLE_RATE
+        self.hop = label_hop(self.sr)
+        self.framer = LabelFramer(sr=self.sr)
+        self.resampler = None
+        if samplerate != self.sr:
+            import soxr
+            self.resampler = soxr.ResampleStream(samplerate, self.sr, 1, dtype='float32', quality='HQ')
+
+        # Audio ring, aligned to whole label intervals: holds global samples [audio_start, audio_end)
+        self.audio = np.zeros(0, dtype=np.float32)
+        self.audio_start = 0
+        self.keep_samples = int(RHYTHM_SECONDS * self.sr) // self.hop * self.hop
+
+        # Beat tracking schedule and what the last pass found
+        self.rhythm_every = max(1, rhythm_every)
+        self.local_labels = int(LOCAL_SECONDS * LABELS_PER_SECOND)
+        self.labels_per_second = LABELS_PER_SECOND
+        self.beat_column, self.phase_column, self.tempo_column = (
+            RHYTHM_COLUMNS.index(name) for name in ('beat', 'beat_phase', 'tempo'))
+        self.since_beats = None  # Frames since the last beat-tracking pass (None before the first)
+        self.last_beat = None  # Label frame (counted from the start of the set) of the newest tracked beat
+        self.tempo = 0.0
+
+        # Feature ring: last `window` frames, newest last
+        self.half = model.window // 2
+        self.lookahead = min(max(0, lookahead), self.half)
+        self.history = np.zeros((model.window, model.n_features), dtype=np.float32)
+        self.frames = 0
+
+        switch_penalty = DEFAULT_SWITCH_PENALTY if switch_penalty is None else switch_penalty
+        min_duration = DEFAULT_MIN_DURATION if min_duration is None else min_duration
+        self.decoders = {head: StreamingDecoder(n, switch_penalty, min_duration, lag) for head, n in HEADS.items()}
+        self.lag = lag
+        # Samples between a frame's interval ending and its analysis window being complete
+        self.window_delay = max(0, N_FFT // 2 - self.hop // 2) / self.sr
+
+    @property
+    def algorithmic_delay(self):
+        """Seconds of audio a decision waits for beyond its own label interval."""
+        return self.window_delay + (self.lookahead + self.lag) / 10
+
+    def warm_up(self):
+        """Run the feature and model code once on silence (librosa compiles on first use)."""
+        from rhythm_features import rhythm_features
+
+        rhythm_features(np.zeros(self.keep_samples, dtype=np.float32), self.sr)
+        rhythm_features(np.zeros(self.local_labels * self.hop, dtype=np.float32), self.sr, beats=False)
+        self.model.predict_proba(self.history[None])
+
+    def rhythm_rows(self, rows, n_labels):
+        """
+        Rhythm matrix rows for label frames `rows` of the audio ring, tracking
+        beats over the whole ring only once rhythm_every frames have passed.
+
+        Returns:
+            np.ndarray: (len(rows), len(RHYTHM_COLUMNS)) float32
+        """
+        from rhythm_features import rhythm_features
+
+        audio = self.audio[:n_labels * self.hop]
+        base = self.audio_start // self.hop
+        if self.since_beats is None or self.since_beats + len(rows) >= self.rhythm_every:
+            full = rhythm_features(audio, self.sr, n_labels=n_labels)
+            beats = np.flatnonzero(full[:, self.beat_column])
+            self.last_beat = base + beats[-1] if len(beats) else None
+            self.tempo = float(full[-1, self.tempo_column])
+            self.since_beats = 0
+            rhythm = full[rows]
+        else:
+            tail = min(n_labels, self.local_labels)
+            local = rhythm_features(audio[(n_labels - tail) * self.hop:], self.sr, n_labels=tail, beats=False)
+            rhythm = local[np.maximum(rows - (n_labels - tail), 0)]
+            rhythm[:, self.tempo_column] = self.tempo
+            self.since_beats += len(rows)
+
+        # After the newest tracked beat the tracker has no phase to give; continue the beat grid
+        frames = base + np.asarray(rows)
+        if self.last_beat is not None and self.tempo > 0:
+            after = frames > self.last_beat
+            period = 60.0 / self.tempo * self.labels_per_second  # in label frames
+            elapsed = frames[after] - self.last_beat
+            rhythm[after, self.phase_column] = (elapsed / period) % 1.0
+            rhythm[after, self.beat_column] = np.floor((elapsed + 0.5) / period) > np.floor((elapsed - 0.5) / period)
+        return rhythm
+
+    def push(self, samples):
+        """
+        Add captured audio.
+
+        Returns:
+            tuple or None: (pattern, speed) decided for the newest frames, or None
+            if no frame completed (or the decoders are still filling their lag)
+        """
+        if self.resampler is not None:
+            samples = self.resampler.resample_chunk(np.asarray(samples, dtype=np.float32))
+        self.audio = np.concatenate((self.audio, samples))
+        mfcc = self.framer.push(samples)
+
+        # Trim the audio ring to the rhythm context, keeping it on the label grid
+        excess = (len(self.audio) - self.keep_samples) // self.hop * self.hop
+        if excess > 0:
+            self.audio = self.audio[excess:]
+            self.audio_start += excess
+        if not len(mfcc):
+            return None
+
+        # One rhythm pass per push covers every frame that just completed
+        first = self.frames
+        n_labels = len(self.audio) // self.hop
+        rows = np.clip(np.arange(first, first + len(mfcc)) - self.audio_start // self.hop, 0, n_labels - 1)
+        new = np.hstack((mfcc, self.rhythm_rows(rows, n_labels)))[-len(self.history):]
+
+        self.history = np.roll(self.history, -len(new), axis=0)
+        self.history[-len(new):] = new
+        self.frames += len(mfcc)
+
+        # Window centred `lookahead` frames back; frames before the set or after now are edge-padded
+        newest = len(self.history) - 1
+        oldest = max(0, len(self.history) - self.frames)
+        centre = newest - self.lookahead
+        rows = np.clip(np.arange(centre - self.half, centre + self.half + 1), oldest, newest)
+        probs = self.model.predict_proba(self.history[rows][None])
+
+        # Frames skipped while catching up get the same probabilities, so the decoders keep time
+        decided = None
+        for _ in range(len(mfcc)):
+            decided = {head: decoder.push(probs[head][0]) for head, decoder in self.decoders.items()}
+        if decided['pattern'] is None:
+            return None
+        return decided['pattern'], decided['speed']
+
+# === Feeding the Player ===
+
+class LiveShow:
+    """Runs a ShowPlayer from live labels, choosing a function whenever the group changes."""
+    def __init__(self, player, labeler, policy=None, seed=None, budget=0.5):
+        """
+        Args:
+            player (ShowPlayer): Started player with no timeline
+            labeler (LiveLabeler): Label source
+            policy (SelectionPolicy): Function choice (weights, cooldown)
+            seed (int): Seed for function choice
+            budget (float): Latency budget in seconds; reports flag anything over it
+        """
+        from pattern_functions import pattern_groups
+        from selection import SelectionPolicy
+
+        self.player = player
+        self.labeler = labeler
+        self.pattern_groups = pattern_groups
+        self.policy = policy if policy is not None else SelectionPolicy(seed=seed)
+        self.rng = np.random.default_rng(seed)
+        self.recent = {}
+        self.group = None
+        self.func = None
+        self.budget = budget
+        self.latencies = deque(maxlen=200)
+
+    def apply(self, pattern, speed):
+        """Send a decided (pattern group, speed) to the player."""
+        if pattern != self.group:
+            self.group = pattern
+            self.func = self.policy.choose(pattern, self.pattern_groups, self.rng, self.recent.get(pattern, []))
+            if self.func is not None:
+                self.recent[pattern] = (self.recent.get(pattern, []) + [self.func])[-max(1, self.policy.cooldown):]
+                print(f"[live] Pattern {pattern}, Speed {speed} → {self.func.__name__}")
+            elif pattern and speed:
+                print(f"[live] Unknown pattern group: {pattern}")
+        self.player.set_pattern(self.func, speed)
+
+    def frame_period(self):
+        """Seconds until the runner's next frame picks up a change (one frame of the running pattern)."""
+        func, speed = self.player.current_func, self.player.frame_speed
+        table = self.player.speed_tables.get(func.__name__) if func is not None else None
+        if table is None or not speed:
+            return 0.05  # Idle runner polls every 50 ms
+        return 1.0 / max(table.rate(speed), 1e-3)
+
+    def report(self):
+        """Print the latency budget: measured capture → update, plus the fixed delays."""
+        if not self.latencies:
+            return
+        measured = np.array(self.latencies)
+        p50, p95, worst = np.percentile(measured, 50), np.percentile(measured, 95), measured.max()
+        fixed = self.labeler.algorithmic_delay
+        dmx = self.frame_period()
+        total = p95 + fixed + dmx
+        flag = "✓" if total <= self.budget else "❌ over budget"
+        print(f"[latency] in→state {p50 * 1000:.0f} ms (p95 {p95 * 1000:.0f}, max {worst * 1000:.0f}) "
+              f"+ analysis {fixed * 1000:.0f} ms + DMX ≤{dmx * 1000:.0f} ms "
+              f"= {total * 1000:.0f} ms p95 of {self.budget * 1000:.0f} ms {flag}")
+
+    def run(self, source, stop, report_every=1.0):
+        """Label audio from source until it ends or stop is set."""
+        next_report = time.monotonic() + report_every
+        while not stop.is_set():
+            try:
+                item = source.blocks.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if item is None:
+                break
+            block, captured = item
+            decided = self.labeler.push(block)
+            if decided is not None:
+                self.apply(*decided)
+                self.latencies.append(time.monotonic() - captured)
+            if time.monotonic() >= next_report:
+                self.report()
+                next_report += report_every
+
+# === Command Line ===
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Light a live set from audio input with a trained model.")
+    parser.add_argument('--model', default="labeling/models/conv.npz", help="Checkpoint written by labeling/train.py")
+    parser.add_argument('--wav', help="Play this file in real time instead of capturing from an input device")
+    parser.add_argument('--input-device', help="sounddevice input device name or index")
+    parser.add_argument('--samplerate', type=int, help="Input sample rate (default: the device's)")
+    parser.add_argument('--port', default=DEFAULT_PORT, help="Serial port of the USB-DMX interface")
+    parser.add_argument('--transport', choices=['serial', 'null'], default='serial',
+                        help="'null' runs the show without hardware")
+    parser.add_argument('--lookahead', type=int, default=0,
+                        help="Label frames of future audio to wait for before deciding (more accurate, later)")
+    parser.add_argument('--lag', type=int, default=2, help="Decoder lag in frames (steadier, later)")
+    parser.add_argument('--switch-penalty', type=float, help="Decoder cost of changing label")
+    parser.add_argument('--min-duration', type=int, help="Decoder shortest label run, in frames")
+    parser.add_argument('--rhythm-every', type=int, default=RHYTHM_EVERY,
+                        help="Label frames between beat-tracking passes (1 for every frame, at more CPU)")
+    parser.add_argument('--policy', help="Pattern selection policy JSON file (weights, cooldown)")
+    parser.add_argument('--seed', type=int, help="Seed for pattern choice")
+    parser.add_argument('--budget', type=float, default=500, help="Latency budget in ms for the reports")
+    parser.add_argument('--control-port', type=int,
+                        help="Accept live OSC overrides on this localhost UDP port (see show_control.py)")
+    args = parser.parse_args(argv)
+
+    # The feature and model code lives in labeling/ as top-level modules
+    sys.path.append(str(Path(__file__).resolve().parent / "labeling"))
+    from infer import load_model
+    from label_timeline import LabelTimeline
+
+    model = load_model(args.model)
+
+    if args.wav:
+        source = FileSource(args.wav)
+    else:
+        device = int(args.input_device) if args.input_device and args.input_device.isdigit() else args.input_device
+        source = DeviceSource(device, args.samplerate)
+
+    labeler = LiveLabeler(model, source.samplerate, lookahead=args.lookahead, lag=args.lag,
+                          switch_penalty=args.switch_penalty, min_duration=args.min_duration,
+                          rhythm_every=args.rhythm_every)
+    labeler.warm_up()
+
+    dmx = open_transport(args.transport, args.port)
+    if dmx is None:
+        return 1
+
+    try:
+        policy = None
+        if args.policy:
+            from selection import SelectionPolicy
+            policy = SelectionPolicy.from_file(args.policy, seed=args.seed)
+
+        # No timeline: the live labels drive pattern_state instead of the label thread
+        player = ShowPlayer(dmx, seed=args.seed, timeline=LabelTimeline.from_labels([], []))
+        control = None
+        if args.control_port is not None:
+            from show_control import ControlServer
+            control = ControlServer(player, port=args.control_port)
+            control.start()
+
+        show = LiveShow(player, labeler, policy=policy, seed=args.seed, budget=args.budget / 1000)
+        stop = threading.Event()
+        player.start()
+        source.start()
+        print(f"🎵 Listening ({'file ' + args.wav if args.wav else 'input device'}, {source.samplerate} Hz)...")
+        try:
+            show.run(source, stop)
+        except KeyboardInterrupt:
+            print("Interrupted. Shutting down...")
+        stop.set()
+
+        # Cleanup
+        source.stop()
+        if control is not None:
+            control.stop()
+        player.stop()
+    finally:
+        dmx.close()
+    print("Cleanup complete.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+# === Pattern Benchmark Suite ===
+# Runs every registered pattern against a NullDMX and a virtual clock and
+# reports, for each (pattern, speed):
+#   - ns/frame of Python work (sleeps cost nothing on the virtual clock)
+#   - memory allocated per frame (peak bytes above a no-op pattern's) and
+#     blocks the pattern code allocates and keeps per frame
+#   - effective update rate (frames per virtual second)
+#   - channel-change rate (output changes per virtual second)
+# Results are saved as JSON so runs can be compared across commits:
+#   python pattern_bench.py -o bench.json
+#   python pattern_bench.py -o new.json --compare bench.json
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from pattern_sim import NullDMX, VirtualClock, virtual_time, pattern_catalog, start_pattern
+
+SPEEDS = range(1, 10)
+
+# Source files whose allocations count as the pattern's own
+PATTERN_SOURCES = ('*pattern_functions.py', '*trajectories.py')
+
+def _noop_pattern(dmx, speed):
+    pass
+
+def allocation_pass(func, speed, frames=2000, seed=0):
+    """
+    Measure what one pattern allocates per frame under tracemalloc.
+
+    Returns:
+        tuple: (mean per-frame peak of traced memory above the frame's start, in bytes;
+            blocks allocated by pattern code and still alive, per frame, from
+            snapshot statistics)
+    """
+    dmx = NullDMX()
+    start_pattern(seed)
+    tracemalloc.start()
+    try:
+        with virtual_time(VirtualClock()):
+            func(dmx, speed)  # warm up lazily-created state
+            filters = [tracemalloc.Filter(True, pattern) for pattern in PATTERN_SOURCES]
+            before = tracemalloc.take_snapshot().filter_traces(filters)
+            tracemalloc.reset_peak()
+            base, _ = tracemalloc.get_traced_memory()
+            peak_total = 0
+            for _ in range(frames):
+                func(dmx, speed)
+                _, peak = tracemalloc.get_traced_memory()
+                peak_total += peak - base
+                tracemalloc.reset_peak()
+                base, _ = tracemalloc.get_traced_memory()
+            after = tracemalloc.take_snapshot().filter_traces(filters)
+    finally:
+        tracemalloc.stop()
+
+    blocks = sum(max(0, stat.count_diff) for stat in after.compare_to(before, 'lineno'))
+    return peak_total / frames, blocks / frames
+
+_overhead = {}
+
+def harness_overhead(frames=2000):
+    """Per-frame allocation measured for a pattern that does nothing (the harness's own cost)."""
+    if frames not in _overhead:
+        _overhead[frames] = allocation_pass(_noop_pattern, 1, frames)
+    return _overhead[frames]
+
+def bench_pattern(func, speed, frames=2000, seed=0):
+    """
+    Benchmark one pattern at one speed.
+
+    Args:
+        func (callable): Pattern function taking (dmx, speed)
+        speed (int): Speed label (1-9)
+        frames (int): Number of frames to run
+        seed (int): Random seed applied before the run
+
+    Returns:
+        dict: Measurements for this (pattern, speed)
+    """
+    # Timed pass
+    dmx = NullDMX()
+    clock = VirtualClock()
+    start_pattern(seed)
+    with virtual_time(clock):
+        t0 = time.perf_counter_ns()
+        for _ in range(frames):
+            func(dmx, speed)
+        elapsed_ns = time.perf_counter_ns() - t0
+
+    alloc_bytes, alloc_blocks = allocation_pass(func, speed, frames, seed)
+    overhead, _ = harness_overhead(frames)
+
+    virtual_seconds = clock.now
+    return {
+        'pattern': func.__name__,
+        'speed': speed,
+        'frames': frames,
+        'ns_per_frame': elapsed_ns / frames,
+        'alloc_bytes_per_frame': max(0.0, alloc_bytes - overhead),
+        'alloc_blocks_per_frame': alloc_blocks,
+        'virtual_seconds': virtual_seconds,
+        # Patterns that never sleep have no meaningful rate
+        'update_rate_hz': frames / virtual_seconds if virtual_seconds > 0 else None,
+        'channel_changes_per_frame': dmx.change_count / frames,
+        'channel_change_rate_hz': dmx.change_count / virtual_seconds if virtual_seconds > 0 else None,
+    }
+
+def git_commit():
+    """Return the current git commit hash, or None outside a repository."""
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_benchmarks(frames=2000, seed=0, only=None):
+    """
+    Benchmark every pattern in pattern_groups at speeds 1-9.
+
+    Args:
+        frames (int): Frames per (pattern, speed)
+        seed (int): Random seed applied before each run
+        only (list): Optional list of pattern names to restrict to
+
+    Returns:
+        dict: {'meta': {...}, 'results': [...]}
+    """
+    results = []
+    for group_num, func in pattern_catalog():
+        if only and func.__name__ not in only:
+            continue
+        for speed in SPEEDS:
+            result = bench_pattern(func, speed, frames=frames, seed=seed)
+            result['group'] = group_num
+            results.append(result)
+
+    meta = {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'frames': frames,
+        'seed': seed,
+    }
+    return {'meta': meta, 'results': results}
+
+def print_results(report, baseline=None):
+    """Print a results table, with ns/frame ratios against a baseline report if given."""
+    old = {}
+    if baseline:
+        old = {(r['pattern'], r['speed']): r for r in baseline['results']}
+
+    print(f"{'pattern':<26}{'spd':>4}{'ns/frame':>11}{'B/frame':>9}{'blk/frame':>10}{'rate Hz':>10}{'chg Hz':>10}")
+    for r in report['results']:
+        rate = f"{r['update_rate_hz']:.1f}" if r['update_rate_hz'] is not None else '∞'
+        changes = f"{r['channel_change_rate_hz']:.1f}" if r['channel_change_rate_hz'] is not None else '∞'
+        line = (f"{r['pattern']:<26}{r['speed']:>4}{r['ns_per_frame']:>11.0f}"
+                f"{r['alloc_bytes_per_frame']:>9.0f}{r.get('alloc_blocks_per_frame', 0):>10.3f}"
+                f"{rate:>10}{changes:>10}")
+        prev = old.get((r['pattern'], r['speed']))
+        if prev:
+            line += f"   x{r['ns_per_frame'] / prev['ns_per_frame']:.2f} vs baseline"
+        print(line)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark every pattern at speeds 1-9.")
+    parser.add_argument('-o', '--output', help="Write results to this JSON file")
+    parser.add_argument('--compare', help="Baseline JSON file to compare ns/frame against")
+    parser.add_argument('--frames', type=int, default=2000, help="Frames per pattern and speed")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed for every run")
+    parser.add_argument('--pattern', action='append', help="Only benchmark this pattern (repeatable)")
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(frames=args.frames, seed=args.seed, only=args.pattern)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_results(report, baseline)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"✓ Results saved to {args.output}")
+
+if __name__ == "__main__":
+    sys.exit(main())
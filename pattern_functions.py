@@ -6,10 +6,25 @@ import random
 import time
 import math
 
+import numpy as np
+
+from trajectories import bounce_in_box, random_headings, random_walk, ping_pong, ramp
+
+# Random source for the vectorized trajectory blocks (see seed_patterns)
+rng = np.random.default_rng()
+
+# Frames generated per trajectory block
+BLOCK_FRAMES = 256
+
+# Precomputed position cycles for the periodic motion patterns
+SIDE_TO_SIDE_CYCLE = ping_pong(126, 33, 95, phase=63, hold=True).tolist()  # 95 -> 33 -> 95
+LINE_Y_CYCLE = ping_pong(124, 33, 95).tolist()  # vertical pan 33 -> 95 -> 33
+LINE_X_CYCLE = ramp(43, 3, 127).tolist()        # dots 0, 3, ... 126, then wrap
+
 # Global state for each pattern function
 dotLR_state = {'i': 33}
 dotRL_state = {'i': 96}
-sideToSideDot_state = {'direction': 'RL', 'i': 96}
+sideToSideDot_state = {'i': 0}
 horizontalLineRL_state = {'i': 33}
 horizontalLineLR_state = {'i': 96}
 horizontalLineSideToSide_state = {'direction': 'RL', 'i': 33}
@@ -18,10 +33,10 @@ wiggleLine_state = {'i': 40, 'direction': 1}
 crazyDots_state = {'count': 0}
 crazyDots2_state = {'initialized': False}
 spazzCircle_state = {'initialized': False}
-spotlight_state = {'x': 0, 'y': 0, 'dx': 0, 'dy': 0, 'start_time': 0, 'duration': 0, 'initialized': False}
-driftingDot_state = {'x': 0, 'y': 0, 'angle': 0, 'initialized': False}
+spotlight_state = {'origin': None, 'steps': None, 'path': None, 'xs': [], 'ys': [], 'i': 0, 'angle': 0, 'hold': 0, 'speed': None, 'initialized': False}
+driftingDot_state = {'origin': None, 'angle': 0, 'turns': None, 'path': None, 'headings': None, 'xs': [], 'ys': [], 'i': 0, 'speed': None, 'initialized': False}
 stillBeam_state = {'x': 0, 'y': 0, 'initialized': False}
-lineWithDotsRL_state = {'y': 33, 'y_direction': 1, 'x': 0, 'x_direction': 1}
+lineWithDotsRL_state = {'frame': 0}
 twoCircleSpin_state = {'initialized': False}
 voiceWave_state = {'initialized': False}
 
@@ -34,6 +49,31 @@ def calculateSpeedForRange(start, stop, speed):
     movementSpeed = start + speed * (difference / 10)
     return math.floor(movementSpeed)
 
+def seed_patterns(seed):
+    """Seed both random sources used by the patterns, for repeatable output."""
+    global rng
+    random.seed(seed)
+    rng = np.random.default_rng(seed)
+
+# Trajectory blocks are laid out at speeds rounded to this step, so a gliding
+# speed (speed_control.SpeedRamp) only re-lays a block when it crosses a step
+PATH_SPEED_STEP = 0.25
+
+def _path_speed(speed):
+    """Speed rounded to PATH_SPEED_STEP (at least one step) for laying out a block."""
+    return max(PATH_SPEED_STEP, round(speed / PATH_SPEED_STEP) * PATH_SPEED_STEP)
+
+def _rebase_block(state, *keys):
+    """
+    Drop the frames of a trajectory block that were already shown, so the
+    rest can be laid out again (e.g. at a new speed) from the current point.
+    """
+    i = state['i']
+    if i:
+        state['origin'] = state['path'][i - 1]
+        for key in keys:
+            state[key] = state[key][i:]
+
 def dotLR(dmx, speed):
     """
     Advances one step left-to-right across DMX channel 8.
@@ -65,18 +105,9 @@ def sideToSideDot(dmx, speed):
     """Oscillates a dot back and forth, one step per call."""
     dmx.set_channel(4, 16)
     
-    if sideToSideDot_state['direction'] == 'RL':
-        dmx.set_channel(8, sideToSideDot_state['i'])
-        sideToSideDot_state['i'] -= 1
-        if sideToSideDot_state['i'] < 33:
-            sideToSideDot_state['direction'] = 'LR'
-            sideToSideDot_state['i'] = 33
-    else:  # direction == 'LR'
-        dmx.set_channel(8, sideToSideDot_state['i'])
-        sideToSideDot_state['i'] += 1
-        if sideToSideDot_state['i'] > 95:
-            sideToSideDot_state['direction'] = 'RL'
-            sideToSideDot_state['i'] = 95
+    i = sideToSideDot_state['i']
+    dmx.set_channel(8, SIDE_TO_SIDE_CYCLE[i])
+    sideToSideDot_state['i'] = (i + 1) % len(SIDE_TO_SIDE_CYCLE)
     
     time.sleep(1 / (50 * speed))
 
@@ -181,112 +212,91 @@ def spazzCircle(dmx, speed):
     dmx.set_channel(8, random.randint(0, 127))
     time.sleep(1 / (1.75 * speed))
 
+def _spotlight_path(state, speed):
+    """Lay out the spotlight block's remaining headings at the given speed."""
+    positions, state['path'] = bounce_in_box(state['origin'], state['steps'] * speed, 47, 80)
+    state['xs'] = positions[:, 0].astype(int).tolist()
+    state['ys'] = positions[:, 1].astype(int).tolist()
+    state['i'] = 0
+    state['speed'] = speed
+
 def spotlight(dmx, speed):
     """Bouncing spotlight with random direction changes, one frame per call."""
     state = spotlight_state
+    frames_per_second = 10 * speed  # matches the 0.1 / speed sleep
     
     # Initialize if needed
     if not state['initialized']:
-        min_bound = 47
-        max_bound = 80
-        state['x'] = random.uniform(min_bound, max_bound)
-        state['y'] = random.uniform(min_bound, max_bound)
+        state['origin'] = rng.uniform(47, 80, 2)
         
         dmx.set_channel(2, 29)  # smaller pattern size
         dmx.set_channel(4, 5)   # Circle or movement mode
         
-        # Pick initial direction
-        angle = random.uniform(0, 2 * math.pi)
-        state['dx'] = math.cos(angle)
-        state['dy'] = math.sin(angle)
-        state['start_time'] = time.time()
-        state['duration'] = random.uniform(3, 5)
+        # Pick initial direction, held for 3-5 seconds
+        state['angle'] = rng.uniform(0, 2 * math.pi)
+        state['hold'] = round(rng.uniform(3, 5) * frames_per_second)
         state['initialized'] = True
     
-    # Check if we need a new direction
-    if time.time() - state['start_time'] > state['duration']:
-        angle = random.uniform(0, 2 * math.pi)
-        state['dx'] = math.cos(angle)
-        state['dy'] = math.sin(angle)
-        state['start_time'] = time.time()
-        state['duration'] = random.uniform(1, 3)
-    
-    # Update position
-    min_bound = 47
-    max_bound = 80
-    state['x'] += state['dx'] * speed
-    state['y'] += state['dy'] * speed
-    
-    # Bounce off edges
-    if state['x'] <= min_bound:
-        state['dx'] *= -1
-        state['x'] = min_bound
-    elif state['x'] >= max_bound:
-        state['dx'] *= -1
-        state['x'] = max_bound
-    
-    if state['y'] <= min_bound:
-        state['dy'] *= -1
-        state['y'] = min_bound
-    elif state['y'] >= max_bound:
-        state['dy'] *= -1
-        state['y'] = max_bound
+    if state['i'] >= len(state['xs']):
+        # Block used up: continue from its last point, new direction every 1-3 seconds
+        if state['path'] is not None:
+            state['origin'] = state['path'][-1]
+        headings, state['angle'], state['hold'] = random_headings(
+            BLOCK_FRAMES, state['angle'], state['hold'],
+            round(1 * frames_per_second), round(3 * frames_per_second), rng)
+        state['steps'] = np.column_stack((np.cos(headings), np.sin(headings)))
+        _spotlight_path(state, _path_speed(speed))
+    elif _path_speed(speed) != state['speed']:
+        _rebase_block(state, 'steps')
+        _spotlight_path(state, _path_speed(speed))
     
     # Send to DMX
-    dmx.set_channel(7, int(state['x']))
-    dmx.set_channel(8, int(state['y']))
+    dmx.set_channel(7, state['xs'][state['i']])
+    dmx.set_channel(8, state['ys'][state['i']])
+    state['i'] += 1
     
     time.sleep(0.1 / speed)
 
+def _drifting_path(state, speed):
+    """Lay out the drifting dot block's remaining turns at the given speed."""
+    drift_strength = 0.1 * speed
+    movement_speed = 1.5 * speed
+    positions, state['path'], state['headings'] = random_walk(
+        state['origin'], state['angle'], state['turns'] * drift_strength, movement_speed, 33, 96)
+    state['xs'] = positions[:, 0].astype(int).tolist()
+    state['ys'] = positions[:, 1].astype(int).tolist()
+    state['i'] = 0
+    state['speed'] = speed
+
 def driftingDot(dmx, speed):
     """Drifting dot with organic movement, one frame per call."""
     state = driftingDot_state
     
     # Initialize if needed
     if not state['initialized']:
-        min_bound = 33
-        max_bound = 96
-        center_x = (min_bound + max_bound) / 2
-        center_y = (min_bound + max_bound) / 2
-        
-        state['x'] = center_x
-        state['y'] = center_y
-        state['angle'] = random.uniform(0, 2 * math.pi)
+        state['origin'] = np.array([64.5, 64.5])  # center of the 33-96 box
+        state['angle'] = rng.uniform(0, 2 * math.pi)
         state['initialized'] = True
         
         dmx.set_channel(4, 16)  # dot
     
-    # Control parameters
-    drift_strength = 0.1 * speed
-    movement_speed = 1.5 * speed
-    
-    # Drift the angle slightly
-    state['angle'] += random.uniform(-drift_strength, drift_strength)
-    
-    # Propose new position
-    dx = math.cos(state['angle']) * movement_speed
-    dy = math.sin(state['angle']) * movement_speed
-    new_x = state['x'] + dx
-    new_y = state['y'] + dy
-    
-    # Reflect angle if hitting bounds
-    min_bound = 33
-    max_bound = 96
-    
-    if new_x < min_bound or new_x > max_bound:
-        state['angle'] = math.pi - state['angle']
-        new_x = state['x']  # cancel movement in x
-    if new_y < min_bound or new_y > max_bound:
-        state['angle'] = -state['angle']
-        new_y = state['y']  # cancel movement in y
-    
-    # Commit new position
-    state['x'] = new_x
-    state['y'] = new_y
+    if state['i'] >= len(state['xs']):
+        # Block used up: continue from its last point and heading
+        if state['path'] is not None:
+            state['origin'] = state['path'][-1]
+            state['angle'] = state['headings'][-1]
+        state['turns'] = rng.uniform(-1, 1, BLOCK_FRAMES)
+        _drifting_path(state, _path_speed(speed))
+    elif _path_speed(speed) != state['speed']:
+        if state['i']:
+            state['angle'] = state['headings'][state['i'] - 1]
+        _rebase_block(state, 'turns')
+        _drifting_path(state, _path_speed(speed))
     
     # Send to DMX
-    dmx.set_channel(7, int(state['x']))
-    dmx.set_channel(8, int(state['y']))
+    dmx.set_channel(7, state['xs'][state['i']])
+    dmx.set_channel(8, state['ys'][state['i']])
+    state['i'] += 1
     
     time.sleep(0.05)
 
@@ -318,29 +328,15 @@ def lineWithDotsRL_UD(dmx, speed):
     dmx.set_channel(21, 57)  # spaced dots, laser 2
     dmx.set_channel(23, 32)  # rotate 90 degrees
     
-    # Define bounds
-    min_y = 33
-    max_y = 95
-    max_x = 127
-    
-    # Update vertical pan position (slower)
-    state['y'] += state['y_direction']
-    if state['y'] >= max_y:
-        state['y'] = max_y
-        state['y_direction'] = -1
-    elif state['y'] <= min_y:
-        state['y'] = min_y
-        state['y_direction'] = 1
-    
-    # Update horizontal dot position (faster)
-    state['x'] += state['x_direction'] * 3
-    if state['x'] >= max_x:
-        state['x'] = 0
+    # Vertical pan bounces (slower), dots wrap side to side (faster)
+    state['frame'] += 1
+    y = LINE_Y_CYCLE[state['frame'] % len(LINE_Y_CYCLE)]
+    x = LINE_X_CYCLE[state['frame'] % len(LINE_X_CYCLE)]
     
     # Apply positions to DMX
-    dmx.set_channel(7, state['y'])   # vertical pan main line
-    dmx.set_channel(24, state['y'])  # move line down/up together
-    dmx.set_channel(25, state['x'])  # dots side to side inside the line
+    dmx.set_channel(7, y)   # vertical pan main line
+    dmx.set_channel(24, y)  # move line down/up together
+    dmx.set_channel(25, x)  # dots side to side inside the line
     
     time.sleep(0.02 / speed)
 
@@ -356,15 +352,11 @@ def lineWithDotsRL_still(dmx, speed):
     dmx.set_channel(21, 57)  # spaced dots, laser 2
     dmx.set_channel(23, 32)  # rotate 90 degrees
     
-    min_x = 0
-    max_x = 127
-    
-    # Update horizontal dot position
-    state['x'] += state['x_direction'] * 3
-    if state['x'] >= max_x:
-        state['x'] = 0
+    # Dots step right 3 per frame, wrapping to 0 after 126
+    state['frame'] += 1
+    x = 3 * state['frame'] % 129
     
-    dmx.set_channel(25, state['x'])  # dots side to side inside the line
+    dmx.set_channel(25, x)  # dots side to side inside the line
     
     time.sleep(0.15 / speed)
 
@@ -390,6 +382,7 @@ def twoCircleSpin(dmx, speed):
     
     movementSpeed = calculateSpeedForRange(192, 223, speed)
     dmx.set_channel(6, movementSpeed)
+    time.sleep(0.05)  # The laser spins the circles itself; only the speed needs refreshing
 
 def voiceWave(dmx, speed):
     """Voice wave pattern using circle with auto movement."""
@@ -408,11 +401,11 @@ def reset_pattern_states():
     global horizontalLineRL_state, horizontalLineLR_state, horizontalLineSideToSide_state
     global circleZoomIn_state, wiggleLine_state, crazyDots_state, crazyDots2_state
     global spazzCircle_state, spotlight_state, driftingDot_state, stillBeam_state
-    global lineWithDotsRL_UD_state, twoCircleSpin_state, voiceWave_state, lineWithDotsRL_still_state
+    global lineWithDotsRL_state, twoCircleSpin_state, voiceWave_state
     
     dotLR_state = {'i': 33}
     dotRL_state = {'i': 96}
-    sideToSideDot_state = {'direction': 'RL', 'i': 96}
+    sideToSideDot_state = {'i': 0}
     horizontalLineRL_state = {'i': 33}
     horizontalLineLR_state = {'i': 96}
     horizontalLineSideToSide_state = {'direction': 'RL', 'i': 33}
@@ -421,12 +414,10 @@ def reset_pattern_states():
     crazyDots_state = {'count': 0}
     crazyDots2_state = {'initialized': False}
     spazzCircle_state = {'initialized': False}
-    spotlight_state = {'x': 0, 'y': 0, 'dx': 0, 'dy': 0, 'start_time': 0, 'duration': 0, 'initialized': False}
-    driftingDot_state = {'x': 0, 'y': 0, 'angle': 0, 'initialized': False}
+    spotlight_state = {'origin': None, 'steps': None, 'path': None, 'xs': [], 'ys': [], 'i': 0, 'angle': 0, 'hold': 0, 'speed': None, 'initialized': False}
+    driftingDot_state = {'origin': None, 'angle': 0, 'turns': None, 'path': None, 'headings': None, 'xs': [], 'ys': [], 'i': 0, 'speed': None, 'initialized': False}
     stillBeam_state = {'x': 0, 'y': 0, 'initialized': False}
-    lineWithDotsRL_UD_state = {'y': 33, 'y_direction': 1, 'x': 0, 'x_direction': 1}
-    lineWithDotsRL_still_state = {'x': 0, 'x_direction': 1}
-
+    lineWithDotsRL_state = {'frame': 0}
     twoCircleSpin_state = {'initialized': False}
     voiceWave_state = {'initialized': False}
 
@@ -0,0 +1,363 @@
+# === Pattern Signature Index ===
+# Matches label segments to pattern functions by their audio.
+#
+# Label files record the pattern *group* of every frame, not the function that
+# played, so signatures are learned per group: every labelled run of a group
+# is summarised by the mean and spread of its MFCC frames, and those summaries
+# are clustered into one cluster per function in the group. Which cluster
+# belongs to which function can't be learned from group labels: by default
+# the clusters, quietest (lowest mean MFCC 0) first, get the functions in
+# pattern_groups order, which is arbitrary. `info` prints the mapping, and a
+# mapping file (group -> function names, quietest cluster first) sets it at
+# build time or corrects an existing index with `assign`.
+#
+# The index is small (one row per function), so queries are brute force in
+# NumPy with the signature norms cached: a segment costs one matrix-vector
+# product.
+#
+#   python pattern_index.py build --labels-dir labeling/labels -o pattern_index.npz
+#   python pattern_index.py info pattern_index.npz
+#   python pattern_index.py assign pattern_index.npz mapping.json
+#
+# mapping.json: {"2": ["spazzCircle", "crazyDots", ...], ...}
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from label_io import npz_member_names, read_npz_members
+from label_timeline import LabelTimeline
+from selection import SelectionPolicy
+
+DEFAULT_INDEX_PATH = Path("pattern_index.npz")
+
+# === Signatures ===
+
+def segment_signatures(mfcc, starts, ends):
+    """
+    Mean and standard deviation of the MFCC frames of each segment.
+
+    Args:
+        mfcc (np.ndarray): (frames, coefficients) at the label frame rate
+        starts (np.ndarray): First frame of each segment
+        ends (np.ndarray): Frame after the last of each segment
+
+    Returns:
+        np.ndarray: (segments, 2 * coefficients) float32 signatures
+    """
+    mfcc = np.asarray(mfcc, dtype=np.float64)
+    # Prefix sums give every segment's mean and variance without a loop
+    zero = np.zeros((1, mfcc.shape[1]))
+    total = np.concatenate((zero, np.cumsum(mfcc, axis=0)))
+    total_sq = np.concatenate((zero, np.cumsum(mfcc ** 2, axis=0)))
+
+    starts = np.clip(np.asarray(starts), 0, len(mfcc))
+    ends = np.clip(np.asarray(ends), starts + 1, len(mfcc))
+    count = np.maximum(ends - starts, 1)[:, None]
+    mean = (total[ends] - total[starts]) / count
+    var = (total_sq[ends] - total_sq[starts]) / count - mean ** 2
+    return np.hstack((mean, np.sqrt(np.maximum(var, 0)))).astype(np.float32)
+
+def kmeans(points, k, seed=0, iterations=50):
+    """
+    Cluster points with Lloyd's algorithm from a k-means++ start.
+
+    Returns:
+        np.ndarray: (k, dims) cluster centres
+    """
+    rng = np.random.default_rng(seed)
+    centres = [points[rng.integers(len(points))]]
+    for _ in range(1, k):
+        d2 = np.min([((points - c) ** 2).sum(axis=1) for c in centres], axis=0)
+        probs = d2 / d2.sum() if d2.sum() > 0 else None
+        centres.append(points[rng.choice(len(points), p=probs)])
+    centres = np.array(centres)
+
+    for _ in range(iterations):
+        nearest = np.argmin(((points[:, None, :] - centres[None]) ** 2).sum(axis=2), axis=1)
+        updated = np.array([points[nearest == j].mean(axis=0) if np.any(nearest == j) else centres[j]
+                            for j in range(k)])
+        if np.allclose(updated, centres):
+            break
+        centres = updated
+    return centres
+
+def check_mapping(mapping, pattern_groups):
+    """
+    Check that a cluster mapping only names functions of their own group.
+
+    Raises:
+        ValueError: Listing the names that aren't in their group
+    """
+    for group, names in mapping.items():
+        known = {f.__name__ for f in pattern_groups.get(int(group), [])}
+        unknown = [name for name in names if name not in known]
+        if unknown:
+            raise ValueError(f"Not in pattern group {group}: {', '.join(unknown)}")
+
+# === Index ===
+
+class PatternIndex:
+    """Nearest-neighbour lookup from segment signatures to pattern functions."""
+    def __init__(self, names, groups, signatures, mean, std):
+        """
+        Args:
+            names (array): Function name of each signature
+            groups (array): Pattern group of each signature
+            signatures (np.ndarray): (n, dims) raw signatures
+            mean, std (np.ndarray): Standardisation applied to signatures and queries
+        """
+        self.names = np.asarray(names, dtype=str)
+        self.groups = np.asarray(groups, dtype=np.int64)
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.std = np.asarray(std, dtype=np.float32)
+        self.signatures = self.standardise(signatures)
+        # Cached for the |q|^2 + |s|^2 - 2 q.s distance expansion
+        self.norms = (self.signatures ** 2).sum(axis=1)
+        self.rows_by_group = {int(g): np.flatnonzero(self.groups == g) for g in np.unique(self.groups)}
+
+    def standardise(self, signatures):
+        return ((np.asarray(signatures, dtype=np.float32) - self.mean) / self.std).astype(np.float32)
+
+    def distances(self, signatures, names):
+        """
+        Squared distances from each query signature to the named functions' signatures.
+
+        Args:
+            signatures (np.ndarray): (queries, dims) raw signatures
+            names (list): Function names to compare against (missing names get inf)
+
+        Returns:
+            np.ndarray: (queries, len(names)) squared distances
+        """
+        queries = self.standardise(np.atleast_2d(signatures))
+        rows = [np.flatnonzero(self.names == n) for n in names]
+        found = np.array([len(r) > 0 for r in rows])
+        cols = np.array([r[0] if len(r) else 0 for r in rows])
+
+        d2 = (queries ** 2).sum(axis=1)[:, None] + self.norms[cols][None, :] \
+            - 2 * queries @ self.signatures[cols].T
+        d2 = np.maximum(d2, 0)
+        d2[:, ~found] = np.inf
+        return d2
+
+    def query(self, signature, group):
+        """
+        Best-matching function name for one segment of a group.
+
+        Returns:
+            tuple: (name, squared distance), or (None, inf) if the group isn't indexed
+        """
+        rows = self.rows_by_group.get(int(group))
+        if rows is None or not len(rows):
+            return None, np.inf
+        q = self.standardise(signature)
+        d2 = q @ q + self.norms[rows] - 2 * self.signatures[rows] @ q
+        best = int(np.argmin(d2))
+        return str(self.names[rows[best]]), float(d2[best])
+
+    def mapping(self):
+        """
+        Function names of each group's signatures, quietest cluster first.
+
+        Returns:
+            dict: group -> list of names
+        """
+        return {group: [str(self.names[r]) for r in rows] for group, rows in self.rows_by_group.items()}
+
+    def assign(self, mapping):
+        """
+        Rename signatures: each listed group's clusters, quietest first, get
+        the given function names.
+
+        Args:
+            mapping (dict): group -> function names, one per signature of the group
+
+        Raises:
+            ValueError: If a group isn't indexed or the number of names doesn't match
+        """
+        names = self.names.astype(object)
+        for group, group_names in mapping.items():
+            rows = self.rows_by_group.get(int(group))
+            if rows is None:
+                raise ValueError(f"Group {group} is not in the index")
+            if len(group_names) != len(rows):
+                raise ValueError(f"Group {group} has {len(rows)} signatures, got {len(group_names)} names")
+            names[rows] = group_names
+        self.names = names.astype(str)
+
+    def save(self, path):
+        raw = self.signatures * self.std + self.mean
+        np.savez(path, names=self.names, groups=self.groups, signatures=raw, mean=self.mean, std=self.std)
+
+    @classmethod
+    def load(cls, path):
+        data = read_npz_members(path, ('names', 'groups', 'signatures', 'mean', 'std'), mmap=False)
+        return cls(data['names'], data['groups'], data['signatures'], data['mean'], data['std'])
+
+    @classmethod
+    def build(cls, label_paths, pattern_groups, fps=10, seed=0, mapping=None):
+        """
+        Learn function signatures from labelled songs.
+
+        Args:
+            label_paths (list): Label files containing mfcc, pattern_labels and speed_labels
+            pattern_groups (dict): Group -> list of functions
+            fps (float): Label frames per second
+            seed (int): Seed for clustering
+            mapping (dict): Group -> function names for its clusters, quietest first;
+                groups left out use pattern_groups order
+
+        Returns:
+            PatternIndex
+
+        Raises:
+            ValueError: If no run has mfcc, or a mapping names a function outside its group
+        """
+        mapping = {int(g): names for g, names in (mapping or {}).items()}
+        check_mapping(mapping, pattern_groups)
+
+        runs = {g: [] for g in pattern_groups}
+        for path in label_paths:
+            arrays = read_npz_members(path, ('mfcc', 'pattern_labels', 'speed_labels'))
+            timeline = LabelTimeline.from_labels(arrays['pattern_labels'], arrays['speed_labels'], fps)
+            points, run_ends, _ = SelectionPolicy().choice_points(timeline, pattern_groups)
+            signatures = segment_signatures(arrays['mfcc'], timeline.starts[points], timeline.ends[run_ends - 1])
+            for group, signature in zip(timeline.patterns[points], signatures):
+                runs[int(group)].append(signature)
+
+        everything = np.array([s for group_runs in runs.values() for s in group_runs])
+        if not len(everything):
+            raise ValueError("No labelled segments with mfcc found")
+        mean = everything.mean(axis=0)
+        std = everything.std(axis=0) + 1e-6
+
+        names, groups, centres = [], [], []
+        for group, funcs in pattern_groups.items():
+            if not runs[group] or not funcs:
+                continue
+            points = (np.array(runs[group]) - mean) / std
+            k = min(len(funcs), len(points))
+            group_centres = kmeans(points, k, seed=seed)
+            # Quietest cluster to the first name, and so on
+            group_centres = group_centres[np.argsort(group_centres[:, 0])]
+            group_names = mapping.get(group, [f.__name__ for f in funcs])
+            if len(group_names) < k:
+                raise ValueError(f"Mapping for group {group} names {len(group_names)} functions, need {k}")
+            for name, centre in zip(group_names, group_centres):
+                names.append(name)
+                groups.append(group)
+                centres.append(centre * std + mean)
+        return cls(names, groups, np.array(centres), mean, std)
+
+# === Matching Policy ===
+
+class MatchingPolicy(SelectionPolicy):
+    """
+    SelectionPolicy that prefers the function whose signature is closest to
+    the segment's audio. Weights, minimum durations and cooldowns still apply.
+    """
+    def __init__(self, index, mfcc, temperature=1.0, **kwargs):
+        """
+        Args:
+            index (PatternIndex): Function signatures
+            mfcc (np.ndarray): The song's (frames, coefficients) MFCCs at the label frame rate
+            temperature (float): Randomness of the match; near 0 always takes the closest
+            **kwargs: SelectionPolicy arguments (weights, cooldown, min_duration, seed)
+        """
+        super().__init__(**kwargs)
+        self.index = index
+        self.mfcc = mfcc
+        self.temperature = temperature
+
+    def scores(self, timeline, points, run_seconds, funcs):
+        scores = super().scores(timeline, points, run_seconds, funcs)
+        starts = timeline.starts[points]
+        ends = starts + np.round(run_seconds * timeline.fps).astype(np.int64)
+        d2 = self.index.distances(segment_signatures(self.mfcc, starts, ends), [f.__name__ for f in funcs])
+        # Functions missing from the index keep their plain weight
+        d2[:, np.isinf(d2).all(axis=0)] = 0
+        return scores - d2 / (2 * max(self.temperature, 1e-6))
+
+# === Command Line ===
+
+def read_mapping(path):
+    """Cluster-to-function mapping from a JSON file: {"group": [names, quietest cluster first]}."""
+    with open(path) as f:
+        return {int(group): list(names) for group, names in json.load(f).items()}
+
+def print_mapping(index):
+    """Print which function each cluster is assigned to, with a warning that the default is a guess."""
+    mfcc_0 = index.signatures[:, 0] * index.std[0] + index.mean[0]
+    for group, rows in index.rows_by_group.items():
+        for rank, row in enumerate(rows):
+            print(f"  group {group} cluster {rank} (mfcc 0 {mfcc_0[row]:7.1f}): {index.names[row]}")
+    print("⚠️  Clusters are matched to functions by loudness order unless a mapping was given; "
+          "check the assignment and correct it with `pattern_index.py assign`")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or inspect the pattern signature index.")
+    sub = parser.add_subparsers(dest='command', required=True)
+    build = sub.add_parser('build', help="Learn signatures from labelled songs")
+    build.add_argument('--labels-dir', default="labeling/labels", help="Directory of label files with mfcc")
+    build.add_argument('-o', '--output', default=str(DEFAULT_INDEX_PATH), help="Index file to write")
+    build.add_argument('--fps', type=float, default=10, help="Label frames per second")
+    build.add_argument('--seed', type=int, default=0, help="Clustering seed")
+    build.add_argument('--mapping', help="JSON file of function names per group, quietest cluster first")
+    info = sub.add_parser('info', help="Show an index and time a query")
+    info.add_argument('index', nargs='?', default=str(DEFAULT_INDEX_PATH))
+    assign = sub.add_parser('assign', help="Reassign an index's clusters to functions")
+    assign.add_argument('index', help="Index file to update")
+    assign.add_argument('mapping', help="JSON file of function names per group, quietest cluster first")
+    assign.add_argument('-o', '--output', help="Write here instead of updating the index in place")
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        # The dataset code lives in labeling/ as top-level modules
+        sys.path.append(str(Path(__file__).resolve().parent / "labeling"))
+        from build_dataset import label_files
+        from pattern_functions import pattern_groups
+
+        # One file per song, the same one build_dataset would use
+        paths = [p for p in label_files(args.labels_dir).values() if 'mfcc' in npz_member_names(p)]
+        if not paths:
+            print(f"❌ No label files with mfcc in {args.labels_dir}")
+            return 1
+        mapping = read_mapping(args.mapping) if args.mapping else None
+        index = PatternIndex.build(paths, pattern_groups, fps=args.fps, seed=args.seed, mapping=mapping)
+        index.save(args.output)
+        print(f"✓ Indexed {len(index.names)} pattern signatures from {len(paths)} songs → {args.output}")
+        print_mapping(index)
+        return 0
+
+    if args.command == 'assign':
+        from pattern_functions import pattern_groups
+
+        index = PatternIndex.load(args.index)
+        mapping = read_mapping(args.mapping)
+        try:
+            check_mapping(mapping, pattern_groups)
+            index.assign(mapping)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return 1
+        index.save(args.output or args.index)
+        print(f"✓ Reassigned {len(mapping)} groups → {args.output or args.index}")
+        print_mapping(index)
+        return 0
+
+    index = PatternIndex.load(args.index)
+    print_mapping(index)
+    probe = index.signatures[0] * index.std + index.mean
+    started = time.perf_counter()
+    for _ in range(1000):
+        index.query(probe, index.groups[0])
+    print(f"Query: {(time.perf_counter() - started) * 1000:.3f} µs average over 1000")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+# === Pattern Simulation Harness ===
+# Stand-ins for SimpleDMX and the time module so pattern functions can be
+# run offline: no serial port, no real sleeping, fully repeatable.
+# WakeableClock is the live counterpart: real time, but a pattern's sleep
+# can be cut short.
+
+import time
+from contextlib import contextmanager
+
+import pattern_functions
+from pattern_functions import pattern_groups, reset_pattern_states, seed_patterns
+
+class NullDMX:
+    """
+    Drop-in replacement for SimpleDMX that keeps the universe in memory.
+    Nothing is transmitted; channel writes are only recorded and counted.
+    """
+    def __init__(self):
+        # Same layout as SimpleDMX: start code + channels
+        self.dmx_data = bytearray(34)
+        self.write_count = 0
+        self.change_count = 0
+        self.safe_mode = False
+
+    def set_channel(self, channel, value):
+        """Set channel to value (0-255), counting writes that change the output."""
+        if 1 <= channel < len(self.dmx_data):
+            value = max(0, min(255, value))
+            self.write_count += 1
+            if self.dmx_data[channel] != value:
+                self.dmx_data[channel] = value
+                self.change_count += 1
+
+    def enter_safe(self):
+        """Record that SimpleDMX would now be transmitting its safe frame."""
+        self.safe_mode = True
+
+    def leave_safe(self):
+        self.safe_mode = False
+
+    def close(self):
+        """Nothing to close."""
+        pass
+
+class VirtualClock:
+    """
+    Replacement for the time module as seen by pattern_functions.
+    sleep() advances the clock instantly instead of blocking.
+    """
+    def __init__(self, start=0.0):
+        self.now = start
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += max(0.0, seconds)
+
+class WakeableClock:
+    """
+    Real time as seen by pattern_functions, except that sleep() returns as
+    soon as `event` is set. The show runner installs one so a live override
+    takes effect mid-frame instead of after the pattern's sleep.
+    """
+    def __init__(self, event):
+        self.event = event
+
+    def time(self):
+        return time.time()
+
+    def monotonic(self):
+        return time.monotonic()
+
+    def sleep(self, seconds):
+        self.event.wait(max(0.0, seconds))
+
+@contextmanager
+def virtual_time(clock):
+    """
+    Temporarily route pattern_functions' time calls through a VirtualClock
+    (or a WakeableClock).
+
+    Args:
+        clock (VirtualClock): Clock to install while the block runs
+    """
+    real_time = pattern_functions.time
+    pattern_functions.time = clock
+    try:
+        yield clock
+    finally:
+        pattern_functions.time = real_time
+
+def pattern_catalog():
+    """
+    List every registered pattern once, in pattern_groups order.
+
+    Returns:
+        list: (group_number, function) tuples
+    """
+    catalog = []
+    seen = set()
+    for group_num, functions in pattern_groups.items():
+        for func in functions:
+            if func.__name__ not in seen:
+                seen.add(func.__name__)
+                catalog.append((group_num, func))
+    return catalog
+
+def start_pattern(seed):
+    """
+    Put pattern functions into the same state the runner uses on a switch,
+    with a fixed random seed.
+    """
+    reset_pattern_states()
+    seed_patterns(seed)
@@ -0,0 +1,160 @@
+# === Pattern Selection Policy ===
+# Chooses which function of a pattern group plays in each label segment.
+#
+# The whole song is planned up front from its LabelTimeline. Every "choice
+# point" (a segment that starts a new group) gets a score per candidate
+# function: log weight, minus infinity where the group run is shorter than
+# the function's minimum duration, plus Gumbel noise. Taking the best score
+# is a weighted random draw (Gumbel-max), done for all choice points at once
+# with numpy. A short sequential pass then enforces the cooldown by falling
+# back to the next-best function that hasn't played recently.
+#
+# Subclasses can override scores() to bring in other information, e.g. audio
+# features per segment. Live choices (choose()) have no timeline to score
+# against and use weight_scores() alone.
+
+import json
+
+import numpy as np
+
+class SelectionPolicy:
+    """Weighted, seeded pattern selection with cooldowns and minimum durations."""
+    def __init__(self, weights=None, cooldown=2, min_duration=None, seed=None):
+        """
+        Args:
+            weights (dict): Function name -> relative weight (default 1; 0 never picks it)
+            cooldown (int): A function can't be picked again within this many choices of its group
+            min_duration (dict): Function name -> shortest group run (seconds) it is picked for
+            seed (int): Seed for repeatable plans; None for a different plan every time
+        """
+        self.weights = dict(weights or {})
+        self.cooldown = cooldown
+        self.min_duration = dict(min_duration or {})
+        self.seed = seed
+
+    @classmethod
+    def from_dict(cls, spec, seed=None):
+        """Build from e.g. {"weights": {"stillBeam": 0.5}, "cooldown": 2, "min_duration": {"circleZoomIn": 4}}."""
+        return cls(weights=spec.get('weights'), cooldown=spec.get('cooldown', 2),
+                   min_duration=spec.get('min_duration'), seed=seed)
+
+    @classmethod
+    def from_file(cls, path, seed=None):
+        with open(path) as f:
+            return cls.from_dict(json.load(f), seed=seed)
+
+    def choice_points(self, timeline, pattern_groups):
+        """
+        Segments where a new function must be chosen, and how long each group run lasts.
+
+        A run is consecutive segments of the same (known) group; speed changes
+        inside a run keep the function that is playing.
+
+        Returns:
+            tuple: (points, run_ends, active) - segment index of each choice point,
+                index of the segment after its run, and a per-segment mask of
+                segments that play a pattern
+        """
+        groups = timeline.patterns
+        known = np.isin(groups, [g for g, funcs in pattern_groups.items() if funcs])
+        active = known & (timeline.speeds != 0)
+
+        previous = np.concatenate(([-1], np.where(active, groups, -1)[:-1]))
+        points = np.flatnonzero(active & (groups != previous))
+        # A run ends at the next choice point or inactive segment
+        boundaries = np.union1d(np.flatnonzero(~active), points)
+        following = np.searchsorted(boundaries, points, side='right')
+        run_ends = np.append(boundaries, len(groups))[following]
+        return points, run_ends, active
+
+    def weight_scores(self, funcs):
+        """Log weight of each function: its score before anything about the song is known."""
+        weights = np.array([self.weights.get(f.__name__, 1.0) for f in funcs], dtype=float)
+        with np.errstate(divide='ignore'):
+            return np.log(weights)
+
+    def scores(self, timeline, points, run_seconds, funcs):
+        """
+        Log-probability score of every function at every choice point of one group.
+
+        Args:
+            timeline (LabelTimeline): The song
+            points (np.ndarray): Segment index of each choice point
+            run_seconds (np.ndarray): Length of each choice point's group run
+            funcs (list): The group's functions
+
+        Returns:
+            np.ndarray: (len(points), len(funcs)) scores; -inf excludes a function
+        """
+        min_duration = np.array([self.min_duration.get(f.__name__, 0.0) for f in funcs])
+        scores = np.broadcast_to(self.weight_scores(funcs), (len(points), len(funcs))).copy()
+
+        too_short = run_seconds[:, None] < min_duration[None, :]
+        # If nothing fits a run, fall back to ignoring minimum durations for it
+        fits_any = ~np.all(too_short | np.isneginf(scores), axis=1)
+        scores[too_short & fits_any[:, None]] = -np.inf
+        return scores
+
+    def choose(self, group, pattern_groups, rng, recent=()):
+        """
+        One function for a group run starting now, for live label sources
+        where the run's length isn't known yet (so min_duration doesn't apply).
+
+        Args:
+            group (int): Pattern group
+            pattern_groups (dict): Group -> functions
+            rng (np.random.Generator): Random source
+            recent (list): Functions played lately in this group, skipped while the
+                cooldown allows
+
+        Returns:
+            function or None: None for an unknown or empty group
+        """
+        funcs = pattern_groups.get(group) or []
+        if not funcs:
+            return None
+        noisy = self.weight_scores(funcs) + rng.gumbel(size=len(funcs))
+        ranked = [j for j in np.argsort(-noisy) if np.isfinite(noisy[j])] or list(np.argsort(-noisy))
+        cooldown = min(self.cooldown, len(funcs) - 1)
+        blocked = list(recent)[-cooldown:] if cooldown > 0 else []
+        return next((funcs[j] for j in ranked if funcs[j] not in blocked), funcs[ranked[0]])
+
+    def plan(self, timeline, pattern_groups):
+        """
+        Function for every segment of the timeline.
+
+        Returns:
+            list: Function per segment (None where the lights are off or the group is unknown)
+        """
+        rng = np.random.default_rng(self.seed)
+        points, run_ends, active = self.choice_points(timeline, pattern_groups)
+        run_seconds = timeline.ends[run_ends - 1] / timeline.fps - timeline.start_times[points] \
+            if len(points) else np.zeros(0)
+
+        chosen = np.full(len(points), -1)
+        point_groups = timeline.patterns[points]
+        for group, funcs in pattern_groups.items():
+            mine = np.flatnonzero(point_groups == group)
+            if not len(mine) or not funcs:
+                continue
+
+            # Gumbel-max: ranking by score + Gumbel noise is a weighted draw without replacement
+            noisy = self.scores(timeline, points[mine], run_seconds[mine], funcs)
+            noisy = noisy + rng.gumbel(size=noisy.shape)
+            ranked = np.argsort(-noisy, axis=1)
+            allowed = np.isfinite(noisy)
+
+            # Cooldown: take the best-ranked function not among the last few of this group
+            cooldown = min(self.cooldown, len(funcs) - 1)
+            recent = []
+            for row, i in enumerate(mine):
+                options = [j for j in ranked[row] if allowed[row, j]] or list(ranked[row])
+                pick = next((j for j in options if j not in recent), options[0])
+                chosen[i] = pick
+                if cooldown > 0:
+                    recent = (recent + [pick])[-cooldown:]
+
+        # Spread each choice over its run
+        funcs = [pattern_groups[int(g)][j] for g, j in zip(point_groups, chosen)]
+        run_of = np.searchsorted(points, np.arange(len(timeline)), side='right') - 1
+        return [funcs[r] if on else None for r, on in zip(run_of, active)]
@@ -0,0 +1,196 @@
+# === Setlist Mode ===
+# Plays several labelled songs back to back on one DMX connection.
+# While a song plays, the next one is prepared in a background thread
+# (labels, audio, compiled timeline and pattern plan), so the switch to it
+# is immediate and the last frame is held instead of going dark.
+#
+#   python setlist.py song-one song-two song-three --audio-dir labeling/playlist_wavs
+#   python setlist.py --setlist tonight.txt --transport null
+
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from lasersFromLabels import DEFAULT_LABELS_DIR, DEFAULT_PORT, ShowPlayer, load_matching_policy, open_transport
+
+class SetlistRunner:
+    """Plays a list of songs on one open DMX output with background prefetch."""
+    def __init__(self, dmx, songs, labels_dir=DEFAULT_LABELS_DIR, audio_dir=None, fps=10,
+                 seed=None, latency=0.0, audio_device=None, control=None, index=None):
+        """
+        Args:
+            dmx: Open SimpleDMX or NullDMX output (not closed by the runner)
+            songs (list): Song names without extension
+            labels_dir (Path): Directory of label files
+            audio_dir (Path): Directory of <song>.wav files to play and lock to; None for no audio
+            fps (float): Label frames per second
+            seed (int): Base seed; song n uses seed + n
+            latency (float): AudioClock latency offset in seconds
+            audio_device: sounddevice output device
+            control (ControlServer): Live control server to hand each song's player to
+            index (PatternIndex): Match patterns to each song's mfcc instead of choosing at random
+        """
+        from speed_control import build_speed_tables
+
+        self.dmx = dmx
+        self.songs = list(songs)
+        self.labels_dir = Path(labels_dir)
+        self.audio_dir = Path(audio_dir) if audio_dir else None
+        self.fps = fps
+        self.seed = seed
+        self.latency = latency
+        self.audio_device = audio_device
+        self.control = control
+        self.pattern_index = index
+
+        # Measured once, before anything plays, and shared by every song
+        self.speed_tables = build_speed_tables()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch")
+        self.current = None
+        self.stopped = False
+
+    def prepare(self, index):
+        """
+        Load and compile everything song `index` needs before it can play.
+
+        Returns:
+            ShowPlayer: Ready to start
+        """
+        from label_io import find_label_file, load_label_timeline
+        from show_clocks import AudioClock
+
+        song = self.songs[index]
+        started = time.perf_counter()
+        label_path = find_label_file(song, self.labels_dir)
+        timeline = load_label_timeline(label_path, fps=self.fps)
+        seed = None if self.seed is None else self.seed + index
+
+        policy = None
+        if self.pattern_index is not None:
+            policy = load_matching_policy(self.pattern_index, label_path, seed=seed)
+
+        clock = None
+        if self.audio_dir is not None:
+            clock = AudioClock.from_file(self.audio_dir / f"{song}.wav",
+                                         latency=self.latency, device=self.audio_device)
+            clock.prepare()
+
+        player = ShowPlayer(self.dmx, fps=self.fps, seed=seed, clock=clock, timeline=timeline,
+                            speed_tables=self.speed_tables, policy=policy)
+        print(f"✓ Prepared '{song}' ({timeline.duration:.0f}s, {len(timeline)} segments) "
+              f"in {(time.perf_counter() - started) * 1000:.0f} ms")
+        return player
+
+    def run(self):
+        """Play every song in order. Returns when the setlist ends or stop() is called."""
+        if not self.songs:
+            return
+
+        upcoming = self.executor.submit(self.prepare, 0)
+        for index, song in enumerate(self.songs):
+            # A song that can't be prepared is skipped; the show goes on with the next one
+            try:
+                player = upcoming.result()
+            except Exception as e:
+                player = None
+                print(f"❌ Skipping '{song}': {e}")
+            if self.stopped:
+                break
+
+            if player is not None:
+                # Hand over: the previous song's last frame is held until this one starts
+                if self.current is not None:
+                    self.current.stop(clear=False)
+                self.current = player
+                if self.control is not None:
+                    self.control.attach(player)
+                print(f"▶ [{index + 1}/{len(self.songs)}] {song}")
+                player.start()
+
+            # Prefetch the next song while this one plays
+            if index + 1 < len(self.songs):
+                upcoming = self.executor.submit(self.prepare, index + 1)
+            if player is not None:
+                player.wait()
+
+        self.stop()
+
+    def stop(self):
+        """Stop playback and clear the lights."""
+        self.stopped = True
+        if self.current is not None:
+            self.current.stop()
+            self.current = None
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+def read_setlist(path):
+    """Song names from a text file, one per line; blank lines and # comments are skipped."""
+    songs = []
+    with open(path) as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if line:
+                songs.append(line)
+    return songs
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play a setlist of labelled songs back to back.")
+    parser.add_argument('songs', nargs='*', help="Song names without extension")
+    parser.add_argument('--setlist', help="Text file with one song name per line")
+    parser.add_argument('--port', default=DEFAULT_PORT, help="Serial port of the USB-DMX interface")
+    parser.add_argument('--transport', choices=['serial', 'null'], default='serial',
+                        help="'null' runs the show without hardware")
+    parser.add_argument('--labels-dir', default=str(DEFAULT_LABELS_DIR), help="Directory of label files")
+    parser.add_argument('--audio-dir', help="Play <song>.wav from this directory and lock the lights to it")
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help="Seconds to run the lights ahead of the audio (negative delays them)")
+    parser.add_argument('--audio-device', help="sounddevice output device name or index")
+    parser.add_argument('--fps', type=float, default=10, help="Label frames per second")
+    parser.add_argument('--seed', type=int, help="Base seed for a repeatable set")
+    parser.add_argument('--index', help="Pattern signature index (pattern_index.py) to match patterns to each song")
+    parser.add_argument('--control-port', type=int,
+                        help="Accept live OSC overrides on this localhost UDP port (see show_control.py)")
+    args = parser.parse_args(argv)
+
+    songs = list(args.songs)
+    if args.setlist:
+        songs += read_setlist(args.setlist)
+    if not songs:
+        parser.error("no songs given")
+
+    dmx = open_transport(args.transport, args.port)
+    if dmx is None:
+        return 1
+
+    device = int(args.audio_device) if args.audio_device and args.audio_device.isdigit() else args.audio_device
+    control = None
+    if args.control_port is not None:
+        from show_control import ControlServer
+        control = ControlServer(port=args.control_port)
+        control.start()
+
+    index = None
+    if args.index:
+        from pattern_index import PatternIndex
+        index = PatternIndex.load(args.index)
+
+    runner = SetlistRunner(dmx, songs, labels_dir=args.labels_dir, audio_dir=args.audio_dir,
+                           fps=args.fps, seed=args.seed, latency=args.latency, audio_device=device,
+                           control=control, index=index)
+    try:
+        runner.run()
+    except KeyboardInterrupt:
+        print("Interrupted. Shutting down...")
+    finally:
+        # Stop the pattern threads before the port they write to is closed
+        runner.stop()
+        if control is not None:
+            control.stop()
+        dmx.close()
+    print("Setlist complete.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+# === Show Clocks ===
+# Sources of "show time" (seconds into the song) for ShowPlayer.
+#
+# MonotonicClock follows the system clock. AudioClock plays the song itself
+# through a sounddevice output stream and derives show time from the stream's
+# sample clock, so the lights stay locked to what is actually being heard for
+# the whole set instead of drifting with sleep overshoot.
+
+import threading
+import time
+
+class MonotonicClock:
+    """Show time from time.monotonic(); no audio."""
+    def __init__(self):
+        self.origin = None
+
+    def prepare(self):
+        pass
+
+    def start(self, position=0.0):
+        self.seek(position)
+
+    def seek(self, position):
+        self.origin = time.monotonic() - position
+
+    def time(self):
+        """Seconds into the song."""
+        if self.origin is None:
+            return 0.0
+        return time.monotonic() - self.origin
+
+    def nudge(self, seconds):
+        """Shift show time by seconds without a seek."""
+        if self.origin is not None:
+            self.origin -= seconds
+
+    def stop(self):
+        pass
+
+class AudioClock:
+    """
+    Plays the song and reports show time from the output stream's sample
+    clock.
+
+    The stream callback records which sample went into each buffer and when
+    that buffer reaches the DAC, so time() is the position of the sample
+    being heard right now, plus a latency offset.
+    """
+    def __init__(self, audio, sample_rate, latency=0.0, device=None, blocksize=1024):
+        """
+        Args:
+            audio (np.ndarray): float32 samples, shape (frames,) or (frames, channels)
+            sample_rate (int): Sample rate of audio
+            latency (float): Seconds to run the lights ahead of the audio,
+                e.g. to cover DMX/laser response time (negative delays them)
+            device: sounddevice output device (None for the default)
+            blocksize (int): Frames per audio callback
+        """
+        self.audio = audio if audio.ndim == 2 else audio[:, None]
+        self.sample_rate = sample_rate
+        self.latency = latency
+        self.device = device
+        self.blocksize = blocksize
+        self.stream = None
+        self.lock = threading.Lock()
+        self.next_sample = 0     # Next sample to hand to the stream
+        self.anchor = (0, None)  # (first sample of last buffer, its DAC time in stream time)
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        """Load an audio file (anything soundfile reads) and build a clock for it."""
+        import soundfile as sf
+
+        audio, sample_rate = sf.read(path, dtype='float32', always_2d=True)
+        return cls(audio, sample_rate, **kwargs)
+
+    @property
+    def duration(self):
+        return len(self.audio) / self.sample_rate
+
+    def _callback(self, outdata, frames, time_info, status):
+        with self.lock:
+            start = self.next_sample
+            chunk = self.audio[start:start + frames]
+            self.next_sample = start + frames
+            self.anchor = (start, time_info.outputBufferDacTime)
+
+        outdata[:len(chunk)] = chunk
+        outdata[len(chunk):] = 0
+
+    def prepare(self):
+        """Open the output stream without starting it, so start() is immediate."""
+        import sounddevice as sd
+
+        if self.stream is None:
+            self.stream = sd.OutputStream(
+                samplerate=self.sample_rate,
+                channels=self.audio.shape[1],
+                dtype='float32',
+                blocksize=self.blocksize,
+                device=self.device,
+                callback=self._callback,
+            )
+
+    def start(self, position=0.0):
+        self.seek(position)
+        self.prepare()
+        self.stream.start()
+
+    def seek(self, position):
+        """
+        Continue playback from a song position in seconds, clamped to the audio.
+        The latency offset only shifts the reported show time, never which
+        sample plays, so seek(0) always starts at the top of the song.
+        """
+        sample = min(max(0, int(round(position * self.sample_rate))), len(self.audio))
+        with self.lock:
+            self.next_sample = sample
+            self.anchor = (sample, None)
+
+    def time(self):
+        """Seconds into the song, as currently heard, plus the latency offset."""
+        with self.lock:
+            sample, dac_time = self.anchor
+
+        # stop() may clear self.stream from another thread; read it once
+        stream = self.stream
+        position = sample / self.sample_rate
+        if dac_time is not None and stream is not None:
+            # Time since that buffer's first sample reached the DAC
+            position += stream.time - dac_time
+        return position + self.latency
+
+    def nudge(self, seconds):
+        """Shift the lights against the audio by seconds; the audio itself keeps playing."""
+        self.latency += seconds
+
+    def stop(self):
+        if self.stream is not None:
+            self.stream.stop()
+            self.stream.close()
+            self.stream = None
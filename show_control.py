@@ -0,0 +1,315 @@
+# === Live Control Server ===
+# OSC over UDP on localhost for overriding a running ShowPlayer mid-show.
+#
+# Commands (any OSC client, e.g. TouchOSC or `oscsend localhost 9000 /speed f 7`):
+#   /pattern <name or group> [speed]   force a pattern function (or a random one from a group)
+#   /speed <speed>                     force a speed (glides like a labelled speed change)
+#   /blackout [0|1]                    all channels off until released (default 1)
+#   /release [pattern|speed|blackout]  drop one override, or all of them
+#   /nudge <seconds>                   shift show time; with audio, shifts the lights against it
+#   /seek <seconds>                    jump to a show time
+#   /state                             reply once with /state
+#   /subscribe [rate]                  stream /state to the sender at rate Hz (default 20)
+#   /unsubscribe
+#
+# Commands are applied to pattern_state as soon as they arrive and wake the
+# pattern runner, which cuts the current frame's sleep short; /blackout also
+# switches the output to its safe frame immediately. Commands that can't be
+# applied (bad arguments, unknown pattern, speed outside SPEED_RANGE) get an
+# /error reply.
+#
+# /state arguments: show_time, segment, label_pattern, pattern, speed,
+# frame_speed, frames, blackout, forced, stalled
+
+import math
+import random
+import socket
+import struct
+import time
+from threading import Thread, Lock, Event
+
+DEFAULT_CONTROL_PORT = 9000
+
+# Speeds an override may ask for: the range speed_control measures frame periods over
+SPEED_RANGE = (0.5, 10.0)
+
+# Order of the /state message arguments
+STATE_FIELDS = ('show_time', 'segment', 'label_pattern', 'pattern', 'speed',
+                'frame_speed', 'frames', 'blackout', 'forced', 'stalled')
+
+# === OSC Encoding ===
+
+def _pad(data):
+    """OSC strings and blobs are padded with NULs to a multiple of 4 bytes."""
+    return data + b'\0' * (4 - len(data) % 4)
+
+def _read_string(packet, offset):
+    end = packet.index(b'\0', offset)
+    return packet[offset:end].decode('utf-8'), (end // 4 + 1) * 4
+
+def encode_message(address, *args):
+    """
+    Encode an OSC message.
+
+    Args:
+        address (str): OSC address, e.g. "/state"
+        *args: int, float, str or bool arguments
+
+    Returns:
+        bytes: The packet
+    """
+    tags = ','
+    payload = b''
+    for arg in args:
+        if isinstance(arg, bool):
+            tags += 'T' if arg else 'F'
+        elif isinstance(arg, int):
+            tags += 'i'
+            payload += struct.pack('>i', arg)
+        elif isinstance(arg, float):
+            tags += 'f'
+            payload += struct.pack('>f', arg)
+        else:
+            tags += 's'
+            payload += _pad(str(arg).encode('utf-8'))
+    return _pad(address.encode('utf-8')) + _pad(tags.encode('utf-8')) + payload
+
+def decode_packet(packet):
+    """
+    Decode an OSC packet (a message or a bundle of them).
+
+    Returns:
+        list: (address, args) for every message in the packet
+
+    Raises:
+        ValueError: If the packet is malformed or uses an unsupported type tag
+    """
+    try:
+        if packet.startswith(b'#bundle\0'):
+            messages = []
+            offset = 16  # "#bundle\0" + 8-byte timetag (bundles are applied immediately)
+            while offset < len(packet):
+                size, = struct.unpack_from('>i', packet, offset)
+                messages += decode_packet(packet[offset + 4:offset + 4 + size])
+                offset += 4 + size
+            return messages
+
+        address, offset = _read_string(packet, 0)
+        if offset >= len(packet):
+            return [(address, [])]  # Old-style message without a type tag string
+        tags, offset = _read_string(packet, offset)
+
+        args = []
+        for tag in tags[1:]:
+            if tag == 'i':
+                args.append(struct.unpack_from('>i', packet, offset)[0])
+                offset += 4
+            elif tag == 'f':
+                args.append(struct.unpack_from('>f', packet, offset)[0])
+                offset += 4
+            elif tag == 'd':
+                args.append(struct.unpack_from('>d', packet, offset)[0])
+                offset += 8
+            elif tag == 's':
+                value, offset = _read_string(packet, offset)
+                args.append(value)
+            elif tag in 'TF':
+                args.append(tag == 'T')
+            else:
+                raise ValueError(f"Unsupported OSC type tag '{tag}'")
+        return [(address, args)]
+    except (struct.error, UnicodeDecodeError) as e:
+        raise ValueError(f"Malformed OSC packet: {e}") from None
+
+# === Control Server ===
+
+def resolve_pattern(name, pattern_groups):
+    """
+    Pattern function for a /pattern argument.
+
+    Args:
+        name (str or int): Function name, or a pattern group number (a random member is chosen)
+        pattern_groups (dict): Group -> list of functions
+
+    Returns:
+        function
+
+    Raises:
+        KeyError: If no function or group matches
+    """
+    if isinstance(name, (int, float)) or str(name).isdigit():
+        group = pattern_groups.get(int(name))
+        if not group:
+            raise KeyError(f"Unknown pattern group: {name}")
+        return random.choice(group)
+    for funcs in pattern_groups.values():
+        for func in funcs:
+            if func.__name__ == name:
+                return func
+    raise KeyError(f"Unknown pattern: {name}")
+
+def parse_speed(value):
+    """
+    Speed for a /speed or /pattern argument.
+
+    Raises:
+        ValueError: If it isn't a finite number within SPEED_RANGE
+    """
+    speed = float(value)
+    low, high = SPEED_RANGE
+    if not math.isfinite(speed) or not low <= speed <= high:
+        raise ValueError(f"Speed must be between {low:g} and {high:g}, got {value}")
+    return speed
+
+class ControlServer:
+    """Receives OSC commands on localhost and applies them to a ShowPlayer."""
+    def __init__(self, player=None, host='127.0.0.1', port=DEFAULT_CONTROL_PORT):
+        """
+        Args:
+            player (ShowPlayer): Player to control; can be swapped later with attach()
+            host (str): Interface to listen on (keep to localhost unless the network is trusted)
+            port (int): UDP port
+        """
+        self.player = player
+        self.host = host
+        self.port = port
+        self.sock = None
+        self.subscribers = {}  # (host, port) -> seconds between /state messages
+        self.subscriber_lock = Lock()
+        self.stop_flag = Event()
+        self.threads = []
+
+    def attach(self, player):
+        """Control a new player (e.g. the next song in a setlist), carrying overrides over."""
+        old = self.player
+        self.player = player
+        if old is not None and player is not None:
+            with old.pattern_lock:
+                override = dict(old.pattern_state['override'])
+            player.set_override(**override)
+
+    # === Commands ===
+
+    def handle(self, address, args, sender):
+        """
+        Apply one OSC message.
+
+        Returns:
+            bytes or None: Reply packet for the sender
+        """
+        player = self.player
+        if address == '/subscribe':
+            rate = float(args[0]) if args else 20.0
+            with self.subscriber_lock:
+                self.subscribers[sender] = 1.0 / max(rate, 0.1)
+            return None
+        if address == '/unsubscribe':
+            with self.subscriber_lock:
+                self.subscribers.pop(sender, None)
+            return None
+        if player is None:
+            return encode_message('/error', "No show playing")
+
+        if address == '/pattern':
+            func = resolve_pattern(args[0], player.pattern_groups)
+            speed = parse_speed(args[1]) if len(args) > 1 else None
+            player.set_override(func=func, speed=speed)
+        elif address == '/speed':
+            player.set_override(speed=parse_speed(args[0]))
+        elif address == '/blackout':
+            player.set_override(blackout=bool(args[0]) if args else True)
+        elif address == '/release':
+            if args:
+                key = {'pattern': 'func'}.get(args[0], args[0])
+                player.set_override(**{key: None})
+            else:
+                player.release()
+        elif address == '/nudge':
+            player.nudge(float(args[0]))
+        elif address == '/seek':
+            player.seek(float(args[0]))
+        elif address == '/state':
+            return self.state_message()
+        else:
+            return encode_message('/error', f"Unknown command {address}")
+        return None
+
+    def state_message(self):
+        """The player's current snapshot as a /state packet."""
+        state = self.player.snapshot()
+        return encode_message('/state', *(state[field] for field in STATE_FIELDS))
+
+    # === Threads ===
+
+    def serve(self):
+        """Receive and apply commands until stop() is called."""
+        while not self.stop_flag.is_set():
+            try:
+                packet, sender = self.sock.recvfrom(4096)
+            except socket.timeout:
+                continue
+            except OSError:
+                break  # Socket closed by stop()
+
+            # A bad command (or a failure applying it) is reported to the sender; the server keeps running
+            try:
+                for address, args in decode_packet(packet):
+                    reply = self.handle(address, args, sender)
+                    if reply is not None:
+                        self.sock.sendto(reply, sender)
+            except (ValueError, KeyError, IndexError, TypeError) as e:
+                print(f"❌ Control command rejected: {e}")
+                self.reply_error(e, sender)
+            except Exception as e:
+                print(f"❌ Control command failed: {type(e).__name__}: {e}")
+                self.reply_error(e, sender)
+
+    def reply_error(self, error, sender):
+        """Send /error to the sender of a command that couldn't be applied."""
+        try:
+            self.sock.sendto(encode_message('/error', str(error)), sender)
+        except OSError:
+            pass  # Sender unreachable or socket closed by stop()
+
+    def stream_telemetry(self):
+        """Send /state to each subscriber at the rate it asked for."""
+        next_send = {}
+        while not self.stop_flag.wait(0.005):
+            if self.player is None:
+                continue
+            with self.subscriber_lock:
+                subscribers = dict(self.subscribers)
+            now = time.monotonic()
+            due = [s for s, interval in subscribers.items() if now >= next_send.get(s, 0)]
+            if not due:
+                continue
+
+            message = self.state_message()
+            for sender in due:
+                next_send[sender] = now + subscribers[sender]
+                try:
+                    self.sock.sendto(message, sender)
+                except OSError:
+                    with self.subscriber_lock:
+                        self.subscribers.pop(sender, None)
+
+    def start(self):
+        """Bind the socket and start the command and telemetry threads."""
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind((self.host, self.port))
+        self.sock.settimeout(0.2)
+        self.stop_flag.clear()
+        self.threads = [Thread(target=self.serve, daemon=True),
+                        Thread(target=self.stream_telemetry, daemon=True)]
+        for thread in self.threads:
+            thread.start()
+        print(f"✓ Control server listening on osc.udp://{self.host}:{self.sock.getsockname()[1]}")
+
+    def stop(self):
+        self.stop_flag.set()
+        for thread in self.threads:
+            thread.join()
+        self.threads = []
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
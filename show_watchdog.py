@@ -0,0 +1,99 @@
+# === Pattern Stall Watchdog ===
+# A pattern function that hangs (or loops forever inside one frame) leaves the
+# DMX transmitter resending the last universe with the beam frozen in place.
+#
+# ShowPlayer's runner marks when each frame starts and how long it may take,
+# based on the pattern's measured frame period at that speed. The watchdog
+# checks that mark once per DMX packet; a frame that overruns its deadline
+# switches the transmitter to its safe frame (everything off) and reports the
+# stall with a sample of the runner's stack. Output resumes once the runner
+# completes a frame again.
+
+import sys
+import time
+import traceback
+from threading import Thread, Event
+
+# One DMX packet at SimpleDMX's ~40 fps transmit rate
+DMX_PERIOD = 1 / 40
+
+class StallWatchdog:
+    """Puts the DMX output in safe mode when the pattern runner stops producing frames."""
+    def __init__(self, player, min_deadline=0.25, periods=4, interval=DMX_PERIOD):
+        """
+        Args:
+            player (ShowPlayer): Player whose runner is watched
+            min_deadline (float): Shortest time any frame is allowed, in seconds
+            periods (float): Allowed frame time as a multiple of the pattern's measured period
+            interval (float): Seconds between checks
+        """
+        self.player = player
+        self.min_deadline = min_deadline
+        self.periods = periods
+        self.interval = interval
+        self.stalled = False
+        self.stall_count = 0
+        self.stop_flag = Event()
+        self.thread = None
+
+    def deadline(self, func, speed):
+        """Seconds a frame of func at speed may take before it counts as a stall."""
+        table = self.player.speed_tables.get(func.__name__)
+        period = table.period(speed) if table else 0.0
+        return max(self.min_deadline, self.periods * period)
+
+    def check(self, now=None):
+        """
+        Compare the runner's current frame against its deadline and switch
+        safe mode on or off.
+
+        Returns:
+            bool: True while stalled
+        """
+        player = self.player
+        started, deadline = player.frame_started, player.frame_deadline
+        now = time.monotonic() if now is None else now
+        overdue = started is not None and now - started > deadline
+
+        if overdue and not self.stalled:
+            player.dmx.enter_safe()
+            self.stalled = True
+            self.stall_count += 1
+            self.report(now - started, deadline)
+        elif not overdue and self.stalled:
+            player.dmx.leave_safe()
+            self.stalled = False
+            print("✓ Pattern runner recovered, output restored")
+        return self.stalled
+
+    def report(self, elapsed, deadline):
+        """Print which pattern stalled and where the runner thread is stuck."""
+        func = self.player.current_func
+        name = func.__name__ if func else "?"
+        print(f"❌ Pattern stall: {name} has been in one frame for {elapsed:.2f}s "
+              f"(deadline {deadline:.2f}s), output switched to the safe frame")
+
+        thread = self.player.pattern_thread
+        frame = sys._current_frames().get(thread.ident) if thread is not None else None
+        if frame is not None:
+            print("Runner stack sample (most recent call last):")
+            print("".join(traceback.format_stack(frame)).rstrip())
+
+    def run(self):
+        while not self.stop_flag.wait(self.interval):
+            self.check()
+
+    def start(self):
+        # A previous player on this output may have been abandoned in safe mode
+        self.player.dmx.leave_safe()
+        self.stalled = False
+        self.stop_flag.clear()
+        self.thread = Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop watching. Safe mode is left on if the runner is still stuck."""
+        self.stop_flag.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
@@ -0,0 +1,107 @@
+# === Continuous Speed Control ===
+# Speed labels are integers 0-9, but patterns accept any positive speed.
+# SpeedRamp glides the running speed toward the labelled target so a pattern
+# can change pace mid-motion instead of being restarted, and SpeedTable maps
+# a (fractional) speed to each pattern's frame period, measured once up front
+# on the virtual clock.
+
+import math
+import time
+
+import numpy as np
+
+from pattern_functions import reset_pattern_states
+from pattern_sim import NullDMX, VirtualClock, virtual_time, pattern_catalog
+
+# Grid the tables are measured on; lookups in between are interpolated
+TABLE_SPEEDS = np.arange(0.5, 10.01, 0.25)
+
+class SpeedTable:
+    """Frame period (seconds) of one pattern as a function of speed."""
+    def __init__(self, speeds, periods):
+        self.speeds = np.asarray(speeds, dtype=float)
+        self.periods = np.asarray(periods, dtype=float)
+
+    def period(self, speed):
+        """Seconds per frame at this speed."""
+        return float(np.interp(speed, self.speeds, self.periods))
+
+    def rate(self, speed):
+        """Frames per second at this speed (inf for patterns that never sleep)."""
+        period = self.period(speed)
+        return 1.0 / period if period > 0 else math.inf
+
+def measure_period(func, speed, frames=4):
+    """
+    Measure a pattern's average sleep per frame at one speed on a virtual clock.
+    The first frame is skipped since it may only initialize.
+    """
+    dmx = NullDMX()
+    clock = VirtualClock()
+    reset_pattern_states()
+    with virtual_time(clock):
+        func(dmx, speed)
+        start = clock.now
+        for _ in range(frames):
+            func(dmx, speed)
+    return (clock.now - start) / frames
+
+def build_speed_tables(speeds=TABLE_SPEEDS):
+    """
+    Measure a SpeedTable for every registered pattern.
+
+    This swaps pattern_functions onto a virtual clock while it runs, so call
+    it before any pattern thread starts. Pattern states are reset afterwards.
+
+    Returns:
+        dict: Pattern name -> SpeedTable
+    """
+    tables = {}
+    for _, func in pattern_catalog():
+        tables[func.__name__] = SpeedTable(speeds, [measure_period(func, s) for s in speeds])
+    reset_pattern_states()
+    return tables
+
+class SpeedRamp:
+    """
+    Speed that follows its target smoothly (exponential glide) instead of
+    jumping, so running patterns adopt new speeds mid-motion.
+    """
+    def __init__(self, glide=0.75):
+        """
+        Args:
+            glide (float): Time constant in seconds; about 95% of a change
+                is reached after 3 * glide
+        """
+        self.glide = glide
+        self.current = None
+        self.target = None
+        self.last_time = None
+
+    def jump(self, speed, now=None):
+        """Set the speed immediately, e.g. when a new pattern starts."""
+        self.current = self.target = float(speed)
+        self.last_time = time.monotonic() if now is None else now
+
+    def set_target(self, speed):
+        """Glide toward a new speed."""
+        if self.current is None:
+            self.jump(speed)
+        self.target = float(speed)
+
+    def value(self, now=None):
+        """Current interpolated speed."""
+        if self.current is None:
+            return None
+        now = time.monotonic() if now is None else now
+        dt = now - self.last_time
+        self.last_time = now
+
+        if self.current != self.target:
+            if self.glide <= 0:
+                self.current = self.target
+            else:
+                self.current += (self.target - self.current) * (1 - math.exp(-dt / self.glide))
+                if abs(self.target - self.current) < 0.01:
+                    self.current = self.target
+        return self.current
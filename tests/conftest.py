@@ -0,0 +1,8 @@
+import sys
+from pathlib import Path
+
+# Playback modules live at the repo root; the labeling modules import each other from labeling/
+ROOT = Path(__file__).resolve().parent.parent
+for path in (ROOT, ROOT / "labeling"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
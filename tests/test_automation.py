@@ -0,0 +1,101 @@
+import time
+
+import numpy as np
+import pytest
+
+import pattern_functions
+from automation import AutomatedDMX, Automation, Curve
+from lasersFromLabels import ShowPlayer
+from pattern_sim import NullDMX, VirtualClock, start_pattern, virtual_time
+
+def test_single_keyframe_holds_everywhere():
+    assert np.all(Curve([(1.0, 42)]).evaluate([-5, 1, 9]) == 42)
+
+def test_linear_interpolates_and_holds_the_ends():
+    curve = Curve([(0, 0), (4, 100)])
+    assert np.allclose(curve.evaluate([-1, 0, 1, 2, 4, 10]), [0, 0, 25, 50, 100, 100])
+
+def test_ease_is_smoothstep():
+    curve = Curve([(0, 0, 'ease'), (1, 100)])
+    u = np.array([0, 0.25, 0.5, 0.75, 1])
+    assert np.allclose(curve.evaluate(u), 100 * u * u * (3 - 2 * u))
+
+def test_step_holds_until_the_next_keyframe():
+    curve = Curve([(0, 10, 'step'), (2, 90)])
+    assert np.allclose(curve.evaluate([0, 1, 1.99, 2, 3]), [10, 10, 10, 90, 90])
+
+def test_bezier_uses_its_control_values():
+    curve = Curve([(0, 0, 'bezier', 100, 100), (1, 0)])
+    u = np.array([0, 0.5, 1])
+    w = 1 - u
+    assert np.allclose(curve.evaluate(u), 3 * w * w * u * 100 + 3 * w * u * u * 100)
+    assert curve.evaluate([0.5])[0] == pytest.approx(75)
+
+def test_modes_apply_per_segment():
+    curve = Curve([(0, 0, 'step'), (1, 50, 'linear'), (3, 150)])
+    assert np.allclose(curve.evaluate([0.5, 1, 2, 3]), [0, 50, 100, 150])
+
+def test_bad_keyframes_are_rejected():
+    with pytest.raises(ValueError):
+        Curve([])
+    with pytest.raises(ValueError):
+        Curve([(0, 0, 'wobble')])
+    with pytest.raises(ValueError):
+        Curve([(0, 0, 'bezier'), (1, 1)])
+
+def zoom_automation(value=200):
+    automation = Automation()
+    automation.attach(5, Curve([(0, value)]))
+    return automation
+
+def test_automated_channel_survives_pattern_writes():
+    # circleZoomIn writes ch 5 every frame, then sleeps
+    start_pattern(1)
+    automation = zoom_automation()
+    clock = VirtualClock()
+    dmx = NullDMX()
+    automated = AutomatedDMX(dmx, automation, lambda: clock.now)
+    with virtual_time(clock):
+        for _ in range(40):
+            pattern_functions.circleZoomIn(automated, 5)
+            assert dmx.dmx_data[5] == 200
+            assert dmx.dmx_data[4] == 5  # other channels pass through
+
+def test_automated_channel_follows_show_time():
+    automation = Automation()
+    automation.attach(6, Curve([(0, 0), (10, 100)]))
+    clock = VirtualClock()
+    dmx = NullDMX()
+    automated = AutomatedDMX(dmx, automation, lambda: clock.now)
+    clock.now = 5.0
+    automated.set_channel(6, 0)
+    assert dmx.dmx_data[6] == 50
+
+class FixedPolicy:
+    def __init__(self, func):
+        self.func = func
+
+    def plan(self, timeline, groups):
+        return [self.func if pattern else None for pattern in timeline.patterns]
+
+def test_restore_state_keeps_automated_channels():
+    player = ShowPlayer(NullDMX(), [2] * 40, [4] * 40, fps=10, seed=3, speed_tables={},
+                        automation=zoom_automation(),
+                        policy=FixedPolicy(pattern_functions.circleZoomIn))
+    player.restore_state(2.5)
+    assert player.dmx.dmx_data[5] == 200
+
+def test_runner_keeps_automated_channels_while_playing():
+    player = ShowPlayer(NullDMX(), [2] * 600, [4] * 600, seed=1, speed_tables={},
+                        automation=zoom_automation(),
+                        policy=FixedPolicy(pattern_functions.circleZoomIn))
+    player.start()
+    try:
+        time.sleep(0.1)
+        samples = []
+        for _ in range(20):
+            samples.append(tuple(player.dmx.dmx_data[4:6]))
+            time.sleep(0.01)
+    finally:
+        player.stop()
+    assert samples == [(5, 200)] * 20
@@ -0,0 +1,69 @@
+import numpy as np
+
+from build_dataset import FEATURE_COLUMNS, Dataset, build, label_files
+from extract_features import N_MFCC
+from rhythm_features import RHYTHM_COLUMNS
+
+def write_song(labels_dir, name, frames, seed, features=True, suffix='.mfcc_labels.npz'):
+    """A label file as extract_features.py leaves it; returns its feature matrix."""
+    rng = np.random.default_rng(seed)
+    arrays = {'pattern_labels': rng.integers(0, 9, frames, dtype=np.uint8),
+              'speed_labels': rng.integers(0, 10, frames, dtype=np.uint8),
+              'waveform': np.zeros(100, np.float32)}
+    if features:
+        arrays['mfcc'] = rng.normal(size=(frames, N_MFCC)).astype(np.float32)
+        arrays['rhythm'] = rng.normal(size=(frames, len(RHYTHM_COLUMNS))).astype(np.float32)
+        arrays['rhythm_columns'] = np.array(RHYTHM_COLUMNS)
+    np.savez_compressed(labels_dir / f"{name}{suffix}", **arrays)
+    if features:
+        return np.hstack((arrays['mfcc'], arrays['rhythm'])), arrays['pattern_labels'], arrays['speed_labels']
+
+def check_song(dataset, name, song):
+    i = dataset.names.index(name)
+    features, patterns, speeds = song
+    assert isinstance(dataset.features[i], np.memmap)
+    np.testing.assert_array_equal(dataset.features[i], features)
+    np.testing.assert_array_equal(dataset.patterns[i], patterns)
+    np.testing.assert_array_equal(dataset.speeds[i], speeds)
+
+def test_label_files_prefers_mfcc_labels(tmp_path):
+    write_song(tmp_path, "both", 5, 0, features=False, suffix='.labels.npz')
+    write_song(tmp_path, "both", 5, 0)
+    write_song(tmp_path, "old", 5, 0, features=False, suffix='.labels.npz')
+    files = label_files(tmp_path)
+    assert list(files) == ["both", "old"]
+    assert files["both"].name == "both.mfcc_labels.npz"
+    assert files["old"].name == "old.labels.npz"
+
+def test_build_and_incremental_rebuild(tmp_path):
+    labels, out = tmp_path / "labels", tmp_path / "dataset"
+    labels.mkdir()
+    songs = {"a": write_song(labels, "a", 30, 1), "b": write_song(labels, "b", 20, 2)}
+    write_song(labels, "c", 10, 3, features=False, suffix='.labels.npz')  # not extracted yet
+
+    assert build(labels, out) == {'written': 2, 'kept': 0, 'skipped': 1, 'removed': 0}
+    dataset = Dataset(out)
+    assert dataset.names == ["a", "b"]
+    assert dataset.columns == FEATURE_COLUMNS
+    assert list(dataset.offsets) == [0, 30, 50]
+    for name, song in songs.items():
+        check_song(dataset, name, song)
+    assert dataset.locate([0, 29, 30, 49])[0].tolist() == [0, 0, 1, 1]
+
+    # Nothing changed: every shard is kept
+    assert build(labels, out) == {'written': 0, 'kept': 2, 'skipped': 1, 'removed': 0}
+
+    # b relabelled, a deleted, c extracted
+    songs["b"] = write_song(labels, "b", 25, 4)
+    (labels / "a.mfcc_labels.npz").unlink()
+    songs["c"] = write_song(labels, "c", 10, 5)
+    del songs["a"]
+    assert build(labels, out) == {'written': 2, 'kept': 0, 'skipped': 0, 'removed': 1}
+    dataset = Dataset(out)
+    assert dataset.names == ["b", "c"]
+    assert list(dataset.offsets) == [0, 25, 35]
+    for name, song in songs.items():
+        check_song(dataset, name, song)
+    assert len(list((out / "shards").glob("*.npy"))) == 3 * 2
+
+    assert build(labels, out, full=True)['written'] == 2
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from decode import StreamingDecoder, ViterbiDecoder, mode_filter, smooth_labels
+
+def noisy_probs(labels, n_classes=3, confidence=0.8, flip_every=None):
+    """One-hot-ish probabilities for a label sequence, optionally flipping every nth frame to class 2."""
+    probs = np.full((len(labels), n_classes), (1 - confidence) / (n_classes - 1))
+    probs[np.arange(len(labels)), labels] = confidence
+    if flip_every:
+        flipped = probs[::flip_every].copy()
+        flipped[:] = (1 - confidence) / (n_classes - 1)
+        flipped[:, 2] = confidence
+        probs[::flip_every] = flipped
+    return probs
+
+def test_flicker_shorter_than_min_duration_is_removed():
+    labels = np.array([0] * 40 + [1] * 40)
+    probs = noisy_probs(labels, flip_every=7)
+    np.testing.assert_array_equal(smooth_labels(probs, switch_penalty=2.0, min_duration=5), labels)
+
+@pytest.mark.parametrize('min_duration', [5, 127, 128, 200, 300])
+def test_long_minimum_durations(min_duration):
+    labels = np.array([0] * 400 + [1] * 400 + [0] * 400)
+    probs = noisy_probs(labels, flip_every=11)
+    decoded = ViterbiDecoder(3, switch_penalty=2.0, min_duration=min_duration).decode(probs)
+    np.testing.assert_array_equal(decoded, labels)
+
+def test_runs_never_shorter_than_min_duration():
+    rng = np.random.default_rng(0)
+    probs = rng.dirichlet(np.ones(4), size=500)
+    decoded = smooth_labels(probs, switch_penalty=0.5, min_duration=8)
+    runs = np.diff(np.flatnonzero(np.diff(np.r_[-1, decoded, -1])))
+    assert runs.min() >= 8
+
+def test_min_duration_one_with_no_penalty_is_argmax():
+    rng = np.random.default_rng(1)
+    probs = rng.dirichlet(np.ones(3), size=100)
+    np.testing.assert_array_equal(smooth_labels(probs, switch_penalty=0.0, min_duration=1), probs.argmax(axis=1))
+
+def test_empty_input():
+    assert len(smooth_labels(np.zeros((0, 3)))) == 0
+
+def test_streaming_with_enough_lag_matches_offline():
+    labels = np.array([0] * 30 + [1] * 30 + [2] * 30)
+    probs = noisy_probs(labels, flip_every=9)
+    offline = smooth_labels(probs, switch_penalty=2.0, min_duration=5)
+
+    lag = 20
+    stream = StreamingDecoder(3, switch_penalty=2.0, min_duration=5, lag=lag)
+    out = [stream.push(p) for p in probs]
+    assert out[:lag] == [None] * lag
+    np.testing.assert_array_equal(out[lag:], offline[:len(probs) - lag])
+
+def test_streaming_without_lag_answers_immediately():
+    stream = StreamingDecoder(3, lag=0)
+    assert stream.push([0.1, 0.8, 0.1]) == 1
+    stream.reset()
+    assert stream.scores is None
+
+def test_mode_filter():
+    np.testing.assert_array_equal(mode_filter([0, 0, 1, 0, 0, 2, 2, 2, 0, 2], width=3),
+                                  [0, 0, 0, 0, 0, 2, 2, 2, 2, 2])
+    np.testing.assert_array_equal(mode_filter([3, 1], width=1), [3, 1])
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+librosa = pytest.importorskip('librosa')
+sf = pytest.importorskip('soundfile')
+
+from extract_features import N_MFCC, SAMPLE_RATE, extract_song
+
+def write_song(tmp_path, name="song", seconds=3.0, n_labels=30):
+    """A clicky tone, and tk.py-style labels with the waveform embedded."""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    y = 0.3 * np.sin(2 * np.pi * 220 * t) * (1 + np.sign(np.sin(2 * np.pi * 2 * t)))
+    wav = tmp_path / f"{name}.wav"
+    sf.write(wav, y.astype(np.float32), SAMPLE_RATE)
+
+    labels_dir = tmp_path / "labels"
+    labels_dir.mkdir(exist_ok=True)
+    np.savez(labels_dir / f"{name}.labels.npz", pattern_labels=np.full(n_labels, 2, np.uint8),
+             speed_labels=np.full(n_labels, 5, np.uint8), waveform=y, sample_rate=SAMPLE_RATE)
+    return wav, labels_dir
+
+def extract(wav, labels_dir, tmp_path, **kwargs):
+    return extract_song(wav, labels_dir, cache_dir=tmp_path / "cache", stems_dir=tmp_path / "stems", **kwargs)
+
+def test_extract_song_writes_aligned_features(tmp_path):
+    wav, labels_dir = write_song(tmp_path)
+    name, status = extract(wav, labels_dir, tmp_path)
+    assert name == "song" and status.startswith("✅")
+
+    with np.load(labels_dir / "song.mfcc_labels.npz") as data:
+        assert 'waveform' not in data.files
+        assert data['mfcc'].shape == (30, N_MFCC)
+        assert len(data['rhythm']) == 30
+        assert np.all(data['pattern_labels'] == 2)
+
+def test_song_without_labels_is_skipped(tmp_path):
+    wav, labels_dir = write_song(tmp_path)
+    (labels_dir / "song.labels.npz").unlink()
+    assert "no labels" in extract(wav, labels_dir, tmp_path)[1]
+    assert not list(labels_dir.iterdir())
+
+def test_only_changed_songs_are_extracted_again(tmp_path):
+    wav, labels_dir = write_song(tmp_path)
+    output = labels_dir / "song.mfcc_labels.npz"
+    extract(wav, labels_dir, tmp_path)
+    written = output.stat().st_mtime_ns
+
+    # Unchanged: kept as is
+    assert "already extracted" in extract(wav, labels_dir, tmp_path)[1]
+    assert output.stat().st_mtime_ns == written
+
+    # Forced: written again with the same features
+    with np.load(output) as data:
+        mfcc = data['mfcc']
+    assert extract(wav, labels_dir, tmp_path, force=True)[1].startswith("✅")
+    with np.load(output) as data:
+        np.testing.assert_allclose(data['mfcc'], mfcc)
+
+    # Relabelled to a different length without features: refitted to the new labels
+    np.savez(output, pattern_labels=np.full(25, 3, np.uint8), speed_labels=np.full(25, 5, np.uint8))
+    assert extract(wav, labels_dir, tmp_path)[1].startswith("✅")
+    with np.load(output) as data:
+        assert data['mfcc'].shape == (25, N_MFCC)
+        assert len(data['rhythm']) == 25
+        assert np.all(data['pattern_labels'] == 3)
@@ -0,0 +1,56 @@
+import os
+
+import numpy as np
+
+from feature_cache import FeatureCache
+
+def age(cache, key, seconds_ago):
+    """Backdate an entry's last use."""
+    path = cache.root / f"{key}.npy"
+    stamp = path.stat().st_mtime - seconds_ago
+    os.utime(path, (stamp, stamp))
+
+def test_round_trip_is_memory_mapped(tmp_path):
+    cache = FeatureCache(tmp_path)
+    assert cache.get('mfcc-x') is None
+    stored = cache.put('mfcc-x', np.arange(12, dtype=np.float32).reshape(3, 4))
+    loaded = cache.get('mfcc-x')
+    assert isinstance(loaded, np.memmap) and not loaded.flags.writeable
+    np.testing.assert_array_equal(stored, loaded)
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    block = np.zeros(1000, dtype=np.float64)  # 8 kB plus a header
+    cache = FeatureCache(tmp_path, max_bytes=3 * 8300)
+    for key in ('old', 'used', 'new'):
+        cache.put(key, block)
+    age(cache, 'old', 300)
+    age(cache, 'used', 200)
+    age(cache, 'new', 100)
+    cache.get('used')  # a hit counts as use
+
+    cache.put('newest', block)
+    assert cache.get('old') is None
+    assert cache.get('used') is not None
+    assert cache.get('new') is not None
+    assert cache.size() <= cache.max_bytes
+
+def test_the_entry_just_written_survives_a_small_bound(tmp_path):
+    cache = FeatureCache(tmp_path, max_bytes=100)
+    cache.put('first', np.zeros(1000))
+    cache.put('second', np.zeros(1000))
+    assert cache.get('first') is None
+    assert cache.get('second') is not None
+
+def test_keys_follow_content_and_settings(tmp_path):
+    cache = FeatureCache(tmp_path / "cache")
+    song = tmp_path / "song.wav"
+    song.write_bytes(b"RIFF one")
+    copy = tmp_path / "renamed.wav"
+    copy.write_bytes(b"RIFF one")
+    key = cache.key(song, 'mfcc', 22050, 512, n_mfcc=13)
+    assert cache.key(copy, 'mfcc', 22050, 512, n_mfcc=13) == key
+    assert cache.key(song, 'mfcc', 22050, 256, n_mfcc=13) != key
+
+    song.write_bytes(b"RIFF two")
+    os.utime(song, ns=(1, 1))  # a different size/mtime stamp forces a rehash
+    assert cache.key(song, 'mfcc', 22050, 512, n_mfcc=13) != key
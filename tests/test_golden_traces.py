@@ -0,0 +1,12 @@
+import numpy as np
+import pytest
+
+from golden_traces import diff_traces, golden_path, record_trace
+from pattern_sim import pattern_catalog
+
+@pytest.mark.parametrize('func', [func for _, func in pattern_catalog()], ids=lambda func: func.__name__)
+def test_pattern_matches_its_golden_trace(func):
+    path = golden_path(func)
+    assert path.exists(), f"no golden at {path}; record it with `python golden_traces.py record`"
+    expected = np.load(path)
+    assert diff_traces(expected, record_trace(func, frames=expected.shape[1])) is None
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from label_io import find_label_file, load_label_timeline, npz_member_names, read_npz_members
+
+def write_labels(path, compressed, **extra):
+    arrays = {'pattern_labels': np.array([1, 1, 2]), 'speed_labels': np.array([4, 4, 4]),
+              'waveform': np.zeros(100, dtype=np.float32), **extra}
+    (np.savez_compressed if compressed else np.savez)(path, **arrays)
+
+@pytest.mark.parametrize('compressed', [False, True])
+def test_reads_only_requested_members(tmp_path, compressed):
+    path = tmp_path / "song.mfcc_labels.npz"
+    write_labels(path, compressed)
+    arrays = read_npz_members(path, ('pattern_labels', 'speed_labels'))
+    assert set(arrays) == {'pattern_labels', 'speed_labels'}
+    assert arrays['pattern_labels'].tolist() == [1, 1, 2]
+    assert isinstance(arrays['speed_labels'], np.memmap) != compressed
+
+def test_missing_member_raises_key_error(tmp_path):
+    path = tmp_path / "song.labels.npz"
+    write_labels(path, False)
+    with pytest.raises(KeyError):
+        read_npz_members(path, ('mfcc',))
+    assert set(npz_member_names(path)) == {'pattern_labels', 'speed_labels', 'waveform'}
+
+def test_find_label_file_prefers_mfcc_labels(tmp_path):
+    write_labels(tmp_path / "song.labels.npz", False)
+    assert find_label_file("song", tmp_path).name == "song.labels.npz"
+    write_labels(tmp_path / "song.mfcc_labels.npz", False)
+    assert find_label_file("song", tmp_path).name == "song.mfcc_labels.npz"
+    with pytest.raises(FileNotFoundError):
+        find_label_file("other", tmp_path)
+
+def test_timeline_is_cached_until_the_file_changes(tmp_path):
+    path = tmp_path / "song.mfcc_labels.npz"
+    write_labels(path, False)
+    first = load_label_timeline(path)
+    assert load_label_timeline(path) is first
+    np.savez(path, pattern_labels=np.array([3, 3, 3, 3]), speed_labels=np.array([2, 2, 2, 2]))
+    changed = load_label_timeline(path)
+    assert changed is not first
+    assert changed.patterns.tolist() == [3]
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from label_timeline import LabelTimeline
+
+def test_runs_become_segments():
+    timeline = LabelTimeline.from_labels([1, 1, 1, 2, 2, 2], [5, 5, 6, 6, 6, 6], fps=10)
+    assert timeline.starts.tolist() == [0, 2, 3]
+    assert timeline.patterns.tolist() == [1, 1, 2]
+    assert timeline.speeds.tolist() == [5, 6, 6]
+    assert timeline.segment(1) == (2, 3, 1, 6)
+    assert timeline.duration == 0.6
+
+def test_off_frames_merge_whatever_the_other_label():
+    timeline = LabelTimeline.from_labels([0, 3, 2, 1], [4, 0, 0, 7])
+    assert timeline.starts.tolist() == [0, 3]
+    assert timeline.patterns.tolist() == [0, 1]
+    assert timeline.speeds.tolist() == [0, 7]
+
+def test_segment_at_and_end_times():
+    timeline = LabelTimeline.from_labels([1] * 5 + [2] * 5, [3] * 10, fps=10)
+    assert timeline.segment_at(0.0) == 0
+    assert timeline.segment_at(0.49) == 0
+    assert timeline.segment_at(0.5) == 1
+    assert timeline.segment_at(-1.0) == 0
+    assert timeline.segment_at(1.0) is None
+    assert timeline.segment_end_time(0) == 0.5
+    assert timeline.segment_end_time(1) == 1.0
+
+def test_empty_labels_have_no_segments():
+    timeline = LabelTimeline.from_labels([], [])
+    assert len(timeline) == 0
+    assert timeline.segment_at(0.0) is None
+
+def test_length_mismatch_is_rejected():
+    with pytest.raises(ValueError):
+        LabelTimeline.from_labels(np.ones(3), np.ones(4))
@@ -0,0 +1,77 @@
+import numpy as np
+import pytest
+
+pytest.importorskip('librosa')
+
+import live
+import rhythm_features as rf
+from extract_features import N_MFCC, SAMPLE_RATE
+from label_timeline import LabelTimeline
+from lasersFromLabels import ShowPlayer
+from models import MODELS
+from pattern_sim import NullDMX
+from rhythm_features import RHYTHM_COLUMNS
+from show_control import ControlServer
+
+def click_track(bpm, seconds):
+    y = np.zeros(int(SAMPLE_RATE * seconds), dtype=np.float32)
+    blip = (np.hanning(200) * np.sin(np.arange(200) * 0.5)).astype(np.float32)
+    for t in np.arange(0.25, seconds - 0.1, 60 / bpm):
+        i = int(t * SAMPLE_RATE)
+        y[i:i + 200] += blip
+    return y
+
+def make_labeler(**kwargs):
+    model = MODELS['linear'](N_MFCC + len(RHYTHM_COLUMNS), 5, seed=0)
+    return live.LiveLabeler(model, SAMPLE_RATE, lag=0, **kwargs)
+
+def feed(labeler, audio, block=2205):
+    for i in range(0, len(audio), block):
+        labeler.push(audio[i:i + block])
+
+@pytest.fixture
+def beat_passes(monkeypatch):
+    """Counts rhythm_features calls that track beats."""
+    calls = []
+    original = rf.rhythm_features
+
+    def counting(*args, **kwargs):
+        calls.append(kwargs.get('beats', True))
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(rf, 'rhythm_features', counting)
+    return calls
+
+def test_beats_are_tracked_every_few_frames(beat_passes):
+    labeler = make_labeler(rhythm_every=5)
+    feed(labeler, click_track(120, 8))
+    full = sum(beat_passes)
+    assert labeler.frames >= 70
+    assert labeler.frames / 5 - 2 <= full <= labeler.frames / 5 + 2
+    assert len(beat_passes) - full > full  # the rest are short per-frame passes
+
+def test_beat_columns_continue_between_passes():
+    labeler = make_labeler(rhythm_every=5)
+    feed(labeler, click_track(120, 8))
+    history = labeler.history[:, N_MFCC:]
+    tempo = history[:, RHYTHM_COLUMNS.index('tempo')]
+    phase = history[:, RHYTHM_COLUMNS.index('beat_phase')]
+    beat = history[:, RHYTHM_COLUMNS.index('beat')]
+    assert np.all(np.abs(tempo - 120) < 3)
+    assert np.all((phase >= 0) & (phase < 1)) and np.any(phase > 0)
+    assert beat.sum() >= 1  # 120 BPM: a beat every 5 frames of the 5-frame history
+
+def test_seek_is_rejected_in_live_mode():
+    player = ShowPlayer(NullDMX(), timeline=LabelTimeline.from_labels([], []), speed_tables={})
+    with pytest.raises(ValueError):
+        player.seek(10.0)
+    assert player.restore_state(10.0) is None
+
+    # The control server turns the ValueError into an /error reply; the live pattern keeps playing
+    player.set_pattern(live_pattern, 5)
+    with pytest.raises(ValueError):
+        ControlServer(player).handle('/seek', [10.0], None)
+    assert player.pattern_state['func'] is live_pattern
+
+def live_pattern(dmx, speed):
+    pass
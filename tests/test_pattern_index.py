@@ -0,0 +1,66 @@
+import json
+
+import numpy as np
+import pytest
+
+import pattern_index
+from pattern_index import PatternIndex, check_mapping
+
+def quiet(dmx, speed): pass
+def loud(dmx, speed): pass
+
+GROUPS = {1: [quiet, loud]}
+
+def write_song(path, seed):
+    """Song alternating quiet and loud runs of group 1, with gaps between them."""
+    rng = np.random.default_rng(seed)
+    mfcc, patterns, speeds = [], [], []
+    for run in range(8):
+        level = -20.0 if run % 2 == 0 else 20.0
+        mfcc.append(rng.normal(level, 1.0, size=(20, 3)))
+        mfcc.append(np.zeros((2, 3)))
+        patterns += [1] * 20 + [0] * 2
+        speeds += [5] * 20 + [0] * 2
+    np.savez(path, mfcc=np.vstack(mfcc), pattern_labels=np.array(patterns), speed_labels=np.array(speeds))
+
+def test_default_mapping_follows_group_order(tmp_path):
+    write_song(tmp_path / "a.mfcc_labels.npz", 0)
+    index = PatternIndex.build([tmp_path / "a.mfcc_labels.npz"], GROUPS)
+    assert index.mapping() == {1: ['quiet', 'loud']}
+    assert index.query(np.r_[np.full(3, -20.0), np.ones(3)], 1)[0] == 'quiet'
+
+def test_explicit_mapping_and_assign(tmp_path):
+    write_song(tmp_path / "a.mfcc_labels.npz", 0)
+    index = PatternIndex.build([tmp_path / "a.mfcc_labels.npz"], GROUPS, mapping={'1': ['loud', 'quiet']})
+    assert index.mapping() == {1: ['loud', 'quiet']}
+
+    index.assign({1: ['quiet', 'loud']})
+    index.save(tmp_path / "index.npz")
+    reloaded = PatternIndex.load(tmp_path / "index.npz")
+    assert reloaded.mapping() == {1: ['quiet', 'loud']}
+    assert reloaded.query(np.r_[np.full(3, 20.0), np.ones(3)], 1)[0] == 'loud'
+
+def test_bad_mappings_are_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        check_mapping({1: ['quiet', 'spotlight']}, GROUPS)
+    write_song(tmp_path / "a.mfcc_labels.npz", 0)
+    index = PatternIndex.build([tmp_path / "a.mfcc_labels.npz"], GROUPS)
+    with pytest.raises(ValueError):
+        index.assign({1: ['quiet']})
+    with pytest.raises(ValueError):
+        index.assign({7: ['quiet', 'loud']})
+
+def test_build_uses_one_label_file_per_song(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr('pattern_functions.pattern_groups', GROUPS)
+    write_song(tmp_path / "a.mfcc_labels.npz", 0)
+    write_song(tmp_path / "a.labels.npz", 1)  # tk.py's copy of the same song
+    write_song(tmp_path / "b.labels.npz", 2)
+    out = tmp_path / "index.npz"
+    assert pattern_index.main(['build', '--labels-dir', str(tmp_path), '-o', str(out)]) == 0
+    assert "from 2 songs" in capsys.readouterr().out
+
+    (tmp_path / "mapping.json").write_text(json.dumps({"1": ["loud", "quiet"]}))
+    assert pattern_index.main(['assign', str(out), str(tmp_path / "mapping.json")]) == 0
+    assert PatternIndex.load(out).mapping() == {1: ['loud', 'quiet']}
+    assert pattern_index.main(['info', str(out)]) == 0
+    assert "loudness order" in capsys.readouterr().out
@@ -0,0 +1,39 @@
+import numpy as np
+
+import pattern_functions
+from lasersFromLabels import ShowPlayer
+from pattern_sim import NullDMX
+
+class FixedPolicy:
+    """Plans one function for every lit segment."""
+    def __init__(self, func):
+        self.func = func
+
+    def plan(self, timeline, groups):
+        return [self.func if pattern else None for pattern in timeline.patterns]
+
+def make_player(seed):
+    # Two lit segments of the same group (a speed change), so one run spans both
+    patterns = [2] * 20 + [2] * 20 + [0] * 10
+    speeds = [4] * 20 + [7] * 20 + [0] * 10
+    return ShowPlayer(NullDMX(), patterns, speeds, fps=10, seed=seed, speed_tables={},
+                      policy=FixedPolicy(pattern_functions.crazyDots))
+
+def test_run_seed_is_shared_by_a_run_and_follows_the_player_seed():
+    player = make_player(seed=3)
+    assert player.run_starts == [0, 0, 2]
+    assert player.run_seed(0) == player.run_seed(1)
+    assert player.run_seed(0) != player.run_seed(2)
+    assert make_player(seed=3).run_seed(1) == player.run_seed(1)
+    assert make_player(seed=4).run_seed(1) != player.run_seed(1)
+
+def test_restore_state_replays_random_patterns_exactly():
+    universes = []
+    for noise in (1, 2):
+        player = make_player(seed=3)
+        pattern_functions.seed_patterns(noise)  # whatever ran before must not matter
+        player.restore_state(2.5)
+        universes.append(list(player.dmx.dmx_data))
+        assert player.pattern_state['seed'] == player.run_seed(1)
+    assert universes[0] == universes[1]
+    assert np.any(universes[0])
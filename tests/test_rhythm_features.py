@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+
+pytest.importorskip('librosa')
+
+from rhythm_features import RHYTHM_COLUMNS, beat_tempo, rhythm_features
+
+SR = 22050
+
+def click_track(bpm, seconds=20):
+    y = np.zeros(int(SR * seconds), dtype=np.float32)
+    blip = (np.hanning(200) * np.sin(np.arange(200) * 0.5)).astype(np.float32)
+    for t in np.arange(0.5, seconds - 0.1, 60 / bpm):
+        i = int(t * SR)
+        y[i:i + 200] += blip
+    return y
+
+def column(rhythm, name):
+    return rhythm[:, RHYTHM_COLUMNS.index(name)]
+
+@pytest.mark.parametrize('bpm', [128, 140])
+def test_tempo_of_a_click_track(bpm):
+    tempo = column(rhythm_features(click_track(bpm), SR), 'tempo')
+    assert abs(np.median(tempo) - bpm) < 0.5
+    # Away from the ends, where the onset envelope misplaces the first and last beats
+    assert np.all(np.abs(tempo[30:-30] - bpm) < 1.5)
+
+def test_beat_tempo_averages_quantised_beats():
+    # 128 BPM beats rounded to 20 ms analysis frames
+    beats = np.round(np.arange(40) * 60 / 128 / 0.02) * 0.02
+    tempo = beat_tempo(beats, np.linspace(1, 15, 50))
+    assert np.all(np.abs(tempo - 128) < 1.0)
+
+def test_stems_present_needs_audio_in_every_stem():
+    y = click_track(120, seconds=5)
+    silent = np.zeros_like(y)
+    cases = [
+        (None, 0.0),
+        ({'vocals': y, 'accompaniment': y}, 1.0),
+        ({'vocals': y}, 0.0),
+        ({'vocals': silent, 'accompaniment': silent}, 0.0),
+    ]
+    for stems, expected in cases:
+        present = column(rhythm_features(y, SR, stems=stems), 'stems_present')
+        assert np.all(present == expected), stems
@@ -0,0 +1,67 @@
+import numpy as np
+
+from label_timeline import LabelTimeline
+from pattern_index import MatchingPolicy, PatternIndex
+from selection import SelectionPolicy
+
+def a(dmx, speed): pass
+def b(dmx, speed): pass
+def c(dmx, speed): pass
+def d(dmx, speed): pass
+
+GROUPS = {1: [a, b, c, d], 2: [a, b]}
+
+def alternating(runs, frames=10):
+    """Timeline of `runs` group runs, alternating group 1 and an off gap."""
+    patterns, speeds = [], []
+    for _ in range(runs):
+        patterns += [1] * frames + [0] * 2
+        speeds += [5] * frames + [0] * 2
+    return LabelTimeline.from_labels(patterns, speeds, fps=10)
+
+def picks(plan):
+    """Function at each choice point (first segment of every lit run)."""
+    chosen, previous = [], None
+    for func in plan:
+        if func is not None and previous is None:
+            chosen.append(func)
+        previous = func
+    return chosen
+
+def test_cooldown_keeps_recent_functions_out():
+    plan = SelectionPolicy(cooldown=2, seed=0).plan(alternating(60), GROUPS)
+    chosen = picks(plan)
+    assert len(chosen) == 60
+    for i in range(2, len(chosen)):
+        assert chosen[i] not in chosen[i - 2:i]
+
+def test_cooldown_is_capped_by_the_group_size():
+    timeline = LabelTimeline.from_labels([2] * 10 + [0] * 2 + [2] * 10, [5] * 10 + [0] * 2 + [5] * 10)
+    chosen = picks(SelectionPolicy(cooldown=5, seed=0).plan(timeline, GROUPS))
+    assert chosen[0] is not chosen[1]
+
+def test_zero_weight_and_min_duration():
+    policy = SelectionPolicy(weights={'a': 0}, min_duration={'b': 5.0}, cooldown=0, seed=1)
+    chosen = picks(policy.plan(alternating(40), GROUPS))  # runs last 1 s
+    assert a not in chosen and b not in chosen
+
+def test_seeded_plans_repeat():
+    timeline = alternating(20)
+    assert SelectionPolicy(seed=3).plan(timeline, GROUPS) == SelectionPolicy(seed=3).plan(timeline, GROUPS)
+
+def test_speed_changes_keep_the_function():
+    timeline = LabelTimeline.from_labels([1] * 20, [3] * 10 + [8] * 10)
+    plan = SelectionPolicy(seed=0).plan(timeline, GROUPS)
+    assert len(plan) == 2 and plan[0] is plan[1]
+
+def test_choose_skips_recent_functions():
+    policy = SelectionPolicy(cooldown=2, weights={'d': 0})
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        assert policy.choose(1, GROUPS, rng, recent=[a, b]) is c
+    assert policy.choose(9, GROUPS, rng) is None
+
+def test_matching_policy_choose_uses_plain_weights():
+    index = PatternIndex(['a', 'b'], [2, 2], np.zeros((2, 4)), np.zeros(4), np.ones(4))
+    policy = MatchingPolicy(index, np.zeros((10, 2)), weights={'a': 0}, seed=0)
+    assert policy.choose(2, GROUPS, np.random.default_rng(0)) is b
@@ -0,0 +1,49 @@
+from pattern_sim import NullDMX
+from setlist import SetlistRunner, read_setlist
+
+class FakePlayer:
+    def __init__(self, song, log):
+        self.song = song
+        self.log = log
+
+    def start(self):
+        self.log.append(('start', self.song))
+
+    def wait(self):
+        pass
+
+    def stop(self, clear=True):
+        self.log.append(('stop', self.song, clear))
+
+class FlakyRunner(SetlistRunner):
+    """Prepares fake players; songs named 'broken' fail like a missing label file."""
+    def __init__(self, songs):
+        super().__init__(NullDMX(), songs)
+        self.log = []
+
+    def prepare(self, index):
+        song = self.songs[index]
+        if song == 'broken':
+            raise FileNotFoundError(f"no labels for {song}")
+        return FakePlayer(song, self.log)
+
+def test_a_song_that_fails_to_prepare_is_skipped():
+    runner = FlakyRunner(['one', 'broken', 'two'])
+    runner.run()
+    assert runner.log == [
+        ('start', 'one'),
+        ('stop', 'one', False),  # last frame held across the skipped song
+        ('start', 'two'),
+        ('stop', 'two', True),
+    ]
+    assert runner.stopped
+
+def test_a_failing_first_song_does_not_end_the_set():
+    runner = FlakyRunner(['broken', 'one'])
+    runner.run()
+    assert ('start', 'one') in runner.log
+
+def test_read_setlist_skips_blanks_and_comments(tmp_path):
+    path = tmp_path / "set.txt"
+    path.write_text("one\n\n# encore\ntwo  # closer\n")
+    assert read_setlist(path) == ['one', 'two']
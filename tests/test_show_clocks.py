@@ -0,0 +1,37 @@
+import numpy as np
+
+from show_clocks import AudioClock, MonotonicClock
+
+def make_clock(latency):
+    return AudioClock(np.zeros(1000, dtype=np.float32), 100, latency=latency)
+
+def test_seek_to_start_plays_from_first_sample_with_negative_latency():
+    clock = make_clock(-0.5)
+    clock.seek(0)
+    assert clock.next_sample == 0
+    assert clock.time() == -0.5
+
+def test_seek_is_clamped_to_the_audio():
+    clock = make_clock(0.2)
+    clock.seek(50)
+    assert clock.next_sample == 1000
+    clock.seek(-3)
+    assert clock.next_sample == 0
+
+def test_latency_shifts_show_time_not_the_sample():
+    clock = make_clock(0.25)
+    clock.seek(4.0)
+    assert clock.next_sample == 400
+    assert clock.time() == 4.25
+
+def test_time_without_a_stream_ignores_dac_anchor():
+    clock = make_clock(0.0)
+    clock.anchor = (300, 12.0)  # as left by a callback, after stop() cleared the stream
+    assert clock.time() == 3.0
+
+def test_monotonic_clock_nudge_moves_show_time():
+    clock = MonotonicClock()
+    clock.start(10.0)
+    before = clock.time()
+    clock.nudge(2.0)
+    assert 1.9 < clock.time() - before < 2.1
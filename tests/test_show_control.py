@@ -0,0 +1,135 @@
+import math
+import socket
+import struct
+import time
+
+import pytest
+
+import pattern_functions
+from lasersFromLabels import ShowPlayer
+from pattern_sim import NullDMX
+from show_control import (ControlServer, decode_packet, encode_message, parse_speed,
+                          resolve_pattern)
+
+# === OSC codec ===
+
+def test_messages_round_trip():
+    packet = encode_message('/state', 3, 1.5, 'spotlight', True, False)
+    assert len(packet) % 4 == 0
+    assert decode_packet(packet) == [('/state', [3, 1.5, 'spotlight', True, False])]
+
+def test_string_lengths_on_a_padding_boundary():
+    for name in ('abc', 'abcd', 'abcde'):
+        assert decode_packet(encode_message('/pattern', name, 2)) == [('/pattern', [name, 2])]
+
+def test_bundles_are_flattened():
+    messages = [encode_message('/speed', 4.0), encode_message('/blackout')]
+    bundle = b'#bundle\0' + bytes(8) + b''.join(struct.pack('>i', len(m)) + m for m in messages)
+    assert decode_packet(bundle) == [('/speed', [4.0]), ('/blackout', [])]
+
+def test_doubles_and_untyped_messages():
+    packet = encode_message('/seek')[:8] + b',d\0\0' + struct.pack('>d', 12.25)
+    assert decode_packet(packet) == [('/seek', [12.25])]
+    assert decode_packet(b'/state\0\0') == [('/state', [])]
+
+def test_malformed_packets_raise_value_error():
+    with pytest.raises(ValueError):
+        decode_packet(encode_message('/speed', 4.0)[:-2])
+    with pytest.raises(ValueError):
+        decode_packet(b'/speed\0\0,b\0\0' + bytes(4))
+
+# === Commands ===
+
+def test_resolve_pattern_by_name_and_group():
+    groups = pattern_functions.pattern_groups
+    assert resolve_pattern('spotlight', groups) is pattern_functions.spotlight
+    assert resolve_pattern(2, groups) in groups[2]
+    assert resolve_pattern('3', groups) in groups[3]
+    with pytest.raises(KeyError):
+        resolve_pattern('noSuchPattern', groups)
+    with pytest.raises(KeyError):
+        resolve_pattern(99, groups)
+
+def test_parse_speed_rejects_unusable_speeds():
+    assert parse_speed(7) == 7.0
+    for bad in (0, -2, math.nan, math.inf, 50):
+        with pytest.raises(ValueError):
+            parse_speed(bad)
+
+def make_player(func=pattern_functions.crazyDots):
+    class FixedPolicy:
+        def plan(self, timeline, groups):
+            return [func if pattern else None for pattern in timeline.patterns]
+    return ShowPlayer(NullDMX(), [2] * 600, [1] * 600, seed=1, speed_tables={}, policy=FixedPolicy())
+
+def test_handle_applies_overrides():
+    player = make_player()
+    server = ControlServer(player)
+    server.handle('/pattern', ['spotlight', 3], None)
+    server.handle('/blackout', [], None)
+    assert player.pattern_state['override'] == {
+        'func': pattern_functions.spotlight, 'speed': 3.0, 'blackout': True}
+    server.handle('/release', ['pattern'], None)
+    assert 'func' not in player.pattern_state['override']
+    server.handle('/release', [], None)
+    assert player.pattern_state['override'] == {}
+    assert decode_packet(server.handle('/bogus', [], None))[0][0] == '/error'
+
+def test_blackout_switches_the_output_off_at_once():
+    player = make_player()
+    player.set_override(blackout=True)
+    assert player.dmx.safe_mode
+
+def test_blackout_interrupts_a_slow_frame():
+    # crazyDots at speed 1 sleeps 0.67 s per frame
+    player = make_player()
+    player.start()
+    try:
+        time.sleep(0.1)
+        assert any(player.dmx.dmx_data[1:])
+        player.set_override(blackout=True)
+        time.sleep(0.15)
+        assert not any(player.dmx.dmx_data[1:])
+        assert not player.dmx.safe_mode  # the universe itself is dark now
+    finally:
+        player.stop()
+
+# === Server ===
+
+class ExplodingPlayer:
+    """Stands in for a player whose methods fail unexpectedly."""
+    def nudge(self, seconds):
+        raise RuntimeError("clock went away")
+
+def exchange(sock, port, *packets):
+    replies = []
+    for packet in packets:
+        sock.sendto(packet, ('127.0.0.1', port))
+        replies.append(decode_packet(sock.recvfrom(4096)[0])[0])
+    return replies
+
+def test_server_reports_errors_and_keeps_serving():
+    player = make_player()
+    server = ControlServer(player, port=0)
+    server.start()
+    port = server.sock.getsockname()[1]
+    client = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    client.settimeout(2)
+    try:
+        (bad_speed, _), (bad_pattern, _), (state, _) = exchange(
+            client, port,
+            encode_message('/speed', 0.0),
+            encode_message('/pattern', 'spotlight', float('nan')),
+            encode_message('/state'))
+        assert (bad_speed, bad_pattern, state) == ('/error', '/error', '/state')
+        assert player.pattern_state['override'] == {}
+
+        server.player = ExplodingPlayer()
+        (failed, args), = exchange(client, port, encode_message('/nudge', 1.0))
+        assert failed == '/error' and 'clock went away' in args[0]
+        server.player = player
+        (state, _), = exchange(client, port, encode_message('/state'))
+        assert state == '/state'
+    finally:
+        client.close()
+        server.stop()
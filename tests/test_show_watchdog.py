@@ -0,0 +1,74 @@
+import pattern_functions
+from pattern_sim import NullDMX
+from show_watchdog import StallWatchdog
+from speed_control import SpeedTable
+
+class StubPlayer:
+    """The attributes of ShowPlayer the watchdog reads."""
+    def __init__(self, speed_tables=None):
+        self.dmx = NullDMX()
+        self.speed_tables = speed_tables or {}
+        self.current_func = pattern_functions.crazyDots
+        self.pattern_thread = None
+        self.frame_started = None
+        self.frame_deadline = None
+
+def test_deadline_scales_the_measured_period():
+    table = SpeedTable([1, 9], [1.0, 0.05])
+    watchdog = StallWatchdog(StubPlayer({'crazyDots': table}), min_deadline=0.25, periods=4)
+    assert watchdog.deadline(pattern_functions.crazyDots, 1) == 4.0
+    # Fast frames still get the minimum
+    assert watchdog.deadline(pattern_functions.crazyDots, 9) == 0.25
+
+def test_deadline_without_a_table_is_the_minimum():
+    watchdog = StallWatchdog(StubPlayer(), min_deadline=0.3)
+    assert watchdog.deadline(pattern_functions.spotlight, 5) == 0.3
+
+def test_idle_runner_is_never_stalled():
+    player = StubPlayer()
+    watchdog = StallWatchdog(player)
+    assert not watchdog.check(now=1000.0)
+    assert not player.dmx.safe_mode
+
+def test_frame_within_its_deadline_is_not_a_stall():
+    player = StubPlayer()
+    player.frame_started, player.frame_deadline = 10.0, 0.5
+    watchdog = StallWatchdog(player)
+    assert not watchdog.check(now=10.4)
+    assert not player.dmx.safe_mode
+
+def test_stall_switches_to_safe_mode_and_recovery_restores_output(capsys):
+    player = StubPlayer()
+    player.frame_started, player.frame_deadline = 10.0, 0.5
+    watchdog = StallWatchdog(player)
+
+    assert watchdog.check(now=10.6)
+    assert player.dmx.safe_mode
+    assert watchdog.stall_count == 1
+    assert "crazyDots" in capsys.readouterr().out
+
+    # Still stuck: reported once
+    assert watchdog.check(now=12.0)
+    assert watchdog.stall_count == 1
+    assert capsys.readouterr().out == ""
+
+    # The runner finishes the frame
+    player.frame_started = None
+    assert not watchdog.check(now=12.1)
+    assert not player.dmx.safe_mode
+    assert "recovered" in capsys.readouterr().out
+
+    # A later stall counts again
+    player.frame_started = 20.0
+    assert watchdog.check(now=21.0)
+    assert watchdog.stall_count == 2
+
+def test_start_leaves_an_abandoned_safe_mode():
+    player = StubPlayer()
+    player.dmx.enter_safe()
+    watchdog = StallWatchdog(player, interval=0.01)
+    watchdog.start()
+    try:
+        assert not player.dmx.safe_mode
+    finally:
+        watchdog.stop()
@@ -0,0 +1,35 @@
+import math
+
+import pattern_functions
+from speed_control import SpeedRamp, SpeedTable, measure_period
+
+def test_ramp_jump_is_immediate():
+    ramp = SpeedRamp(glide=1.0)
+    ramp.jump(3, now=0.0)
+    assert ramp.value(now=5.0) == 3.0
+
+def test_ramp_glides_exponentially_to_target():
+    ramp = SpeedRamp(glide=1.0)
+    ramp.jump(1, now=0.0)
+    ramp.set_target(9)
+    assert math.isclose(ramp.value(now=1.0), 1 + 8 * (1 - math.exp(-1)))
+    assert ramp.value(now=20.0) == 9.0  # snaps once within 0.01
+
+def test_ramp_without_glide_jumps_to_target():
+    ramp = SpeedRamp(glide=0)
+    ramp.jump(2, now=0.0)
+    ramp.set_target(7)
+    assert ramp.value(now=0.1) == 7.0
+
+def test_unset_ramp_has_no_value():
+    assert SpeedRamp().value(now=0.0) is None
+
+def test_table_interpolates_and_reports_rate():
+    table = SpeedTable([1, 2, 3], [0.3, 0.2, 0.0])
+    assert math.isclose(table.period(1.5), 0.25)
+    assert math.isclose(table.rate(2), 5.0)
+    assert table.rate(3) == math.inf
+
+def test_measure_period_uses_the_virtual_clock():
+    # spazzCircle sleeps 1 / (1.75 * speed) per frame
+    assert math.isclose(measure_period(pattern_functions.spazzCircle, 2), 1 / 3.5)
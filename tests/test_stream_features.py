@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+librosa = pytest.importorskip('librosa')
+
+from extract_features import N_FFT, N_MFCC, SAMPLE_RATE, label_aligned_mfcc, label_hop
+from stream_features import LabelFramer
+
+def chirp():
+    rng = np.random.default_rng(0)
+    t = np.arange(int(2.37 * SAMPLE_RATE)) / SAMPLE_RATE
+    y = 0.4 * np.sin(2 * np.pi * (200 + 300 * t) * t) + 0.05 * rng.standard_normal(len(t))
+    return y.astype(np.float32)
+
+def stream(y, sizes):
+    framer = LabelFramer(sr=SAMPLE_RATE)
+    chunks, start = [], 0
+    for size in sizes:
+        chunks.append(framer.push(y[start:start + size]))
+        start += size
+    chunks.append(framer.push(y[start:]))
+    chunks.append(framer.flush(len(y)))
+    return np.concatenate(chunks)
+
+def test_uneven_chunks_match_the_batch_mfcc():
+    y = chirp()
+    batch = label_aligned_mfcc(y, SAMPLE_RATE)
+    assert batch.shape == (len(y) // label_hop(), N_MFCC)
+
+    rng = np.random.default_rng(1)
+    # Empty, single-sample, sub-hop and multi-window pushes
+    sizes = [0, 1, 7, 0, 2204, 2206, 1] + list(rng.integers(1, 3 * N_FFT, 30))
+    np.testing.assert_allclose(stream(y, sizes), batch, rtol=1e-5, atol=1e-3)
+
+def test_batch_mfcc_matches_librosa():
+    y = chirp()
+    hop = label_hop()
+    n = len(y) // hop
+    # The framer's centring: window i starts at i * hop - (N_FFT - hop) // 2
+    padded = np.concatenate((np.zeros((N_FFT - hop) // 2, np.float32), y, np.zeros(N_FFT, np.float32)))
+    mel = librosa.feature.melspectrogram(y=padded, sr=SAMPLE_RATE, n_fft=N_FFT, hop_length=hop, center=False)
+    expected = librosa.feature.mfcc(S=librosa.power_to_db(mel, top_db=None), n_mfcc=N_MFCC).T[:n]
+    np.testing.assert_allclose(label_aligned_mfcc(y, SAMPLE_RATE), expected, rtol=1e-3, atol=1e-2)
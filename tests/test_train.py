@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+import train
+from models import Adam, FrameModel
+
+class TinyDataset:
+    """Three random songs in the shape build_dataset.Dataset exposes."""
+    def __init__(self, root=None):
+        rng = np.random.default_rng(0)
+        self.columns = ('a', 'b', 'c')
+        self.features = [rng.normal(size=(60, 3)).astype(np.float32) for _ in range(3)]
+        self.patterns = [rng.integers(0, 9, 60) for _ in range(3)]
+        self.speeds = [rng.integers(0, 10, 60) for _ in range(3)]
+
+    def __len__(self):
+        return len(self.features)
+
+    @property
+    def n_frames(self):
+        return sum(len(f) for f in self.features)
+
+@pytest.fixture
+def tiny(monkeypatch):
+    monkeypatch.setattr(train, 'Dataset', TinyDataset)
+
+def run(out, epochs, resume=False):
+    return train.train(out=out, kind='linear', window=5, batch_size=16, epochs=epochs,
+                       patience=10, resume=resume, seed=1)
+
+def test_adam_state_round_trips():
+    params = {'W1': np.ones(3, np.float32)}
+    optimizer = Adam(params)
+    optimizer.step({'W1': np.full(3, 0.5, np.float32)})
+    restored = Adam({'W1': params['W1'].copy()})
+    restored.load_state(optimizer.state())
+    assert restored.t == 1
+    np.testing.assert_array_equal(restored.m['W1'], optimizer.m['W1'])
+    np.testing.assert_array_equal(restored.v['W1'], optimizer.v['W1'])
+
+def test_resumed_training_matches_an_uninterrupted_run(tiny, tmp_path):
+    run(tmp_path / "straight", epochs=4)
+    run(tmp_path / "resumed", epochs=2)
+    run(tmp_path / "resumed", epochs=4, resume=True)
+
+    straight = FrameModel.load(tmp_path / "straight" / "linear.last.npz")
+    resumed = FrameModel.load(tmp_path / "resumed" / "linear.last.npz")
+    for name in straight.params:
+        np.testing.assert_allclose(resumed.params[name], straight.params[name], rtol=1e-6)
+
+    progress, adam = train.load_training_state(tmp_path / "resumed" / "linear.last.npz")
+    straight_progress, straight_adam = train.load_training_state(tmp_path / "straight" / "linear.last.npz")
+    assert progress == straight_progress
+    assert int(adam['adam_t']) == int(straight_adam['adam_t']) == 4 * 7  # 2 songs x 56 windows, 16 per batch
@@ -0,0 +1,39 @@
+import numpy as np
+
+import pattern_functions
+from trajectories import bounce_in_box, ping_pong, ramp, reflect
+
+def test_reflect_keeps_points_inside_and_mirrors_at_edges():
+    path = np.array([0.0, 5.0, 10.0, 12.0, 20.0, 25.0, -3.0])
+    folded = reflect(path, 0.0, 10.0)
+    np.testing.assert_allclose(folded, [0.0, 5.0, 10.0, 8.0, 0.0, 5.0, 3.0])
+
+def test_reflect_matches_stepwise_bounce():
+    lo, hi, step = 47.0, 80.0, 3.7
+    x, direction, expected = 50.0, 1.0, []
+    for _ in range(200):
+        x += direction * step
+        if x > hi:
+            x, direction = 2 * hi - x, -direction
+        elif x < lo:
+            x, direction = 2 * lo - x, -direction
+        expected.append(x)
+    positions, path = bounce_in_box([50.0, 50.0], [step, 0.0], lo, hi, n=200)
+    np.testing.assert_allclose(positions[:, 0], expected)
+    np.testing.assert_allclose(path[-1, 0], 50.0 + 200 * step)
+
+def test_ping_pong_bounces_between_ends():
+    assert ping_pong(9, 0, 3).tolist() == [0, 1, 2, 3, 2, 1, 0, 1, 2]
+    assert ping_pong(4, 0, 3, phase=2).tolist() == [2, 3, 2, 1]
+
+def test_ping_pong_hold_repeats_end_values():
+    assert ping_pong(10, 0, 2, hold=True).tolist() == [0, 1, 2, 2, 1, 0, 0, 1, 2, 2]
+
+def test_ramp_wraps_at_limit():
+    assert ramp(6, 4, 10).tolist() == [0, 4, 8, 0, 4, 8]
+
+def test_path_speed_rounds_to_step():
+    assert pattern_functions._path_speed(5) == 5
+    assert pattern_functions._path_speed(5.1) == 5.0
+    assert pattern_functions._path_speed(5.2) == 5.25
+    assert pattern_functions._path_speed(0.01) == pattern_functions.PATH_SPEED_STEP
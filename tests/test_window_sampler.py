@@ -0,0 +1,76 @@
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from window_sampler import WindowSampler
+
+def make_dataset(lengths=(40, 25, 3), n_features=2):
+    """Songs whose feature rows encode (song, frame), so windows can be checked by value."""
+    features, patterns, speeds = [], [], []
+    for song, n in enumerate(lengths):
+        frames = np.arange(n)
+        features.append(np.column_stack([np.full(n, song), frames][:n_features]).astype(np.float32))
+        patterns.append(frames % 4)
+        speeds.append(frames % 9)
+    return SimpleNamespace(features=features, patterns=patterns, speeds=speeds)
+
+def all_batches(sampler):
+    return [(X.copy(), p.copy(), s.copy()) for X, p, s in sampler]
+
+def test_windows_are_centred_and_never_span_songs():
+    sampler = WindowSampler(make_dataset(), window=5, batch_size=16, seed=0)
+    assert len(sampler.starts) == 36 + 21  # the 3-frame song is too short
+    seen = 0
+    for X, patterns, speeds in all_batches(sampler):
+        songs, frames = X[:, :, 0], X[:, :, 1]
+        assert np.all(songs == songs[:, :1])
+        assert np.all(np.diff(frames, axis=1) == 1)
+        centres = frames[:, 2].astype(int)
+        assert np.all(patterns == centres % 4) and np.all(speeds == centres % 9)
+        seen += len(X)
+    assert seen == 57
+
+def test_drop_last_and_len():
+    sampler = WindowSampler(make_dataset(), window=5, batch_size=16, drop_last=True)
+    assert len(sampler) == 3
+    assert [len(X) for X, _, _ in all_batches(sampler)] == [16, 16, 16]
+    assert len(WindowSampler(make_dataset(), window=5, batch_size=16)) == 4
+
+def test_prefetch_yields_the_same_batches():
+    dataset = make_dataset()
+    direct = all_batches(WindowSampler(dataset, window=5, batch_size=8, seed=3, prefetch=0))
+    ahead = all_batches(WindowSampler(dataset, window=5, batch_size=8, seed=3, prefetch=2))
+    assert len(direct) == len(ahead)
+    for a, b in zip(direct, ahead):
+        for x, y in zip(a, b):
+            np.testing.assert_array_equal(x, y)
+
+def test_balanced_sampling_evens_out_classes():
+    dataset = make_dataset(lengths=(400,))
+    dataset.patterns[0] = np.where(np.arange(400) < 360, 0, 1)  # 90% class 0
+    sampler = WindowSampler(dataset, window=3, batch_size=100, balance='pattern', seed=0)
+    labels = np.concatenate([p for _, p, _ in all_batches(sampler)])
+    assert 0.4 < labels.mean() < 0.6
+
+def test_even_window_is_rejected():
+    with pytest.raises(ValueError):
+        WindowSampler(make_dataset(), window=4)
+
+@pytest.mark.parametrize('prefetch', [0, 2])
+def test_errors_while_gathering_reach_the_consumer(prefetch):
+    sampler = WindowSampler(make_dataset(), window=5, batch_size=8, prefetch=prefetch)
+    calls = []
+
+    def failing_gather(chosen, out=None):
+        calls.append(len(chosen))
+        if len(calls) == 3:
+            raise RuntimeError("bad shard")
+        return WindowSampler.gather(sampler, chosen, out)
+
+    sampler.gather = failing_gather
+    batches = []
+    with pytest.raises(RuntimeError, match="bad shard"):
+        for batch in sampler:
+            batches.append(batch)
+    assert len(batches) == 2
@@ -0,0 +1,161 @@
+# === Vectorized Trajectories ===
+# NumPy generators for blocks of beam positions. Motion patterns used to step
+# x/y one float operation per frame with branchy bounce logic; these build
+# hundreds of frames at once so a pattern only has to index into the block.
+#
+# Bounded motion is computed as an unbounded ("unfolded") path and then
+# folded into the box, which is the same as mirror-bouncing off the edges.
+# Callers keep the unfolded end point to continue seamlessly in the next block.
+
+import numpy as np
+
+def reflect(path, lo, hi):
+    """
+    Fold an unbounded path into [lo, hi] as if it bounced off the edges.
+
+    Args:
+        path (np.ndarray): Unfolded positions, any shape
+        lo (float): Lower bound
+        hi (float): Upper bound
+
+    Returns:
+        np.ndarray: Positions inside [lo, hi]
+    """
+    span = hi - lo
+    m = np.mod(path - lo, 2 * span)
+    return lo + span - np.abs(m - span)
+
+def bounce_in_box(start, velocity, lo, hi, n=None):
+    """
+    Straight-line motion bouncing inside a square box.
+
+    Args:
+        start (array-like): Unfolded (x, y) position before the first frame
+        velocity (array-like): (dx, dy) per frame, or an (n, 2) array of per-frame steps
+        lo (float): Lower bound for both axes
+        hi (float): Upper bound for both axes
+        n (int): Number of frames (only needed for a constant velocity)
+
+    Returns:
+        tuple: (positions (n, 2) inside the box, unfolded path (n, 2))
+    """
+    velocity = np.asarray(velocity, dtype=float)
+    if velocity.ndim == 1:
+        velocity = np.broadcast_to(velocity, (n, 2))
+    path = np.asarray(start, dtype=float) + np.cumsum(velocity, axis=0)
+    return reflect(path, lo, hi), path
+
+def random_headings(n, angle, hold, min_frames, max_frames, rng):
+    """
+    Headings that stay fixed for a random number of frames, then jump to a new
+    random angle.
+
+    Args:
+        n (int): Number of frames
+        angle (float): Current heading in radians
+        hold (int): Frames left on the current heading
+        min_frames (int): Shortest time on a new heading
+        max_frames (int): Longest time on a new heading
+        rng (np.random.Generator): Random source
+
+    Returns:
+        tuple: (headings (n,), heading after the block, frames left on it)
+    """
+    if hold >= n:
+        return np.full(n, angle), angle, hold - n
+
+    min_frames = max(1, min_frames)
+    k = -(-(n - hold) // min_frames)  # enough segments to cover the block
+    angles = np.concatenate(([angle], rng.uniform(0, 2 * np.pi, k)))
+    lengths = np.concatenate(([hold], rng.integers(min_frames, max(min_frames, max_frames) + 1, k)))
+
+    # Segment that straddles the end of the block carries over
+    ends = np.cumsum(lengths)
+    last = np.searchsorted(ends, n)
+    headings = np.repeat(angles[:last + 1], lengths[:last + 1])[:n]
+    return headings, angles[last], int(ends[last] - n)
+
+def random_walk(start, angle, turns, step, lo, hi):
+    """
+    Reflected random walk: the heading drifts by a per-frame turn and the
+    position advances a fixed step along it.
+
+    Args:
+        start (array-like): Unfolded (x, y) position before the first frame
+        angle (float): Heading before the first frame
+        turns (np.ndarray): Per-frame heading change in radians, shape (n,)
+        step (float): Distance travelled per frame
+        lo (float): Lower bound for both axes
+        hi (float): Upper bound for both axes
+
+    Returns:
+        tuple: (positions (n, 2), unfolded path (n, 2), headings (n,))
+    """
+    headings = angle + np.cumsum(turns)
+    velocity = step * np.column_stack((np.cos(headings), np.sin(headings)))
+    positions, path = bounce_in_box(start, velocity, lo, hi)
+    return positions, path, headings
+
+def lissajous(n, center, amplitude, freq, phase=(0.0, np.pi / 2), t0=0.0, dt=0.05):
+    """
+    Lissajous figure sampled at a fixed frame period.
+
+    Args:
+        n (int): Number of frames
+        center (array-like): (x, y) center
+        amplitude (array-like): (x, y) amplitude
+        freq (array-like): (x, y) frequency in Hz
+        phase (array-like): (x, y) phase in radians
+        t0 (float): Time of the first frame in seconds
+        dt (float): Seconds between frames
+
+    Returns:
+        np.ndarray: Positions, shape (n, 2)
+    """
+    t = t0 + dt * np.arange(n)[:, None]
+    return (np.asarray(center, dtype=float)
+            + np.asarray(amplitude, dtype=float)
+            * np.sin(2 * np.pi * np.asarray(freq, dtype=float) * t + np.asarray(phase, dtype=float)))
+
+def ping_pong(n, lo, hi, phase=0, hold=False):
+    """
+    Integer ramp that bounces between lo and hi.
+
+    Phase 0 is lo, heading up. With hold=True each end value is emitted twice
+    (lo, ..., hi, hi, ..., lo, lo, ...), matching the patterns that clamp and
+    flip direction before stepping.
+
+    Args:
+        n (int): Number of frames
+        lo (int): Lower end
+        hi (int): Upper end
+        phase (int): Position in the cycle of the first frame
+        hold (bool): Repeat the end values
+
+    Returns:
+        np.ndarray: int array of shape (n,)
+    """
+    k = phase + np.arange(n)
+    if hold:
+        span = hi - lo + 1
+        m = k % (2 * span)
+        return lo + np.minimum(m, 2 * span - 1 - m)
+    span = hi - lo
+    m = k % (2 * span)
+    return hi - np.abs(span - m)
+
+def ramp(n, step, limit, phase=0):
+    """
+    Sawtooth that climbs by step from 0 and wraps to 0 once it reaches limit.
+
+    Args:
+        n (int): Number of frames
+        step (int): Increment per frame
+        limit (int): Values at or above this wrap to 0
+        phase (int): Position in the cycle of the first frame
+
+    Returns:
+        np.ndarray: int array of shape (n,)
+    """
+    period = -(-limit // step)
+    return step * ((phase + np.arange(n)) % period)